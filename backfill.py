@@ -0,0 +1,217 @@
+"""
+Historical Candle Backfill
+==========================
+Downloads months of history straight into the local candle store so models can
+be trained without waiting for run_analysis_cycle to collect it bar by bar.
+
+- The date range is split into Config.BACKFILL_CHUNK_DAYS chunks per symbol, shortened
+  where needed so no chunk holds more bars than a provider returns per request
+- Chunks are downloaded in parallel from Polygon (aggregates range endpoint) and
+  TwelveData (start_date/end_date); workers alternate providers so both budgets are
+  used, and the shared rate limiter / circuit breakers keep every call within limits
+- Finished chunks, including ones a provider answered with no bars (weekends,
+  holidays), are recorded in a checkpoint file; rerunning the same command
+  resumes where an interrupted run stopped and retries only failed chunks
+
+Usage:
+    python backfill.py --days 180
+    python backfill.py --pairs EURUSD,GBPUSD --start 2024-01-01 --end 2024-06-30 --workers 8
+    python train_ml_model.py --source candles
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from config import Config
+from candle_store import timeframe_to_timedelta
+from data_loader import DataLoader
+from utils import logger
+
+PROVIDERS = ['polygon', 'twelvedata']
+MAX_BARS = {'polygon': 50000, 'twelvedata': 5000}  # per-request caps
+
+
+def plan_chunks(symbols, start, end, chunk_days, max_span=None):
+    """
+    [(symbol, chunk_start, chunk_end)] covering [start, end) for every symbol.
+    max_span caps the chunk length, so a chunk never holds more bars than one request returns.
+    """
+    step = pd.Timedelta(days=chunk_days)
+    if max_span is not None:
+        step = min(step, max_span)
+    chunks = []
+    for symbol in symbols:
+        cursor = start
+        while cursor < end:
+            chunks.append((symbol, cursor, min(cursor + step, end)))
+            cursor += step
+    return chunks
+
+
+class Checkpoint:
+    def __init__(self, path):
+        """
+        Args:
+            path: JSON file recording completed chunk IDs
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = set()
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.done = set(json.load(f).get('done', []))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable backfill checkpoint {path}: {e}")
+
+    @staticmethod
+    def chunk_id(symbol, timeframe, start, end):
+        return f"{symbol}|{timeframe}|{start.isoformat()}|{end.isoformat()}"
+
+    def mark(self, chunk_id):
+        # Rewrite atomically so an interrupted run never leaves a corrupt checkpoint
+        with self._lock:
+            self.done.add(chunk_id)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'done': sorted(self.done)}, f)
+            os.replace(tmp, self.path)
+
+    def reset(self):
+        with self._lock:
+            self.done.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class Backfiller:
+    def __init__(self, timeframe=None, workers=None, providers=None, checkpoint=None, loader=None):
+        """
+        Args:
+            timeframe: Candle timeframe to backfill (default: Config.TIMEFRAME)
+            workers: Parallel chunk downloads (default: Config.BACKFILL_WORKERS)
+            providers: Providers to spread chunks over (default: polygon, twelvedata)
+            checkpoint: Checkpoint file path (default: Config.BACKFILL_CHECKPOINT)
+        """
+        self.timeframe = timeframe or Config.TIMEFRAME
+        self.workers = workers or Config.BACKFILL_WORKERS
+        self.providers = providers or PROVIDERS
+        self.checkpoint = Checkpoint(checkpoint or Config.BACKFILL_CHECKPOINT)
+        self.loader = loader or DataLoader()
+        self._bar = timeframe_to_timedelta(self.timeframe)
+        # Longest chunk every provider can return in one request (bars = span / bar + 1)
+        self.max_span = self._bar * (min(MAX_BARS.get(p, MAX_BARS['twelvedata']) for p in self.providers) - 1)
+
+    def _fetch(self, provider, symbol, start, end):
+        bars = int((end - start) / self._bar) + 1
+        if provider == 'polygon':
+            minutes = int(self._bar.total_seconds() // 60)
+            return self.loader.fetch_price_polygon(symbol, interval=str(minutes),
+                                                   outputsize=min(bars, MAX_BARS['polygon']),
+                                                   start=start, end=end)
+        return self.loader.fetch_price_twelvedata(symbol, interval=self.timeframe,
+                                                  outputsize=min(bars, MAX_BARS['twelvedata']),
+                                                  start=start, end=end)
+
+    def fetch_chunk(self, index, symbol, start, end):
+        """
+        Download one chunk into the store; returns bars written. 0 means a provider answered
+        with no bars for the range (market closed throughout), None that every provider failed.
+        """
+        # Rotate the first provider per chunk so all provider budgets are drawn in parallel
+        order = self.providers[index % len(self.providers):] + self.providers[:index % len(self.providers)]
+        answered = False
+        for provider in order:
+            if not self.loader.health.allow(provider):
+                continue
+            df = self._fetch(provider, symbol, start, end)
+            if df is None:
+                continue
+            df = df[(df['datetime'] >= start) & (df['datetime'] < end)]
+            if df.empty:
+                # Another provider may still have bars for the range
+                answered = True
+                continue
+            self.loader.store.append(symbol, self.timeframe, df)
+            return len(df)
+        return 0 if answered else None
+
+    def run(self, symbols, start, end, chunk_days=None):
+        """Backfill [start, end) for symbols; returns {'chunks', 'skipped', 'failed', 'bars', 'seconds'}"""
+        chunk_days = chunk_days or Config.BACKFILL_CHUNK_DAYS
+        if pd.Timedelta(days=chunk_days) > self.max_span:
+            logger.info(f"Backfill {self.timeframe}: {chunk_days}-day chunks exceed the per-request bar cap, "
+                        f"using {self.max_span} chunks")
+        chunks = plan_chunks(symbols, start, end, chunk_days, max_span=self.max_span)
+        pending = [(i, c) for i, c in enumerate(chunks)
+                   if Checkpoint.chunk_id(c[0], self.timeframe, c[1], c[2]) not in self.checkpoint.done]
+        stats = {'chunks': len(chunks), 'skipped': len(chunks) - len(pending), 'failed': 0, 'bars': 0}
+        logger.info(f"Backfill {self.timeframe}: {len(pending)} of {len(chunks)} chunks to download "
+                    f"for {len(symbols)} symbols ({start.date()} -> {end.date()}), {self.workers} workers")
+
+        started = time.perf_counter()
+        completed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as pool:
+            futures = {pool.submit(self.fetch_chunk, i, *chunk): chunk for i, chunk in pending}
+            for future in as_completed(futures):
+                symbol, chunk_start, chunk_end = futures[future]
+                completed += 1
+                try:
+                    bars = future.result()
+                except Exception as e:
+                    logger.error(f"Backfill chunk {symbol} {chunk_start.date()} failed: {e}")
+                    bars = None
+                if bars is None:
+                    # Transport/HTTP failure: left out of the checkpoint so the next run retries it
+                    stats['failed'] += 1
+                    logger.warning(f"[{completed}/{len(pending)}] {symbol} {chunk_start.date()} -> "
+                                   f"{chunk_end.date()}: failed")
+                    continue
+                stats['bars'] += bars
+                self.checkpoint.mark(Checkpoint.chunk_id(symbol, self.timeframe, chunk_start, chunk_end))
+                logger.info(f"[{completed}/{len(pending)}] {symbol} {chunk_start.date()} -> "
+                            f"{chunk_end.date()}: {bars} bars")
+        stats['seconds'] = round(time.perf_counter() - started, 2)
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill historical candles into the local candle store')
+    parser.add_argument('--pairs', type=str, default=None, help='Comma-separated symbols (default: Config.PAIRS)')
+    parser.add_argument('--days', type=int, default=90, help='Days of history ending now (ignored with --start)')
+    parser.add_argument('--start', type=str, default=None, help='Range start (YYYY-MM-DD, UTC)')
+    parser.add_argument('--end', type=str, default=None,
+                        help='Range end, exclusive (default: start of today UTC; the live cycle fetches today)')
+    parser.add_argument('--timeframe', type=str, default=Config.TIMEFRAME)
+    parser.add_argument('--chunk-days', type=int, default=Config.BACKFILL_CHUNK_DAYS)
+    parser.add_argument('--workers', type=int, default=Config.BACKFILL_WORKERS)
+    parser.add_argument('--providers', type=str, default=','.join(PROVIDERS), help='Providers to download from')
+    parser.add_argument('--checkpoint', type=str, default=Config.BACKFILL_CHECKPOINT)
+    parser.add_argument('--reset', action='store_true', help='Forget completed chunks and download everything')
+    args = parser.parse_args()
+
+    symbols = [p.strip().upper() for p in args.pairs.split(',')] if args.pairs else Config.PAIRS
+    # Whole-day bounds keep chunk IDs stable, so a rerun on the same day resumes
+    end = pd.Timestamp(args.end) if args.end else pd.Timestamp.now('UTC').tz_localize(None).normalize()
+    start = pd.Timestamp(args.start) if args.start else end - pd.Timedelta(days=args.days)
+
+    backfiller = Backfiller(timeframe=args.timeframe, workers=args.workers,
+                            providers=[p.strip() for p in args.providers.split(',')],
+                            checkpoint=args.checkpoint)
+    if args.reset:
+        backfiller.checkpoint.reset()
+    stats = backfiller.run(symbols, start, end, chunk_days=args.chunk_days)
+    logger.info(f"Backfill done: {stats['bars']} bars in {stats['seconds']}s "
+                f"({stats['chunks'] - stats['skipped'] - stats['failed']} chunks downloaded, "
+                f"{stats['skipped']} already done, {stats['failed']} failed - rerun to retry)")
+
+
+if __name__ == "__main__":
+    main()
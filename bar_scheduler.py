@@ -0,0 +1,134 @@
+"""
+Bar-Close Scheduler
+===================
+Fires the background analysis cycle on candle boundaries instead of every 15
+minutes from process start:
+
+- Boundaries are UTC-aligned per timeframe (15min bars close at :00/:15/:30/:45,
+  1h on the hour, ...). A cycle starts `settle` seconds after the close, giving
+  providers time to publish the finished bar
+- Only symbols whose bar actually closed are passed to the job: the symbol's
+  timeframe has a boundary at this close and its market was open for that bar
+  (no weekend runs for FX, crypto keeps going)
+- A cycle still running at the next close is not doubled up; that close is
+  skipped and counted
+- Lag metrics (start and finish relative to the bar close) via metrics(); main logs
+  them after each cycle and web_dashboard serves them under /api/status
+
+Usage:
+    scheduler = BarCloseScheduler(lambda symbols, close: run(symbols), {'15min': pairs})
+    scheduler.run_forever()
+"""
+
+import threading
+import time
+from datetime import datetime
+from candle_store import timeframe_to_timedelta
+from config import Config
+from utils import logger, is_market_open
+
+
+class BarCloseScheduler:
+    def __init__(self, job, groups, settle=None, is_open=is_market_open, clock=time.time):
+        """
+        Args:
+            job: fn(symbols, bar_close) run once per close, bar_close a UTC datetime
+            groups: {timeframe: [symbols]} ('15min', '1h', ...)
+            settle: Seconds after the close before the job starts (default Config.SCHEDULE_SETTLE_SECONDS)
+            is_open: fn(symbol, utc_datetime) -> bool, market open at the bar's start
+            clock: Epoch-seconds time source
+        """
+        self.job = job
+        self.groups = {tf: list(symbols) for tf, symbols in groups.items()}
+        self.periods = {tf: timeframe_to_timedelta(tf).total_seconds() for tf in self.groups}
+        self.settle = Config.SCHEDULE_SETTLE_SECONDS if settle is None else settle
+        self.is_open = is_open
+        self.clock = clock
+        self._stop = threading.Event()
+        self._running = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {'runs': 0, 'skipped_overlap': 0, 'skipped_closed': 0, 'last_close': None,
+                         'last_start_lag': None, 'last_finish_lag': None,
+                         'max_start_lag': 0.0, 'max_finish_lag': 0.0, 'total_finish_lag': 0.0}
+
+    def next_close(self, now=None):
+        """Earliest bar close (epoch seconds) after now across all timeframes"""
+        now = self.clock() if now is None else now
+        return min((now // period + 1) * period for period in self.periods.values())
+
+    def closed_symbols(self, close):
+        """Symbols whose bar ended at `close` (epoch seconds) while their market was open"""
+        symbols = []
+        for tf, period in self.periods.items():
+            if close % period:
+                continue
+            bar_start = datetime.utcfromtimestamp(close - period)
+            symbols += [s for s in self.groups[tf] if s not in symbols and self.is_open(s, bar_start)]
+        return symbols
+
+    def fire(self, close):
+        """
+        Start the job for the bar closing at `close` in a worker thread.
+        Returns the thread, or None if nothing closed or the previous run is still going.
+        """
+        symbols = self.closed_symbols(close)
+        if not symbols:
+            with self._metrics_lock:
+                self._metrics['skipped_closed'] += 1
+            return None
+        if not self._running.acquire(blocking=False):
+            with self._metrics_lock:
+                self._metrics['skipped_overlap'] += 1
+            logger.warning(f"Skipping bar close {datetime.utcfromtimestamp(close):%H:%M} UTC: "
+                           f"previous cycle still running")
+            return None
+        thread = threading.Thread(target=self._run, args=(symbols, close), name="bar-close", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self, symbols, close):
+        started = self.clock()
+        bar_close = datetime.utcfromtimestamp(close)
+        try:
+            self.job(symbols, bar_close)
+        except Exception as e:
+            logger.error(f"Bar-close cycle for {bar_close:%H:%M} UTC failed: {e}")
+        finally:
+            finished = self.clock()
+            self._running.release()
+        start_lag, finish_lag = started - close, finished - close
+        with self._metrics_lock:
+            m = self._metrics
+            m['runs'] += 1
+            m['last_close'] = bar_close.isoformat()
+            m['last_start_lag'] = round(start_lag, 3)
+            m['last_finish_lag'] = round(finish_lag, 3)
+            m['max_start_lag'] = max(m['max_start_lag'], round(start_lag, 3))
+            m['max_finish_lag'] = max(m['max_finish_lag'], round(finish_lag, 3))
+            m['total_finish_lag'] += finish_lag
+        logger.info(f"Bar close {bar_close:%H:%M} UTC: {len(symbols)} symbols, started +{start_lag:.1f}s, "
+                    f"finished +{finish_lag:.1f}s after close")
+
+    def metrics(self):
+        """Run/skip counts and start/finish lag (seconds after the bar close)"""
+        with self._metrics_lock:
+            m = dict(self._metrics)
+        total = m.pop('total_finish_lag')
+        m['avg_finish_lag'] = round(total / m['runs'], 3) if m['runs'] else None
+        return m
+
+    def run_forever(self):
+        """Block, firing at each close + settle, until stop()"""
+        while not self._stop.is_set():
+            close = self.next_close()
+            # Short waits re-read the clock, so wall-clock adjustments don't push a run off its bar
+            while not self._stop.is_set():
+                remaining = close + self.settle - self.clock()
+                if remaining <= 0:
+                    break
+                self._stop.wait(min(remaining, 30))
+            if not self._stop.is_set():
+                self.fire(close)
+
+    def stop(self):
+        self._stop.set()
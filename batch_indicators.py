@@ -0,0 +1,134 @@
+"""
+Batch (Cross-Symbol) Indicators
+===============================
+Computes the full add_indicators column set for a whole universe at once from
+aligned (symbols x bars) OHLCV arrays. Every indicator is one vectorized
+indicator_kernels pass along the time axis over all symbols together, instead of
+one pandas/ta pipeline per pair.
+
+Rows are right-aligned: row s holds symbol s's own last `bars` candles, with NaN
+padding in front when a symbol has less history. Padding behaves exactly like a
+shorter frame, so each row matches add_indicators on that symbol's frame.
+
+Usage:
+    batch = compute_from_frames({'EURUSD': df1, 'GBPUSD': df2})
+    row = batch.latest('EURUSD')                  # -> TechnicalAnalysis.get_signal_score(row)
+    X = batch.latest_frame()[model.feature_columns]  # -> one predict_proba call for all symbols
+"""
+
+import numpy as np
+import pandas as pd
+from incremental_indicators import INDICATOR_COLUMNS
+from indicator_kernels import compute_indicators
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class IndicatorBatch:
+    """Structured result: (symbols x bars) arrays per column plus a validity mask"""
+
+    def __init__(self, symbols, datetimes, prices, indicators):
+        """
+        Args:
+            symbols: Row labels
+            datetimes: (S, T) datetime64 array (NaT where padded), or None
+            prices: {field: (S, T) array} for open/high/low/close/volume
+            indicators: {column: (S, T) array} for INDICATOR_COLUMNS
+        """
+        self.symbols = list(symbols)
+        self.datetimes = datetimes
+        self.columns = {**prices, **indicators}
+        self._row = {symbol: i for i, symbol in enumerate(self.symbols)}
+        # Same rule as add_indicators' dropna(): every column defined
+        self.valid = np.logical_and.reduce([~np.isnan(self.columns[c]) for c in INDICATOR_COLUMNS + ['close']])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    @property
+    def shape(self):
+        return self.columns['close'].shape
+
+    def latest(self, symbol):
+        """Last bar of symbol as a Series (drop-in for the add_indicators row given to get_signal_score)"""
+        i = self._row[symbol]
+        row = pd.Series({column: values[i, -1] for column, values in self.columns.items()})
+        if self.datetimes is not None:
+            row['datetime'] = self.datetimes[i, -1]
+        return row
+
+    def latest_frame(self):
+        """Last bar of every symbol as a DataFrame indexed by symbol (ML feature matrix source)"""
+        frame = pd.DataFrame({column: values[:, -1] for column, values in self.columns.items()},
+                             index=pd.Index(self.symbols, name='symbol'))
+        if self.datetimes is not None:
+            frame.insert(0, 'datetime', self.datetimes[:, -1])
+        return frame
+
+    def frame(self, symbol):
+        """One symbol as add_indicators would return it (padding and warm-up rows dropped)"""
+        i = self._row[symbol]
+        mask = self.valid[i]
+        frame = pd.DataFrame({column: values[i, mask] for column, values in self.columns.items()})
+        if self.datetimes is not None:
+            frame.insert(0, 'datetime', self.datetimes[i, mask])
+        return frame
+
+
+def stack_frames(frames, bars=None):
+    """
+    Right-align per-symbol candle frames into (S, T) arrays.
+    Returns (symbols, datetimes, {field: array}, has_volume); T is the longest frame (or `bars`),
+    has_volume an (S,) bool array. Rows of frames without a volume column hold zero volume.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and not df.empty]
+    length = max((len(frames[s]) for s in symbols), default=0)
+    if bars:
+        length = min(length, bars)
+    arrays = {field: np.full((len(symbols), length), np.nan) for field in PRICE_FIELDS}
+    datetimes = np.full((len(symbols), length), np.datetime64('NaT'), dtype='datetime64[ns]')
+    has_volume = np.array([('volume' in frames[s].columns) for s in symbols], dtype=bool)
+    for i, symbol in enumerate(symbols):
+        df = frames[symbol].tail(length)
+        n = len(df)
+        for field in PRICE_FIELDS:
+            if field in df.columns:
+                arrays[field][i, length - n:] = df[field].to_numpy(dtype='float64')
+        if not has_volume[i]:
+            arrays['volume'][i, length - n:] = 0.0
+        if 'datetime' in df.columns:
+            datetimes[i, length - n:] = pd.to_datetime(df['datetime']).to_numpy(dtype='datetime64[ns]')
+    return symbols, datetimes, arrays, has_volume
+
+
+def compute_batch(open_, high, low, close, volume=None, symbols=None, datetimes=None, has_volume=None):
+    """
+    Full indicator set for (S, T) OHLC(V) arrays in vectorized passes (indicator_kernels).
+    volume=None mirrors add_indicators on frames without a volume column; has_volume, an (S,)
+    bool array, does the same for individual rows (their obv/obv_ema/volume_sma are 0).
+    Returns an IndicatorBatch.
+    """
+    high, low, close = (np.asarray(a, dtype='float64') for a in (high, low, close))
+    symbols = symbols if symbols is not None else list(range(close.shape[0]))
+    if volume is not None and has_volume is not None and not np.any(has_volume):
+        volume = None
+    indicators = compute_indicators(high, low, close, volume)
+    if volume is not None and has_volume is not None:
+        # Rows without volume get add_indicators' zeros (NaN only where padded)
+        missing = ~np.asarray(has_volume, dtype=bool)[:, None]
+        zeros = np.where(np.isnan(close), np.nan, 0.0)
+        for column in ('obv', 'obv_ema', 'volume_sma'):
+            indicators[column] = np.where(missing, zeros, indicators[column])
+    prices = {'open': np.asarray(open_, dtype='float64'), 'high': high, 'low': low, 'close': close,
+              'volume': np.asarray(volume, dtype='float64') if volume is not None else np.zeros(close.shape)}
+    return IndicatorBatch(symbols, datetimes, prices, indicators)
+
+
+def compute_from_frames(frames, bars=None):
+    """compute_batch for {symbol: candle DataFrame} (right-aligned, see stack_frames)"""
+    symbols, datetimes, arrays, has_volume = stack_frames(frames, bars)
+    return compute_batch(arrays['open'], arrays['high'], arrays['low'], arrays['close'],
+                         arrays['volume'], symbols=symbols, datetimes=datetimes, has_volume=has_volume)
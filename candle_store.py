@@ -0,0 +1,382 @@
+"""
+Local OHLCV Candle Store
+========================
+Persistent per-(symbol, timeframe) candle history so DataLoader only has to
+download bars newer than the last stored timestamp each cycle, and training /
+cold starts can load history from disk instead of the network or MongoDB.
+
+Layout (one directory per symbol/timeframe under Config.CANDLE_STORE_DIR):
+    EURUSD_15min/datetime.i8   int64 nanoseconds since epoch (UTC)
+    EURUSD_15min/open.f8 ...   float64 columns (open, high, low, close, volume)
+    EURUSD_15min/meta.json     committed row count, commit version and rewrite offset
+
+Columns are opened as read-only numpy memmaps and handed to pandas without
+copying. Writes go through a small redo journal: the new tail is saved to
+journal.npz, applied to the column files, then meta.json is swapped in with
+os.replace. A crash at any point is repaired by replaying the journal on the
+next access, so the committed row count never covers half-written data.
+
+Usage:
+    python candle_store.py stats
+    python candle_store.py compact [--symbol EURUSD] [--timeframe 15min]
+"""
+
+import argparse
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from config import Config
+from utils import logger
+
+try:
+    import fcntl  # POSIX only; cross-process locking is skipped elsewhere
+except ImportError:
+    fcntl = None
+
+CANDLE_COLUMNS = ['datetime', 'open', 'high', 'low', 'close', 'volume']
+PRICE_COLUMNS = CANDLE_COLUMNS[1:]
+
+
+def timeframe_to_timedelta(timeframe):
+    """'15min' / '1h' / '4h' / '1day' -> pandas Timedelta"""
+    tf = timeframe.lower().strip()
+    if tf.endswith('min'):
+        return pd.Timedelta(minutes=int(tf[:-3]))
+    if tf.endswith('h'):
+        return pd.Timedelta(hours=int(tf[:-1]))
+    if tf.endswith('day'):
+        return pd.Timedelta(days=int(tf[:-3] or 1))
+    raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def _column_file(column):
+    return f"{column}.i8" if column == 'datetime' else f"{column}.f8"
+
+
+def _column_dtype(column):
+    return np.int64 if column == 'datetime' else np.float64
+
+
+class CandleStore:
+    def __init__(self, root=None):
+        """
+        Args:
+            root: Directory holding the candle columns (default: Config.CANDLE_STORE_DIR)
+        """
+        self.root = root or Config.CANDLE_STORE_DIR
+        os.makedirs(self.root, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Paths & locking
+    # ------------------------------------------------------------------
+    def _dir(self, symbol, timeframe):
+        return os.path.join(self.root, f"{symbol.upper()}_{timeframe}")
+
+    def _thread_lock(self, symbol, timeframe):
+        key = (symbol.upper(), timeframe)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    class _KeyLock:
+        """Thread lock plus an flock on the key directory for other processes"""
+
+        def __init__(self, thread_lock, directory):
+            self.thread_lock = thread_lock
+            self.directory = directory
+            self.handle = None
+
+        def __enter__(self):
+            self.thread_lock.acquire()
+            os.makedirs(self.directory, exist_ok=True)
+            if fcntl is not None:
+                self.handle = open(os.path.join(self.directory, 'lock'), 'a')
+                fcntl.flock(self.handle, fcntl.LOCK_EX)
+            return self
+
+        def __exit__(self, *exc):
+            if self.handle is not None:
+                fcntl.flock(self.handle, fcntl.LOCK_UN)
+                self.handle.close()
+                self.handle = None
+            self.thread_lock.release()
+
+    def _lock(self, symbol, timeframe):
+        return self._KeyLock(self._thread_lock(symbol, timeframe), self._dir(symbol, timeframe))
+
+    # ------------------------------------------------------------------
+    # Metadata & journal
+    # ------------------------------------------------------------------
+    def _read_meta(self, directory):
+        try:
+            with open(os.path.join(directory, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_rows(self, directory):
+        try:
+            return int(self._read_meta(directory)['rows'])
+        except (KeyError, TypeError, ValueError):
+            return 0
+
+    def _commit_rows(self, directory, rows, offset):
+        # version counts commits; offset is the first row the commit rewrote
+        meta_path = os.path.join(directory, 'meta.json')
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        version = int(self._read_meta(directory).get('version', 0)) + 1
+        with open(tmp_path, 'w') as f:
+            json.dump({'rows': int(rows), 'columns': CANDLE_COLUMNS,
+                       'version': version, 'offset': int(offset)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, meta_path)
+
+    def _write_columns(self, directory, offset, arrays):
+        """Write arrays at row `offset` of every column file (in place, fsynced)"""
+        for column in CANDLE_COLUMNS:
+            path = os.path.join(directory, _column_file(column))
+            data = np.ascontiguousarray(arrays[column], dtype=_column_dtype(column))
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                f.seek(offset * data.itemsize)
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _apply_journal(self, directory):
+        """Replay a pending journal (idempotent). Caller holds the key lock."""
+        journal_path = os.path.join(directory, 'journal.npz')
+        if not os.path.exists(journal_path):
+            return
+        with np.load(journal_path) as journal:
+            offset = int(journal['offset'])
+            arrays = {column: journal[column] for column in CANDLE_COLUMNS}
+        self._write_columns(directory, offset, arrays)
+        self._commit_rows(directory, offset + len(arrays['datetime']), offset)
+        os.remove(journal_path)
+
+    def _save_journal(self, directory, offset, arrays):
+        journal_path = os.path.join(directory, 'journal.npz')
+        tmp_path = os.path.join(directory, f"journal.{os.getpid()}.tmp.npz")
+        np.savez(tmp_path, offset=np.int64(offset), **arrays)
+        os.replace(tmp_path, journal_path)
+        return journal_path
+
+    def _journaled_write(self, directory, offset, arrays):
+        """Durably record the tail rewrite, then apply and commit it"""
+        self._save_journal(directory, offset, arrays)
+        self._apply_journal(directory)
+
+    def _replace_columns(self, directory, arrays):
+        """
+        Swap in new column files (written aside, fsynced, then os.replace'd).
+        Readers still mapping the old files keep their inodes, unlike an in-place
+        rewrite or truncate, which would change or cut the pages under them.
+        """
+        for column in CANDLE_COLUMNS:
+            path = os.path.join(directory, _column_file(column))
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            data = np.ascontiguousarray(arrays[column], dtype=_column_dtype(column))
+            with open(tmp_path, 'wb') as f:
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+    def _ensure_ready(self, symbol, timeframe):
+        """Recover an interrupted write or import a legacy CSV file before reading"""
+        directory = self._dir(symbol, timeframe)
+        legacy_csv = os.path.join(self.root, f"{symbol.upper()}_{timeframe}.csv")
+        needs_import = os.path.exists(legacy_csv) and self._read_rows(directory) == 0
+        if not os.path.exists(os.path.join(directory, 'journal.npz')) and not needs_import:
+            return
+        with self._lock(symbol, timeframe):
+            self._apply_journal(directory)
+            if needs_import and self._read_rows(directory) == 0:
+                legacy = pd.read_csv(legacy_csv, parse_dates=['datetime'])
+                self._journaled_write(directory, 0, self._to_arrays(legacy))
+                os.remove(legacy_csv)
+                logger.info(f"Imported legacy candle file {legacy_csv} ({len(legacy)} rows)")
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def _open_columns(self, directory, rows):
+        """Read-only memmaps of the committed rows"""
+        return {
+            column: np.memmap(os.path.join(directory, _column_file(column)),
+                              dtype=_column_dtype(column), mode='r', shape=(rows,))
+            for column in CANDLE_COLUMNS
+        }
+
+    def load(self, symbol, timeframe, limit=None, copy=False):
+        """
+        Stored candles sorted by time (last `limit` rows), or None if nothing is stored.
+        The returned DataFrame is backed directly by the memory-mapped column files, so
+        rows a later append() overlaps (the re-fetched forming bar, a backfilled gap) are
+        rewritten under it; pass copy=True for a snapshot that outlives the next write.
+        Reads take the key lock, so a frame never shows a half-applied write.
+        """
+        self._ensure_ready(symbol, timeframe)
+        directory = self._dir(symbol, timeframe)
+        if self._read_rows(directory) == 0:
+            return None
+        with self._lock(symbol, timeframe):
+            rows = self._read_rows(directory)
+            try:
+                columns = self._open_columns(directory, rows)
+            except (OSError, ValueError) as e:
+                logger.error(f"Candle store read error for {symbol} {timeframe}: {e}")
+                return None
+            start = max(0, rows - limit) if limit is not None else 0
+            data = {column: columns[column][start:] for column in PRICE_COLUMNS}
+            data['datetime'] = columns['datetime'][start:].view('datetime64[ns]')
+            return pd.DataFrame(data, columns=CANDLE_COLUMNS, copy=copy)
+
+    def revision(self, symbol, timeframe):
+        """
+        (version, offset) of the last commit: version increases with every write and
+        offset is the first row that write replaced, so caches of derived data can tell
+        an in-place rewrite of stored bars from an unchanged key. (0, 0) if never written.
+        """
+        self._ensure_ready(symbol, timeframe)
+        meta = self._read_meta(self._dir(symbol, timeframe))
+        return int(meta.get('version', 0)), int(meta.get('offset', 0))
+
+    def last_timestamp(self, symbol, timeframe):
+        """Timestamp of the newest stored bar, or None"""
+        self._ensure_ready(symbol, timeframe)
+        directory = self._dir(symbol, timeframe)
+        rows = self._read_rows(directory)
+        if rows == 0:
+            return None
+        stamps = np.memmap(os.path.join(directory, _column_file('datetime')),
+                           dtype=np.int64, mode='r', shape=(rows,))
+        return pd.Timestamp(int(stamps[-1]))
+
+    def keys(self):
+        """(symbol, timeframe) pairs present in the store"""
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            if os.path.isdir(os.path.join(self.root, name)) and '_' in name:
+                symbol, timeframe = name.rsplit('_', 1)
+                found.append((symbol, timeframe))
+        return found
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_arrays(df):
+        frame = df.reset_index(drop=True)
+        stamps = pd.to_datetime(frame['datetime'])
+        if getattr(stamps.dt, 'tz', None) is not None:
+            stamps = stamps.dt.tz_convert('UTC').dt.tz_localize(None)
+        frame = pd.DataFrame({
+            'datetime': stamps.astype('datetime64[ns]').to_numpy().view(np.int64),
+            **{column: (frame[column].astype(float).to_numpy() if column in frame.columns
+                        else np.zeros(len(frame))) for column in PRICE_COLUMNS}
+        })
+        frame = frame.drop_duplicates(subset='datetime', keep='last').sort_values('datetime')
+        return {column: frame[column].to_numpy() for column in CANDLE_COLUMNS}
+
+    def append(self, symbol, timeframe, df):
+        """
+        Atomically add freshly fetched candles.
+        Bars overlapping the stored tail replace it (newest fetch wins, so a bar that
+        was still forming gets refreshed); only the affected tail is rewritten.
+        Returns the number of committed rows.
+        """
+        new = self._to_arrays(df)
+        if len(new['datetime']) == 0:
+            return self._read_rows(self._dir(symbol, timeframe))
+
+        directory = self._dir(symbol, timeframe)
+        with self._lock(symbol, timeframe):
+            self._apply_journal(directory)
+            rows = self._read_rows(directory)
+            offset = rows
+            tail = new
+            if rows:
+                existing = self._open_columns(directory, rows)
+                offset = int(np.searchsorted(existing['datetime'], new['datetime'][0], side='left'))
+                if offset < rows:
+                    # Merge the overlapped stored rows with the new ones (new values win)
+                    old_tail = pd.DataFrame({c: np.array(existing[c][offset:]) for c in CANDLE_COLUMNS})
+                    merged = pd.concat([old_tail, pd.DataFrame(new)], ignore_index=True)
+                    merged = merged.drop_duplicates(subset='datetime', keep='last').sort_values('datetime')
+                    tail = {c: merged[c].to_numpy() for c in CANDLE_COLUMNS}
+                del existing
+            self._journaled_write(directory, offset, tail)
+            return offset + len(tail['datetime'])
+
+    def merge(self, symbol, timeframe, df):
+        """
+        Merge freshly fetched candles into the store.
+        Returns the full merged history.
+        """
+        self.append(symbol, timeframe, df)
+        return self.load(symbol, timeframe)
+
+    def compact(self, symbol, timeframe):
+        """
+        Replace a key's column files with compacted copies: sorted, de-duplicated, NaN
+        rows dropped and any bytes past the committed row count (from interrupted
+        writes) left behind. Frames already loaded keep reading the old files.
+        Returns the committed row count.
+        """
+        directory = self._dir(symbol, timeframe)
+        with self._lock(symbol, timeframe):
+            self._apply_journal(directory)
+            rows = self._read_rows(directory)
+            if rows == 0:
+                return 0
+            columns = self._open_columns(directory, rows)
+            frame = pd.DataFrame({c: np.array(columns[c]) for c in CANDLE_COLUMNS})
+            del columns
+            frame = (frame.dropna()
+                          .drop_duplicates(subset='datetime', keep='last')
+                          .sort_values('datetime'))
+
+            # New files replace the old ones (which live memmaps may still use); the journal
+            # repairs a crash part-way through the swap on the next access
+            arrays = {c: frame[c].to_numpy() for c in CANDLE_COLUMNS}
+            journal_path = self._save_journal(directory, 0, arrays)
+            self._replace_columns(directory, arrays)
+            self._commit_rows(directory, len(frame), 0)
+            os.remove(journal_path)
+            return len(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the local candle store')
+    parser.add_argument('command', choices=['stats', 'compact'])
+    parser.add_argument('--symbol', type=str, default=None, help='Limit to one symbol')
+    parser.add_argument('--timeframe', type=str, default=None, help='Limit to one timeframe')
+    args = parser.parse_args()
+
+    store = CandleStore()
+    for symbol, timeframe in store.keys():
+        if args.symbol and symbol != args.symbol.upper():
+            continue
+        if args.timeframe and timeframe != args.timeframe:
+            continue
+        if args.command == 'compact':
+            rows = store.compact(symbol, timeframe)
+            print(f"{symbol} {timeframe}: compacted to {rows} rows")
+        else:
+            df = store.load(symbol, timeframe)
+            if df is None:
+                print(f"{symbol} {timeframe}: empty")
+            else:
+                print(f"{symbol} {timeframe}: {len(df)} rows "
+                      f"{df['datetime'].iloc[0]} -> {df['datetime'].iloc[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,33 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Real provider endpoints (also the upstreams mock_providers.py records from)
+UPSTREAM_URLS = {
+    "fmp": "https://financialmodelingprep.com/api/v3",
+    "twelvedata": "https://api.twelvedata.com",
+    "alphavantage": "https://www.alphavantage.co/query",
+    "newsapi": "https://newsapi.org/v2",
+    "newsdata": "https://newsdata.io/api/1",
+    "taapi": "https://api.taapi.io",
+    "finnhub": "https://finnhub.io/api/v1",
+    "polygon": "https://api.polygon.io"
+}
+
+def _endpoint(name):
+    """Provider base URL: the local stand-in server if MOCK_PROVIDERS_URL is set, else URL_<NAME> or upstream"""
+    mock = os.getenv("MOCK_PROVIDERS_URL")
+    if mock:
+        return f"{mock.rstrip('/')}/{name}"
+    return os.getenv(f"URL_{name.upper()}", UPSTREAM_URLS[name])
+
+def _symbols(name):
+    """Comma-separated symbol list from env var NAME (empty list if unset)"""
+    return [s.strip().upper() for s in os.getenv(name, "").split(",") if s.strip()]
+
 class Config:
     # API Keys (User must set these in .env)
     API_KEY_FMP = os.getenv("API_KEY_FMP", "DEMO_KEY")
@@ -18,6 +42,10 @@ class Config:
     # Trading Settings
     PAIRS = ["EURUSD", "USDJPY", "GBPUSD", "USDCAD", "GBPJPY", "XAUUSD", "XAGUSD"]
     TIMEFRAME = "15min"  # 15 minutes
+
+    # Concurrent scanning: pairs analyzed in parallel per cycle (1 = serial scan)
+    # Provider rate limits are still enforced inside DataLoader.
+    SCAN_MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "8"))
     
     # Valid symbols for trading (extend as needed)
     VALID_SYMBOLS = [
@@ -31,6 +59,16 @@ class Config:
         # Stocks (examples)
         "AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"
     ]
+    # Larger universes (crosses, metals, crypto, equities) are added via EXTRA_SYMBOLS=SYM1,SYM2,...
+    VALID_SYMBOLS = list(dict.fromkeys(VALID_SYMBOLS + _symbols("EXTRA_SYMBOLS")))
+
+    # Symbols scanned each background cycle (default: PAIRS); SCAN_SYMBOLS=ALL scans VALID_SYMBOLS
+    SCAN_SYMBOLS = (VALID_SYMBOLS if os.getenv("SCAN_SYMBOLS", "").strip().upper() == "ALL"
+                    else _symbols("SCAN_SYMBOLS") or PAIRS)
+
+    # Process-pool scanner: shard the scan over this many worker processes (0 = thread scanner).
+    # Each worker loads the ML model once; candles reach workers through shared memory.
+    SCAN_PROCESSES = int(os.getenv("SCAN_PROCESSES", "0"))
     
     # Risk Management
     RISK_PERCENT = 0.01  # 1% Account Risk
@@ -62,12 +100,85 @@ class Config:
     # Files
     LOG_FILE = "trading_engine.log"
 
-    # API Endpoints
-    URL_FMP = "https://financialmodelingprep.com/api/v3"
-    URL_TWELVEDATA = "https://api.twelvedata.com"
-    URL_ALPHAVANTAGE = "https://www.alphavantage.co/query"
-    URL_NEWSAPI = "https://newsapi.org/v2"
-    URL_NEWSDATA = "https://newsdata.io/api/1"
-    URL_TAAPI = "https://api.taapi.io"
-    URL_FINNHUB = "https://finnhub.io/api/v1"
-    URL_POLYGON = "https://api.polygon.io"
+    # Local candle store: history is kept on disk and only new bars are fetched
+    CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "data/candles")
+    CANDLE_FETCH_SIZE = 100  # Max bars requested per provider call
+    CANDLE_WINDOW = int(os.getenv("CANDLE_WINDOW", "100"))  # Bars handed to analysis each cycle
+    # Historical backfill (backfill.py): date ranges are split into chunks downloaded in parallel
+    BACKFILL_CHUNK_DAYS = int(os.getenv("BACKFILL_CHUNK_DAYS", "30"))
+    BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "4"))
+    BACKFILL_CHECKPOINT = os.getenv("BACKFILL_CHECKPOINT", "data/backfill_checkpoint.json")
+    # Symbols per TwelveData time_series request (each symbol still costs one credit)
+    TWELVEDATA_BATCH_SIZE = int(os.getenv("TWELVEDATA_BATCH_SIZE", "8"))
+
+    # API Rate Limits (token buckets shared by all DataLoaders)
+    # per_minute: refill rate, burst: bucket capacity, daily: quota reset at 00:00 UTC (None = unlimited)
+    RATE_LIMITS = {
+        "twelvedata": {
+            "per_minute": float(os.getenv("TWELVEDATA_PER_MINUTE", "8")),
+            "burst": int(os.getenv("TWELVEDATA_BURST", "8")),
+            "daily": int(os.getenv("TWELVEDATA_DAILY", "800"))
+        },
+        "polygon": {
+            "per_minute": float(os.getenv("POLYGON_PER_MINUTE", "5")),
+            "burst": int(os.getenv("POLYGON_BURST", "5")),
+            "daily": None
+        },
+        "alphavantage": {
+            "per_minute": float(os.getenv("ALPHAVANTAGE_PER_MINUTE", "5")),
+            "burst": int(os.getenv("ALPHAVANTAGE_BURST", "5")),
+            "daily": int(os.getenv("ALPHAVANTAGE_DAILY", "500"))
+        }
+    }
+    # "file" shares buckets across processes (gunicorn workers); "memory" is per process
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "file")
+    RATE_LIMIT_FILE = os.getenv("RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "trading_engine_rate_limits.json"))
+
+    # Provider health: HTTP timeout, rolling stats window and circuit breaker settings
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))  # seconds per request
+    NEWS_SOURCE_TIMEOUT = float(os.getenv("NEWS_SOURCE_TIMEOUT", "8"))  # seconds per news API call
+    NEWS_SEEN_CAPACITY = 10000  # recently ingested news IDs remembered to skip re-upserts
+    PROVIDER_HEALTH_WINDOW = 20  # recent calls kept per provider
+    BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures before a provider is skipped
+    BREAKER_COOLDOWN = 120  # seconds before a half-open probe
+    BREAKER_MAX_COOLDOWN = 1800  # cap for the doubling cooldown after failed probes
+
+    # Hedged fetches (opt-in): race the next provider after HEDGE_DELAY seconds without data
+    HEDGE_DELAY = float(os.getenv("HEDGE_DELAY", "1.5"))
+    HEDGE_INTERACTIVE = os.getenv("HEDGE_INTERACTIVE", "false").lower() == "true"
+
+    # Indicator backend for TechnicalAnalysis: "numpy" (indicator_kernels) or "ta" (reference library)
+    INDICATOR_BACKEND = os.getenv("INDICATOR_BACKEND", "numpy").lower()
+    # Low-memory indicator frames: OHLCV and indicators stored as float32 (computed in float64,
+    # rounded once on store; ~6e-8 relative error, see validate_indicator_parity.py)
+    LOW_MEMORY_INDICATORS = os.getenv("LOW_MEMORY_INDICATORS", "false").lower() == "true"
+
+    # Multi-timeframe confluence (opt-in): higher timeframes are resampled from the stored
+    # TIMEFRAME history, so they cost no extra API calls (needs ~50 bars per timeframe)
+    MTF_CONFLUENCE = os.getenv("MTF_CONFLUENCE", "false").lower() == "true"
+    MTF_TIMEFRAMES = ["1h", "4h"]
+    MTF_WEIGHT = 1.0  # score added when every higher timeframe agrees (scaled by agreement)
+
+    # Background scheduler: cycles fire on TIMEFRAME bar closes (UTC-aligned), SETTLE seconds
+    # after the close so providers have published the finished bar
+    SCHEDULE_SETTLE_SECONDS = float(os.getenv("SCHEDULE_SETTLE_SECONDS", "3"))
+
+    # Extra full-day market closures for session_calendar: "equities:2026-11-27,forex:2026-12-31"
+    MARKET_HOLIDAYS = os.getenv("MARKET_HOLIDAYS", "")
+
+    # Streaming ingestion: ticks are aggregated into these bar timeframes in memory
+    STREAM_ENABLED = os.getenv("STREAM_ENABLED", "false").lower() == "true"  # analyze on live bar close
+    STREAM_TIMEFRAMES = ["1min", "5min", "15min", "1h"]
+    STREAM_BAR_CAPACITY = int(os.getenv("STREAM_BAR_CAPACITY", "500"))  # closed bars kept per symbol/timeframe
+    STREAM_URL = os.getenv("STREAM_URL", "wss://ws.twelvedata.com/v1/quotes/price")
+
+    # API Endpoints (see _endpoint: URL_<NAME> or MOCK_PROVIDERS_URL env vars override)
+    MOCK_PROVIDERS_URL = os.getenv("MOCK_PROVIDERS_URL")
+    URL_FMP = _endpoint("fmp")
+    URL_TWELVEDATA = _endpoint("twelvedata")
+    URL_ALPHAVANTAGE = _endpoint("alphavantage")
+    URL_NEWSAPI = _endpoint("newsapi")
+    URL_NEWSDATA = _endpoint("newsdata")
+    URL_TAAPI = _endpoint("taapi")
+    URL_FINNHUB = _endpoint("finnhub")
+    URL_POLYGON = _endpoint("polygon")
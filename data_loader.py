@@ -2,26 +2,123 @@ import sqlite3
 import requests
 import pandas as pd
 import hashlib
+import threading
 import time as time_module
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
+from pymongo import UpdateOne
 from config import Config
 from utils import logger, get_db_connection
+from rate_limiter import get_rate_limiter
+from candle_store import CandleStore, timeframe_to_timedelta
+from provider_health import get_provider_health, parse_retry_after
+
+class SeenIdFilter:
+    """Bounded, thread-safe set of recently seen IDs (oldest evicted first)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def contains(self, item_id):
+        with self._lock:
+            if item_id in self._ids:
+                self._ids.move_to_end(item_id)
+                return True
+            return False
+
+    def add_many(self, item_ids):
+        with self._lock:
+            for item_id in item_ids:
+                self._ids[item_id] = None
+                self._ids.move_to_end(item_id)
+            while len(self._ids) > self.capacity:
+                self._ids.popitem(last=False)
+
+
+# News IDs already persisted, shared by every DataLoader in the process
+_seen_news_ids = SeenIdFilter(Config.NEWS_SEEN_CAPACITY)
+
 
 class DataLoader:
     def __init__(self):
         self.session = requests.Session()
-        self.last_api_call = {}  # Track last API call time for rate limiting
+        # Token buckets are shared by every DataLoader (and across processes with the file backend)
+        self.limiter = get_rate_limiter()
+        # Local candle history: only bars newer than the last stored one are fetched
+        self.store = CandleStore()
+        # Rolling latency/success stats and circuit breakers, shared by all DataLoaders
+        self.health = get_provider_health()
+        # Tokens already taken by a hedged launch, so the fetcher must not wait for another
+        self._prepaid = threading.local()
         # Cache symbols that TwelveData reports as unavailable on current plan
         self.td_unavailable = set()
 
-    def _rate_limit(self, api_name, min_delay=1.0):
-        """Enforce minimum delay between API calls"""
-        if api_name in self.last_api_call:
-            elapsed = time_module.time() - self.last_api_call[api_name]
-            if elapsed < min_delay:
-                time_module.sleep(min_delay - elapsed)
-        self.last_api_call[api_name] = time_module.time()
+    def _rate_limit(self, api_name, tokens=1):
+        """
+        Wait for a token from the shared provider bucket.
+        Returns False if the provider's daily quota is exhausted.
+        """
+        if getattr(self._prepaid, api_name, False):
+            setattr(self._prepaid, api_name, False)
+            return True
+        return self.limiter.acquire(api_name, tokens)
     
+    def _get(self, provider, url, params=None, timeout=None, throttled=None):
+        """
+        GET with a timeout (default Config.HTTP_TIMEOUT), recording the outcome in the provider health stats.
+        Transport errors and 5xx count as failures; 429 opens the breaker (honouring Retry-After).
+        throttled: fn(resp) -> True when a 2xx body reports rate limiting (providers that answer
+                   HTTP 200 with an error payload); checked before the outcome is recorded.
+        """
+        started = time_module.perf_counter()
+        try:
+            resp = self.session.get(url, params=params, timeout=timeout or Config.HTTP_TIMEOUT)
+        except Exception:
+            self.health.record_failure(provider, time_module.perf_counter() - started)
+            raise
+        latency = time_module.perf_counter() - started
+        if resp.status_code == 429:
+            retry_after = parse_retry_after(resp.headers.get('Retry-After'))
+            self.health.record_failure(provider, latency, rate_limited=True, retry_after=retry_after)
+        elif resp.status_code >= 500:
+            self.health.record_failure(provider, latency)
+        elif throttled is not None and self._body_throttled(throttled, resp):
+            self.health.record_failure(provider, latency, rate_limited=True)
+        else:
+            self.health.record_success(provider, latency)
+        return resp
+
+    @staticmethod
+    def _body_throttled(check, resp):
+        try:
+            return bool(check(resp.json()))
+        except ValueError:
+            return False  # Not JSON: the caller reports it
+
+    @staticmethod
+    def _twelvedata_throttled(data):
+        """Credit exhaustion: code 429 at the top level or in any batch entry"""
+        if not isinstance(data, dict):
+            return False
+        return data.get('code') == 429 or any(isinstance(e, dict) and e.get('code') == 429 for e in data.values())
+
+    @staticmethod
+    def _polygon_throttled(data):
+        if not isinstance(data, dict) or data.get('status') != 'ERROR':
+            return False
+        msg = str(data.get('error', data.get('message', ''))).lower()
+        return 'rate limit' in msg or 'exceeded' in msg
+
+    @staticmethod
+    def _alphavantage_throttled(data):
+        """Throttling is reported with HTTP 200 and a 'Note'/'Information' message instead of data"""
+        return (isinstance(data, dict) and bool(data.get('Note') or data.get('Information'))
+                and not any(key.startswith('Time Series') for key in data))
+
     def _generate_news_id(self, title, date):
         """Create a unique ID for news deduplication"""
         return hashlib.md5(f"{title}{date}".encode()).hexdigest()
@@ -29,41 +126,46 @@ class DataLoader:
     def save_news_to_db(self, news_items):
         """
         news_items: List of dicts {date, title, source, text, currency}
+        Articles already ingested (per the shared seen-ID filter) are skipped before
+        touching the database; the rest go out in one unordered bulk_write whose
+        $setOnInsert never overwrites an existing article's sentiment_score.
         """
+        docs = {}
+        for item in news_items:
+            news_id = self._generate_news_id(item['title'], item['date'])
+            if news_id in docs or _seen_news_ids.contains(news_id):
+                continue
+            docs[news_id] = {
+                "id": news_id,
+                "date": item['date'],
+                "title": item['title'],
+                "source": item['source'],
+                "text": item['text'],
+                "sentiment_score": 0.0,
+                # Simple keyword matching for currency if not provided
+                "currency": item.get('currency', 'USD') # Default to USD relevance
+            }
+        if not docs:
+            return
+
         # Mongo Connection
         from utils import get_mongo_db
         db_mongo = get_mongo_db()
+        if db_mongo is None:
+            return
 
-        count = 0
-        for item in news_items:
-            # Simple keyword matching for currency if not provided
-            currency = item.get('currency', 'USD') # Default to USD relevance
-            
-            news_id = self._generate_news_id(item['title'], item['date'])
-            
-            try:
-                # Mongo Save (Upsert)
-                if db_mongo is not None:
-                     db_mongo.news.update_one(
-                        {"id": news_id},
-                        {"$set": {
-                            "id": news_id,
-                            "date": item['date'],
-                            "title": item['title'],
-                            "source": item['source'],
-                            "text": item['text'],
-                            "sentiment_score": 0.0,
-                            "currency": currency
-                        }},
-                        upsert=True
-                     )
-                     count += 1
-            except Exception as e:
-                logger.error(f"Error saving news to Mongo: {e}")
-                continue
+        try:
+            result = db_mongo.news.bulk_write(
+                [UpdateOne({"id": news_id}, {"$setOnInsert": doc}, upsert=True) for news_id, doc in docs.items()],
+                ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Error saving news to Mongo: {e}")
+            return
+        _seen_news_ids.add_many(docs)
         
-        if count > 0:
-            logger.info(f"Saved {count} new news items to MongoDB.")
+        if result.upserted_count > 0:
+            logger.info(f"Saved {result.upserted_count} new news items to MongoDB.")
 
     def fetch_news_fmp(self):
         """Fetch news from Financial Modeling Prep"""
@@ -72,7 +174,7 @@ class DataLoader:
             
         url = f"{Config.URL_FMP}/fmp/articles?page=0&size=50&apikey={Config.API_KEY_FMP}"
         try:
-            resp = self.session.get(url)
+            resp = self._get('fmp', url, timeout=Config.NEWS_SOURCE_TIMEOUT)
             if resp.status_code == 200:
                 data = resp.json()
                 news = []
@@ -100,7 +202,7 @@ class DataLoader:
             # NewsData.io implementation
             url = f"{Config.URL_NEWSDATA}/news?apikey={Config.API_KEY_NEWSAPI}&q=forex OR inflation&language=en"
             try:
-                resp = self.session.get(url)
+                resp = self._get('newsdata', url, timeout=Config.NEWS_SOURCE_TIMEOUT)
                 if resp.status_code == 200:
                     data = resp.json()
                     articles = data.get('results', [])
@@ -124,7 +226,7 @@ class DataLoader:
         # Searching for keywords like 'forex', 'central bank', 'inflation'
         url = f"{Config.URL_NEWSAPI}/everything?q=forex OR inflation OR 'central bank'&sortBy=publishedAt&apiKey={Config.API_KEY_NEWSAPI}"
         try:
-            resp = self.session.get(url)
+            resp = self._get('newsapi', url, timeout=Config.NEWS_SOURCE_TIMEOUT)
             if resp.status_code == 200:
                 articles = resp.json().get('articles', [])
                 news = []
@@ -150,7 +252,7 @@ class DataLoader:
             
         url = f"{Config.URL_FINNHUB}/news?category=forex&token={Config.API_KEY_FINNHUB}"
         try:
-            resp = self.session.get(url)
+            resp = self._get('finnhub', url, timeout=Config.NEWS_SOURCE_TIMEOUT)
             if resp.status_code == 200:
                 data = resp.json()
                 news = []
@@ -169,18 +271,26 @@ class DataLoader:
             logger.error(f"Finnhub Fetch Error: {e}")
         return []
 
-    def fetch_price_polygon(self, symbol, interval="15", outputsize=100):
-        """Fetch forex candles from Polygon.io"""
+    def fetch_price_polygon(self, symbol, interval="15", outputsize=100, start=None, end=None):
+        """Fetch forex candles from Polygon.io (only bars from `start` onwards / up to `end` if given)"""
         if Config.API_KEY_POLYGON == "DEMO_KEY":
             return None
         
         # Rate limiting: Polygon free tier has 5 calls/minute limit
-        self._rate_limit('polygon', min_delay=12.0)
+        if not self._rate_limit('polygon'):
+            return None
         
         # Polygon Symbol format: C:EURUSD (e.g. C:XAUUSD)
         ticker = f"C:{symbol}"
-        end = datetime.now().strftime('%Y-%m-%d')
-        start = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        if end is not None:
+            end = int(pd.Timestamp(end).value // 10**6)
+        else:
+            end = datetime.now().strftime('%Y-%m-%d')
+        if start is not None:
+            # Range endpoint accepts millisecond timestamps for incremental fetches
+            start = int(pd.Timestamp(start).value // 10**6)
+        else:
+            start = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
         
         # Requests handles params better
         url = f"{Config.URL_POLYGON}/v2/aggs/ticker/{ticker}/range/{interval}/minute/{start}/{end}"
@@ -192,7 +302,7 @@ class DataLoader:
         }
         
         try:
-            resp = self.session.get(url, params=params)
+            resp = self._get('polygon', url, params=params, throttled=self._polygon_throttled)
             
             # Handle rate limit (429) specifically
             if resp.status_code == 429:
@@ -211,6 +321,9 @@ class DataLoader:
                 return None
             
             # Accept OK or DELAYED. data['results'] must exist.
+            if data.get('status') in ('OK', 'DELAYED') and not data.get('resultsCount'):
+                # Answered, but no bars in the range (weekend, holiday): empty, not a failure
+                return pd.DataFrame(columns=['datetime', 'open', 'high', 'low', 'close'])
             if data.get('resultsCount', 0) > 0 and 'results' in data:
                 df = pd.DataFrame(data['results'])
                 df['datetime'] = pd.to_datetime(df['t'], unit='ms')
@@ -225,8 +338,44 @@ class DataLoader:
             logger.error(f"Polygon Exception for {symbol}: {e}")
         return None
 
-    def fetch_price_twelvedata(self, symbol, interval="15min", outputsize=100):
-        """Fetch forex candles from Twelve Data"""
+    @staticmethod
+    def _twelvedata_symbol(symbol):
+        """TwelveData prefers "EUR/USD" format"""
+        symbol = symbol.upper()
+        if len(symbol) == 6 and '/' not in symbol:
+            return f"{symbol[:3]}/{symbol[3:]}"
+        return symbol
+
+    @staticmethod
+    def _parse_twelvedata_values(values):
+        """TwelveData 'values' list -> ascending OHLCV DataFrame"""
+        df = pd.DataFrame(values)
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        df['open'] = df['open'].astype(float)
+        df['high'] = df['high'].astype(float)
+        df['low'] = df['low'].astype(float)
+        df['close'] = df['close'].astype(float)
+        df['volume'] = 0 
+        df = df.sort_values('datetime')
+        return df
+
+    def _handle_twelvedata_error(self, symbol, td_symbol, data):
+        msg = data.get('message') or str(data)
+        logger.error(f"TwelveData error for {symbol} ({td_symbol}): {msg}")
+        # Errors come back with HTTP 200; credit exhaustion (code 429) is recorded by _get
+        if data.get('code') == 429:
+            return
+        # Detect plan/availability related messages and cache the symbol to avoid repeated failing calls
+        lowered = (msg or "").lower()
+        if 'grow' in lowered or 'available starting' in lowered or 'plan' in lowered or 'not available' in lowered:
+            try:
+                self.td_unavailable.add(symbol.upper())
+                logger.info(f"Marked {symbol} as unavailable on TwelveData for this plan — will skip next time.")
+            except Exception:
+                pass
+
+    def fetch_price_twelvedata(self, symbol, interval="15min", outputsize=100, start=None, end=None):
+        """Fetch forex candles from Twelve Data (only bars from `start` onwards / up to `end` if given)"""
         if Config.API_KEY_TWELVEDATA == "DEMO_KEY":
             return None
 
@@ -235,15 +384,13 @@ class DataLoader:
             logger.info(f"Skipping TwelveData for {symbol} — previously marked unavailable on current plan.")
             return None
 
-        # Rate limiting: Wait at least 1 second between calls (free tier: 8 calls/min)
-        self._rate_limit('twelvedata', min_delay=1.0)
+        # Rate limiting: free tier allows 8 calls/min and 800/day
+        if not self._rate_limit('twelvedata'):
+            return None
 
-        # TwelveData prefers "EUR/USD" format
         # Ensure Uppercase
         symbol = symbol.upper()
-        td_symbol = symbol
-        if len(symbol) == 6 and '/' not in symbol:
-             td_symbol = f"{symbol[:3]}/{symbol[3:]}"
+        td_symbol = self._twelvedata_symbol(symbol)
              
         # Use params to handle encoding of "/"
         url = f"{Config.URL_TWELVEDATA}/time_series"
@@ -251,44 +398,81 @@ class DataLoader:
             "symbol": td_symbol,
             "interval": interval,
             "outputsize": outputsize,
+            "timezone": "UTC",  # Keep stored candles comparable across providers
             "apikey": Config.API_KEY_TWELVEDATA
         }
+        if start is not None:
+            params["start_date"] = pd.Timestamp(start).strftime('%Y-%m-%d %H:%M:%S')
+        if end is not None:
+            params["end_date"] = pd.Timestamp(end).strftime('%Y-%m-%d %H:%M:%S')
         
         try:
-            resp = self.session.get(url, params=params)
+            resp = self._get('twelvedata', url, params=params, throttled=self._twelvedata_throttled)
             data = resp.json()
             if 'values' in data:
-                df = pd.DataFrame(data['values'])
-                df['datetime'] = pd.to_datetime(df['datetime'])
-                df['open'] = df['open'].astype(float)
-                df['high'] = df['high'].astype(float)
-                df['low'] = df['low'].astype(float)
-                df['close'] = df['close'].astype(float)
-                df['volume'] = 0 
-                df = df.sort_values('datetime')
-                return df
-            else:
-                msg = data.get('message') or str(data)
-                logger.error(f"TwelveData error for {symbol} ({td_symbol}): {msg}")
-                # Detect plan/availability related messages and cache the symbol to avoid repeated failing calls
-                lowered = (msg or "").lower()
-                if 'grow' in lowered or 'available starting' in lowered or 'plan' in lowered or 'not available' in lowered:
-                    try:
-                        self.td_unavailable.add(symbol.upper())
-                        logger.info(f"Marked {symbol} as unavailable on TwelveData for this plan — will skip next time.")
-                    except Exception:
-                        pass
+                return self._parse_twelvedata_values(data['values'])
+            if data.get('code') == 400 and 'no data is available' in str(data.get('message', '')).lower():
+                # Answered, but no bars in the range (weekend, holiday): empty, not a failure
+                return pd.DataFrame(columns=['datetime', 'open', 'high', 'low', 'close', 'volume'])
+            self._handle_twelvedata_error(symbol, td_symbol, data)
         except Exception as e:
             logger.error(f"TwelveData Exception: {e}")
         return None
 
+    def fetch_price_twelvedata_batch(self, symbols, interval="15min", outputsize=100):
+        """
+        Fetch candles for several symbols with one TwelveData time_series call.
+        Returns {symbol: DataFrame} for the symbols that came back with data.
+        """
+        if Config.API_KEY_TWELVEDATA == "DEMO_KEY" or not symbols:
+            return {}
+
+        symbols = [s.upper() for s in symbols if s.upper() not in self.td_unavailable]
+        if not symbols:
+            return {}
+
+        # TwelveData bills one credit per symbol, batched or not
+        if not self._rate_limit('twelvedata', tokens=len(symbols)):
+            return {}
+
+        td_symbols = {self._twelvedata_symbol(s): s for s in symbols}
+        url = f"{Config.URL_TWELVEDATA}/time_series"
+        params = {
+            "symbol": ",".join(td_symbols),
+            "interval": interval,
+            "outputsize": outputsize,
+            "timezone": "UTC",
+            "apikey": Config.API_KEY_TWELVEDATA
+        }
+
+        frames = {}
+        try:
+            resp = self._get('twelvedata', url, params=params, throttled=self._twelvedata_throttled)
+            data = resp.json()
+            # A single symbol comes back un-nested
+            if len(td_symbols) == 1:
+                data = {next(iter(td_symbols)): data}
+            for td_symbol, symbol in td_symbols.items():
+                entry = data.get(td_symbol)
+                if not isinstance(entry, dict):
+                    # Whole request rejected (e.g. bad key): top-level message applies to all
+                    entry = data if 'message' in data else {}
+                if 'values' in entry:
+                    frames[symbol] = self._parse_twelvedata_values(entry['values'])
+                else:
+                    self._handle_twelvedata_error(symbol, td_symbol, entry)
+        except Exception as e:
+            logger.error(f"TwelveData Batch Exception: {e}")
+        return frames
+
     def fetch_price_alphavantage(self, symbol, interval="15min"):
         """Backup: Fetch forex candles from Alpha Vantage"""
         if Config.API_KEY_ALPHAVANTAGE == "DEMO_KEY":
             return None
         
         # Rate limiting: AlphaVantage free tier has 5 calls/minute, 500 calls/day
-        self._rate_limit('alphavantage', min_delay=12.0)
+        if not self._rate_limit('alphavantage'):
+            return None
         
         # AV uses from/to currency format, e.g., EUR to USD
         # Assuming symbol is like EURUSD, we split it.
@@ -298,7 +482,7 @@ class DataLoader:
         
         url = f"{Config.URL_ALPHAVANTAGE}?function=FX_INTRADAY&from_symbol={from_currency}&to_symbol={to_currency}&interval={interval}&apikey={Config.API_KEY_ALPHAVANTAGE}"
         try:
-            resp = self.session.get(url)
+            resp = self._get('alphavantage', url, throttled=self._alphavantage_throttled)
             data = resp.json()
             key_name = f"Time Series FX ({interval})"
             if key_name in data:
@@ -334,7 +518,7 @@ class DataLoader:
         # Trying generic request.
         url = f"{Config.URL_TAAPI}/{indicator}?secret={Config.API_KEY_TAAPI}&symbol={symbol}&interval={interval}"
         try:
-             resp = self.session.get(url)
+             resp = self._get('taapi', url)
              if resp.status_code == 200:
                  return resp.json().get('value')
              else:
@@ -343,29 +527,206 @@ class DataLoader:
             logger.error(f"Taapi Exception: {e}")
         return None
 
-    def fetch_market_data(self, symbol):
-        """Try TwelveData first (most reliable), then Polygon, fall back to AlphaVantage"""
-        # TwelveData is prioritized as it's working reliably
-        df = self.fetch_price_twelvedata(symbol)
-        
-        if df is None or df.empty:
-            logger.info(f"TwelveData failed/skipped for {symbol}, trying Polygon...")
-            df = self.fetch_price_polygon(symbol)
-            
+    def _plan_fetch(self, symbol, timeframe):
+        """
+        Decide how many bars to request for symbol.
+        Returns (start, outputsize): start is the last stored bar (re-requested because
+        it may still have been forming) or None when a full window is needed.
+        """
+        last = self.store.last_timestamp(symbol, timeframe)
+        if last is not None:
+            missing = int((pd.Timestamp(datetime.utcnow()) - last) / timeframe_to_timedelta(timeframe)) + 1
+            if missing < Config.CANDLE_FETCH_SIZE:
+                return last, max(missing, 1) + 1
+        return None, Config.CANDLE_FETCH_SIZE
+
+    def _store_candles(self, symbol, timeframe, df):
+        """Merge fetched bars into the candle store and return the analysis window"""
         if df is None or df.empty:
-            logger.warning(f"Polygon failed for {symbol}, trying AlphaVantage...")
-            df = self.fetch_price_alphavantage(symbol)
-        return df
+            return df
+        try:
+            self.store.append(symbol, timeframe, df)
+            # A copy, so the next fetch's in-place rewrite of the stored tail can't change it
+            window = self.store.load(symbol, timeframe, limit=Config.CANDLE_WINDOW, copy=True)
+        except Exception as e:
+            logger.error(f"Candle store write error for {symbol}: {e}")
+            return df
+        return window if window is not None else df
+
+    def fetch_market_data(self, symbol, hedge=False):
+        """
+        Walk the provider chain (TwelveData, Polygon, AlphaVantage by default) ordered
+        fastest-healthy-first, skipping providers whose circuit breaker is open.
+        With hedge=True, later providers are raced against slow earlier ones (see _fetch_hedged).
+        Only bars after the last stored candle are requested; the fresh bars are merged
+        into the local candle store and the latest Config.CANDLE_WINDOW bars are returned.
+        """
+        timeframe = Config.TIMEFRAME
+        start, outputsize = self._plan_fetch(symbol, timeframe)
+
+        fetchers = {
+            'twelvedata': lambda: self.fetch_price_twelvedata(symbol, outputsize=outputsize, start=start),
+            'polygon': lambda: self.fetch_price_polygon(symbol, outputsize=outputsize, start=start),
+            'alphavantage': lambda: self.fetch_price_alphavantage(symbol)
+        }
+
+        order = self.health.ranked(list(fetchers))
+        if hedge:
+            return self._store_candles(symbol, timeframe, self._fetch_hedged(symbol, fetchers, order))
+
+        df = None
+        for provider in order:
+            if not self.health.allow(provider):
+                logger.info(f"Skipping {provider} for {symbol} — circuit open.")
+                continue
+            df = fetchers[provider]()
+            if df is not None and not df.empty:
+                break
+            logger.info(f"{provider} failed/skipped for {symbol}, trying next provider...")
+
+        return self._store_candles(symbol, timeframe, df)
+
+    def _fetch_hedged(self, symbol, fetchers, order):
+        """
+        Hedged provider race for latency-critical (interactive) lookups.
+        The first provider starts at once; every Config.HEDGE_DELAY seconds without a
+        valid frame, the next provider is fired in parallel, but only if its token bucket
+        can pay right now, so hedging never borrows against the shared rate budget.
+        When every in-flight request has failed, the next provider starts normally.
+        The first non-empty frame wins; slower requests are left to finish and ignored.
+        """
+        def run(provider, prepaid):
+            if prepaid:
+                setattr(self._prepaid, provider, True)
+            try:
+                return fetchers[provider]()
+            finally:
+                if getattr(self._prepaid, provider, False):
+                    # Returned before _rate_limit (DEMO_KEY, unavailable symbol): token unspent
+                    setattr(self._prepaid, provider, False)
+                    self.limiter.release(provider)
+
+        # Breakers are asked right before each submit: allow() claims a half-open probe
+        # slot, which must not be held by a provider this race never gets to
+        remaining = list(order)
+        pool = ThreadPoolExecutor(max_workers=max(1, len(remaining)), thread_name_prefix="hedge")
+        in_flight = {}
+        try:
+            while remaining or in_flight:
+                if not in_flight:
+                    provider = remaining.pop(0)
+                    if not self.health.allow(provider):
+                        logger.info(f"Skipping {provider} for {symbol} — circuit open.")
+                        continue
+                    in_flight[pool.submit(run, provider, False)] = provider
+                done, _ = wait(in_flight, timeout=Config.HEDGE_DELAY if remaining else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = in_flight.pop(future)
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        logger.error(f"Hedged {provider} request for {symbol} raised: {e}")
+                        df = None
+                    if df is not None and not df.empty:
+                        logger.info(f"Hedged fetch for {symbol} served by {provider}.")
+                        return df
+                if remaining and in_flight:
+                    # Still waiting: hedge with the next provider that has a token to spare
+                    for provider in list(remaining):
+                        if self.limiter.try_acquire(provider):
+                            remaining.remove(provider)
+                            if not self.health.allow(provider):
+                                self.limiter.release(provider)
+                                continue
+                            in_flight[pool.submit(run, provider, True)] = provider
+                            logger.info(f"Hedging {symbol} with {provider} after {Config.HEDGE_DELAY}s.")
+                            break
+            return None
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_market_data_many(self, symbols, max_workers=None):
+        """
+        Fetch candles for many symbols with as few TwelveData requests as the plan allows.
+        Symbols are grouped by how many bars they need, sent in batches of
+        Config.TWELVEDATA_BATCH_SIZE, and only the symbols a batch could not serve fall back
+        to the per-symbol provider chain of fetch_market_data, run concurrently
+        (max_workers, default Config.SCAN_MAX_WORKERS).
+        Returns {symbol: DataFrame or None}.
+        """
+        timeframe = Config.TIMEFRAME
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        results = {}
+
+        # Full-window symbols and incremental symbols need different outputsize values
+        groups = {}
+        for symbol in symbols:
+            start, outputsize = self._plan_fetch(symbol, timeframe)
+            key = 'full' if start is None else 'incremental'
+            groups.setdefault(key, []).append((symbol, outputsize))
+
+        for members in groups.values():
+            for i in range(0, len(members), Config.TWELVEDATA_BATCH_SIZE):
+                if not self.health.allow('twelvedata'):
+                    break
+                batch = members[i:i + Config.TWELVEDATA_BATCH_SIZE]
+                # Overlap with stored bars is de-duplicated on merge
+                outputsize = max(size for _, size in batch)
+                frames = self.fetch_price_twelvedata_batch([s for s, _ in batch], outputsize=outputsize)
+                for symbol, df in frames.items():
+                    if df is not None and not df.empty:
+                        results[symbol] = self._store_candles(symbol, timeframe, df)
+
+        missed = [symbol for symbol in symbols if symbol not in results]
+        if missed:
+            logger.info(f"Batch fetch missed {', '.join(missed)}, falling back to per-symbol providers...")
+            # Provider token buckets still pace these; the pool only overlaps their latency
+            workers = max(1, min(max_workers or Config.SCAN_MAX_WORKERS, len(missed)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+                for symbol, df in zip(missed, pool.map(self.fetch_market_data, missed)):
+                    results[symbol] = df
+        return results
 
     def fetch_all_news(self):
-        """Aggregates news from all sources"""
-        all_news = []
-        n1 = self.fetch_news_fmp()
-        n2 = self.fetch_news_newsapi()
-        n3 = self.fetch_news_finnhub()
-        
-        if n1: all_news.extend(n1)
-        if n2: all_news.extend(n2)
-        if n3: all_news.extend(n3)
-        
-        self.save_news_to_db(all_news)
+        """
+        Aggregates news from all sources, fetched concurrently.
+        Each source's items are saved as soon as that source returns, so one slow API
+        doesn't hold back the others. Returns {source: {'items': n, 'seconds': t}}.
+        """
+        sources = {
+            'FMP': self.fetch_news_fmp,
+            'NewsAPI': self.fetch_news_newsapi,
+            'Finnhub': self.fetch_news_finnhub
+        }
+
+        def timed_fetch(fetch):
+            started = time_module.perf_counter()
+            items = fetch() or []
+            return items, time_module.perf_counter() - started
+
+        stats = {}
+        pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="news")
+        futures = {pool.submit(timed_fetch, fetch): name for name, fetch in sources.items()}
+        try:
+            # HTTP calls carry their own per-source timeout; this only guards against a hung source
+            for future in as_completed(futures, timeout=2 * Config.NEWS_SOURCE_TIMEOUT):
+                name = futures[future]
+                try:
+                    items, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"{name} news fetch failed: {e}")
+                    continue
+                stats[name] = {'items': len(items), 'seconds': round(seconds, 2)}
+                if items:
+                    self.save_news_to_db(items)
+        except FuturesTimeoutError:
+            late = [name for future, name in futures.items() if not future.done()]
+            logger.warning(f"News sources timed out: {', '.join(late)}")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        if stats:
+            summary = ", ".join(f"{name}: {s['items']} items in {s['seconds']:.2f}s" for name, s in stats.items())
+            logger.info(f"News fetch — {summary}")
+        return stats
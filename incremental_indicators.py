@@ -0,0 +1,301 @@
+"""
+Incremental (Streaming) Indicators
+==================================
+Stateful per-symbol versions of every column TechnicalAnalysis.add_indicators
+produces, updated in O(1) per new bar instead of recomputing the whole frame:
+
+- EMA / MACD / RSI (Wilder) / OBV-EMA / RSI-EMA: exponential state that follows
+  pandas' ewm recursion step for step (adjust=True and adjust=False variants)
+- ATR: Wilder smoothing seeded with the mean of the first 14 true ranges (as in ta)
+- Stochastic: rolling high/low via monotonic deques
+- Bollinger / volatility / volume SMA: rolling mean and variance with O(1)
+  add/remove updates (compensated Welford, as pandas' rolling var)
+
+Feeding a frame bar by bar from its first row reproduces add_indicators on that
+frame (see validate_indicator_parity.py). A state is `ready` once every column is
+defined, i.e. from the first row add_indicators would keep after dropna().
+"""
+
+import math
+import threading
+from collections import deque
+
+NAN = float('nan')
+
+INDICATOR_COLUMNS = [
+    'ema_20', 'ema_50', 'rsi', 'macd', 'macd_signal', 'macd_diff', 'atr',
+    'stoch_k', 'stoch_d', 'bb_upper', 'bb_middle', 'bb_lower', 'bb_width', 'bb_pct',
+    'obv', 'obv_ema', 'price_change', 'volatility', 'momentum', 'rsi_ema',
+    'volume_sma', 'atr_pct', 'high_low_pct'
+]
+
+
+def _divide(a, b):
+    """a / b with numpy semantics (inf / nan instead of ZeroDivisionError)"""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _Ewm:
+    """pandas Series.ewm(...).mean() for one value at a time (ignore_na=False)"""
+
+    def __init__(self, span=None, alpha=None, adjust=True, min_periods=0):
+        # pandas derives alpha through the centre of mass; do the same for identical rounding
+        com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1.0
+        alpha = 1.0 / (1.0 + com)
+        self.factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x):
+        is_obs = x == x
+        self.nobs += is_obs
+        if self.weighted == self.weighted:
+            self.old_wt *= self.factor
+            if is_obs:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + self.new_wt * x) / (self.old_wt + self.new_wt)
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif is_obs:
+            self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class _Rolling:
+    """Rolling mean/std over a fixed window with O(1) add/remove (like pandas roll_var)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.comp = 0.0
+
+    def _add(self, x):
+        n = len(self.values)
+        prev_mean = self.mean - self.comp
+        y = x - self.comp
+        t = y - self.mean
+        self.comp = t + self.mean - y
+        self.mean += t / n
+        self.ssqdm += (x - prev_mean) * (x - self.mean)
+
+    def _remove(self, x):
+        n = len(self.values)
+        if n == 0:
+            self.mean = self.ssqdm = self.comp = 0.0
+            return
+        prev_mean = self.mean - self.comp
+        y = x - self.comp
+        t = y - self.mean
+        self.comp = t + self.mean - y
+        self.mean -= t / n
+        self.ssqdm -= (x - prev_mean) * (x - self.mean)
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self._remove_oldest()
+        self.values.append(x)
+        self._add(x)
+
+    def _remove_oldest(self):
+        x = self.values.popleft()
+        self._remove(x)
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+    def avg(self):
+        return self.mean if self.full else NAN
+
+    def std(self, ddof):
+        if not self.full:
+            return NAN
+        n = len(self.values)
+        if n == 1:
+            return 0.0
+        return math.sqrt(max(self.ssqdm, 0.0) / (n - ddof))
+
+
+class _RollingExtreme:
+    """Rolling max (or min) over a window via a monotonic deque: amortised O(1) per bar"""
+
+    def __init__(self, window, is_max=True):
+        self.window = window
+        self.is_max = is_max
+        self.deque = deque()  # (index, value), values monotonic
+        self.index = -1
+
+    def update(self, x):
+        self.index += 1
+        dq = self.deque
+        if self.is_max:
+            while dq and dq[-1][1] <= x:
+                dq.pop()
+        else:
+            while dq and dq[-1][1] >= x:
+                dq.pop()
+        dq.append((self.index, x))
+        if dq[0][0] <= self.index - self.window:
+            dq.popleft()
+        return dq[0][1] if self.index >= self.window - 1 else NAN
+
+
+class IndicatorState:
+    """All add_indicators columns for one symbol, advanced one bar at a time"""
+
+    def __init__(self, has_volume=True):
+        """
+        Args:
+            has_volume: Mirror add_indicators on a frame with a volume column
+                        (False: obv/obv_ema/volume_sma are 0)
+        """
+        self.has_volume = has_volume
+        self.bars = 0
+        self.prev_close = NAN
+        self.closes = deque(maxlen=11)  # momentum: close - close 10 bars ago
+
+        self.ema_20 = _Ewm(span=20, adjust=False, min_periods=20)
+        self.ema_50 = _Ewm(span=50, adjust=False, min_periods=50)
+        self.ema_12 = _Ewm(span=12, adjust=False, min_periods=12)
+        self.ema_26 = _Ewm(span=26, adjust=False, min_periods=26)
+        self.macd_signal = _Ewm(span=9, adjust=False, min_periods=9)
+        self.rsi_up = _Ewm(alpha=1 / 14, adjust=False, min_periods=14)
+        self.rsi_down = _Ewm(alpha=1 / 14, adjust=False, min_periods=14)
+        self.rsi_ema = _Ewm(span=9, adjust=True)
+        self.obv_ema = _Ewm(span=20, adjust=True)
+
+        self.tr_seed = []
+        self.atr = 0.0
+        self.stoch_high = _RollingExtreme(14, is_max=True)
+        self.stoch_low = _RollingExtreme(14, is_max=False)
+        self.stoch_k = deque(maxlen=3)
+
+        self.bb = _Rolling(20)  # close: Bollinger (ddof=0) and volatility (ddof=1)
+        self.volume = _Rolling(20)
+        self.obv = 0.0
+        self.values = dict.fromkeys(INDICATOR_COLUMNS, NAN)
+
+    @property
+    def ready(self):
+        """True once every column is defined (the row would survive add_indicators' dropna)"""
+        return all(v == v for v in self.values.values())
+
+    def update(self, high, low, close, volume=0.0):
+        """Advance one bar; returns the indicator values for it (dict keyed by INDICATOR_COLUMNS)"""
+        v = self.values
+        prev_close = self.prev_close
+        i = self.bars
+
+        # EMA / MACD
+        v['ema_20'] = self.ema_20.update(close)
+        v['ema_50'] = self.ema_50.update(close)
+        macd = self.ema_12.update(close) - self.ema_26.update(close)
+        v['macd'] = macd
+        v['macd_signal'] = self.macd_signal.update(macd)
+        v['macd_diff'] = macd - v['macd_signal']
+
+        # RSI (Wilder); the first bar's undefined change counts as 0 in ta
+        diff = close - prev_close
+        up = self.rsi_up.update(diff if diff > 0 else 0.0)
+        down = self.rsi_down.update(-diff if diff < 0 else 0.0)
+        v['rsi'] = 100.0 if down == 0 else 100.0 - 100.0 / (1.0 + _divide(up, down))
+        v['rsi_ema'] = self.rsi_ema.update(v['rsi'])
+
+        # ATR: 0 until the seed window is full, then Wilder smoothing
+        tr = high - low if prev_close != prev_close else max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if i < 14:
+            self.tr_seed.append(tr)
+            if i == 13:
+                self.atr = sum(self.tr_seed) / 14.0
+                self.tr_seed = None
+        else:
+            self.atr = (self.atr * 13 + tr) / 14.0
+        v['atr'] = self.atr
+
+        # Stochastic
+        smax = self.stoch_high.update(high)
+        smin = self.stoch_low.update(low)
+        k = 100 * _divide(close - smin, smax - smin) if smax == smax else NAN
+        self.stoch_k.append(k)
+        v['stoch_k'] = k
+        v['stoch_d'] = sum(self.stoch_k) / 3.0 if len(self.stoch_k) == 3 else NAN
+
+        # Bollinger Bands and close volatility
+        self.bb.update(close)
+        mavg = self.bb.avg()
+        mstd = self.bb.std(ddof=0)
+        v['bb_middle'] = mavg
+        v['bb_upper'] = mavg + 2 * mstd
+        v['bb_lower'] = mavg - 2 * mstd
+        v['bb_width'] = _divide(v['bb_upper'] - v['bb_lower'], mavg) * 100
+        band = v['bb_upper'] - v['bb_lower']
+        v['bb_pct'] = (close - v['bb_lower']) / band if band == band and band != 0 else NAN
+        v['volatility'] = self.bb.std(ddof=1)
+
+        # Volume features
+        if self.has_volume:
+            self.obv += -volume if close < prev_close else volume
+            v['obv'] = self.obv
+            v['obv_ema'] = self.obv_ema.update(self.obv)
+            self.volume.update(volume)
+            v['volume_sma'] = self.volume.avg()
+        else:
+            v['obv'] = v['obv_ema'] = v['volume_sma'] = 0
+
+        # Derived features
+        v['price_change'] = _divide(close, prev_close) - 1 if prev_close == prev_close else NAN
+        self.closes.append(close)
+        v['momentum'] = close - self.closes[0] if len(self.closes) == 11 else NAN
+        v['atr_pct'] = _divide(self.atr, close) * 100
+        v['high_low_pct'] = _divide(high - low, close) * 100
+
+        self.prev_close = close
+        self.bars += 1
+        return v
+
+
+class IncrementalIndicators:
+    """Per-symbol IndicatorState registry (thread-safe)"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def warm_up(self, symbol, df):
+        """Replace symbol's state by replaying a candle frame; returns the last row's values"""
+        state = IndicatorState(has_volume='volume' in df.columns)
+        values = None
+        volumes = df['volume'].tolist() if state.has_volume else [0.0] * len(df)
+        for high, low, close, volume in zip(df['high'].tolist(), df['low'].tolist(), df['close'].tolist(), volumes):
+            values = state.update(high, low, close, volume)
+        with self._lock:
+            self._states[symbol] = state
+        return dict(values) if values else None
+
+    def update(self, symbol, high, low, close, volume=0.0):
+        """Apply one new closed bar for symbol; returns its indicator values"""
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                state = self._states[symbol] = IndicatorState()
+        return dict(state.update(high, low, close, volume))
+
+    def latest(self, symbol):
+        """Values after the last applied bar, or None if symbol has no state"""
+        with self._lock:
+            state = self._states.get(symbol)
+        return dict(state.values) if state else None
+
+    def is_ready(self, symbol):
+        with self._lock:
+            state = self._states.get(symbol)
+        return bool(state and state.ready)
@@ -0,0 +1,422 @@
+"""
+Numpy Indicator Kernels
+=======================
+Self-contained vectorized implementations of the indicators TechnicalAnalysis
+takes from `ta`, without per-call Series/indicator objects:
+
+- Exponential averages (EMA, MACD, Wilder RSI, ATR smoothing) run as first-order
+  recursive filters (scipy.signal.lfilter when available, pandas ewm otherwise)
+- Rolling means use cumulative sums (re-anchored per row to limit rounding);
+  rolling std reduces over chunked sliding windows, so memory stays bounded and
+  the variance keeps two-pass accuracy over millions of bars
+- Rolling max / min use the van Herk / Gil-Werman block scan: O(n) whatever the
+  window, which also makes swing-point (pivot) detection linear in the bar count
+
+IndicatorGraph computes columns on demand: a consumer asks for the columns it
+reads (e.g. SIGNAL_COLUMNS for rules-only scoring) and only those plus their
+dependencies run, each once.
+
+Every kernel works along the last axis of a 1D (bars,) or 2D (symbols, bars)
+array. Rows may start with NaN padding (shorter history); each row then matches
+the `ta` result on its unpadded series. Interior NaNs in the inputs are not
+supported, as with the candle data the engine produces.
+
+Selected with Config.INDICATOR_BACKEND = "numpy" (default) or "ta".
+Parity with `ta` and benchmarks: validate_indicator_parity.py
+"""
+
+import numpy as np
+import pandas as pd
+from incremental_indicators import INDICATOR_COLUMNS
+
+try:
+    from scipy.signal import lfilter
+except ImportError:
+    lfilter = None
+
+WINDOW_CHUNK = 1 << 18  # bars per sliding-window block (bounds temporary memory)
+
+
+def _first_valid(x):
+    """Index of the first non-NaN value along the last axis (len if none)"""
+    valid = ~np.isnan(x)
+    first = np.argmax(valid, axis=-1)
+    return np.where(valid.any(axis=-1), first, x.shape[-1])
+
+
+def _positions(x):
+    return np.broadcast_to(np.arange(x.shape[-1]), x.shape)
+
+
+def _alpha(span=None, alpha=None):
+    # Same centre-of-mass route as pandas, for identical rounding of alpha
+    com = (span - 1) / 2.0 if span is not None else 1.0 / alpha - 1.0
+    return 1.0 / (1.0 + com)
+
+
+def _recursive_filter(x, decay, gain, initial):
+    """y[t] = decay * y[t-1] + gain * x[t] along the last axis, with y[-1] = initial"""
+    if lfilter is not None:
+        zi = (decay * np.asarray(initial, dtype='float64'))[..., None]
+        y, _ = lfilter([gain], [1.0, -decay], x, axis=-1, zi=zi)
+        return y
+    # Fallback: pandas' ewm(adjust=False) runs z[t] = decay * z[t-1] + (1 - decay) * x[t];
+    # scale by gain / (1 - decay) and prepend the initial state as an extra first sample
+    alpha = 1.0 - decay
+    rows = np.atleast_2d(x)
+    seeded = np.concatenate([np.reshape(initial, (-1, 1)) * alpha / gain, rows], axis=1)
+    z = pd.DataFrame(seeded.T).ewm(alpha=alpha, adjust=False).mean().to_numpy().T[:, 1:]
+    return (z * gain / alpha).reshape(np.shape(x))
+
+
+def ema(x, span=None, alpha=None, adjust=False, min_periods=0):
+    """pandas .ewm(span|alpha, adjust, min_periods).mean() for series without interior NaNs"""
+    x = np.asarray(x, dtype='float64')
+    a = _alpha(span, alpha)
+    first = _first_valid(x)
+    pos = _positions(x)
+    started = pos >= first[..., None]
+    if adjust:
+        filled = np.where(started, x, 0.0)
+        numerator = _recursive_filter(filled, 1.0 - a, 1.0, np.zeros(x.shape[:-1]))
+        denominator = _recursive_filter(started.astype('float64'), 1.0 - a, 1.0, np.zeros(x.shape[:-1]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            y = numerator / denominator
+    else:
+        # Fill the padding with the first value: the recursion then sits at x0 until data starts
+        x0 = np.take_along_axis(x, np.minimum(first, x.shape[-1] - 1)[..., None], axis=-1)[..., 0]
+        filled = np.where(started, x, x0[..., None])
+        y = _recursive_filter(filled, 1.0 - a, a, x0)
+    return np.where(pos >= (first + max(min_periods, 1) - 1)[..., None], y, np.nan)
+
+
+def rolling_mean(x, window):
+    """Rolling mean with min_periods=window (NaN where the window has any NaN)"""
+    x = np.asarray(x, dtype='float64')
+    valid = ~np.isnan(x)
+    first = np.minimum(_first_valid(x), x.shape[-1] - 1)
+    reference = np.take_along_axis(x, first[..., None], axis=-1)
+    reference = np.where(np.isnan(reference), 0.0, reference)
+    shifted = np.where(valid, x - reference, 0.0)
+    pad = np.zeros(x.shape[:-1] + (1,))
+    sums = np.cumsum(np.concatenate([pad, shifted], axis=-1), axis=-1)
+    counts = np.cumsum(np.concatenate([pad, valid.astype('int64')], axis=-1), axis=-1)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window:
+        window_sum = sums[..., window:] - sums[..., :-window]
+        window_count = counts[..., window:] - counts[..., :-window]
+        out[..., window - 1:] = np.where(window_count == window, window_sum / window + reference, np.nan)
+    return out
+
+
+def _window_reduce(x, window, reducer):
+    """Apply reducer(windows, axis=-1) over trailing windows, in bounded-memory blocks"""
+    x = np.asarray(x, dtype='float64')
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    for start in range(window - 1, n, WINDOW_CHUNK):
+        stop = min(start + WINDOW_CHUNK, n)
+        block = np.lib.stride_tricks.sliding_window_view(x[..., start - window + 1:stop], window, axis=-1)
+        out[..., start:stop] = reducer(block)
+    return out
+
+
+def rolling_std(x, window, ddof=1):
+    return _window_reduce(x, window, lambda w: w.std(axis=-1, ddof=ddof))
+
+
+def _block_extreme(x, window, extreme, fill):
+    """
+    van Herk / Gil-Werman trailing window extreme: per block of `window` bars take
+    prefix and suffix running extremes; every window spans at most two blocks, so
+    out[t] = extreme(suffix[t - window + 1], prefix[t]). Three passes, any window.
+    NaN inside a window propagates (min_periods=window), as in pandas.
+    """
+    x = np.asarray(x, dtype='float64')
+    n = x.shape[-1]
+    out = np.full(x.shape, np.nan)
+    if window < 1 or n < window:
+        return out
+    blocks = -(-n // window)
+    padded = np.full(x.shape[:-1] + (blocks * window,), fill)
+    padded[..., :n] = x
+    shaped = padded.reshape(x.shape[:-1] + (blocks, window))
+    prefix = extreme.accumulate(shaped, axis=-1).reshape(padded.shape)
+    suffix = extreme.accumulate(shaped[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., window - 1:] = extreme(suffix[..., :n - window + 1], prefix[..., window - 1:n])
+    return out
+
+
+def rolling_max(x, window):
+    return _block_extreme(x, window, np.maximum, -np.inf)
+
+
+def rolling_min(x, window):
+    return _block_extreme(x, window, np.minimum, np.inf)
+
+
+def swing_flags(high, low, order=5):
+    """
+    Pivot masks along the last axis: bar t is a swing high when high[t] equals the
+    max of high[t-order:t+order+1] (ties included), likewise swing low on low.
+    The first and last `order` bars are never pivots. O(n) for any order.
+    """
+    high = np.asarray(high, dtype='float64')
+    low = np.asarray(low, dtype='float64')
+    is_high = np.zeros(high.shape, dtype=bool)
+    is_low = np.zeros(low.shape, dtype=bool)
+    n = high.shape[-1]
+    if n < 2 * order + 1:
+        return is_high, is_low
+    span = 2 * order + 1
+    # Trailing extreme ending at t+order is the centred window around t
+    window_high = rolling_max(high, span)[..., span - 1:]
+    window_low = rolling_min(low, span)[..., span - 1:]
+    is_high[..., order:n - order] = high[..., order:n - order] == window_high
+    is_low[..., order:n - order] = low[..., order:n - order] == window_low
+    return is_high, is_low
+
+
+def shift(x, periods=1):
+    out = np.full(np.shape(x), np.nan)
+    out[..., periods:] = x[..., :-periods]
+    return out
+
+
+def rsi(close, window=14):
+    """ta RSIIndicator: Wilder-smoothed gains/losses; the first change counts as 0"""
+    diff = close - shift(close)
+    started = ~np.isnan(close)
+    up = np.where(diff > 0, diff, np.where(started, 0.0, np.nan))
+    down = np.where(diff < 0, -diff, np.where(started, 0.0, np.nan))
+    ema_up = ema(up, alpha=1 / window, min_periods=window)
+    ema_down = ema(down, alpha=1 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+
+
+def atr(high, low, close, window=14):
+    """ta AverageTrueRange: 0 during warm-up, seeded with the mean of the first `window` ranges"""
+    prev_close = shift(close)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    first = _first_valid(close)
+    seed_at = first + window - 1
+    pos = _positions(close)
+    idx = np.clip(seed_at, 0, close.shape[-1] - 1)
+    cumulative = np.nancumsum(true_range, axis=-1)
+    before = np.where(first > 0, np.take_along_axis(cumulative, np.maximum(first - 1, 0)[..., None], axis=-1)[..., 0], 0.0)
+    seed = (np.take_along_axis(cumulative, idx[..., None], axis=-1)[..., 0] - before) / window
+    # Seed enters as an impulse: y[seed_at] = seed, then y[t] = (y[t-1] * (w-1) + tr[t]) / w
+    impulse = np.where(pos == seed_at[..., None], seed[..., None] * window,
+                       np.where(pos > seed_at[..., None], true_range, 0.0))
+    out = _recursive_filter(impulse, (window - 1) / window, 1.0 / window, np.zeros(close.shape[:-1]))
+    out = np.where(pos == seed_at[..., None], seed[..., None], out)
+    return np.where(np.isnan(close), np.nan, out)
+
+
+def stochastic(high, low, close, window=14, smooth_window=3):
+    smax = rolling_max(high, window)
+    smin = rolling_min(low, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * (close - smin) / (smax - smin)
+    return k, rolling_mean(k, smooth_window)
+
+
+def bollinger(close, window=20, window_dev=2):
+    """(upper, middle, lower, width, pct) as ta BollingerBands (population std)"""
+    mavg = rolling_mean(close, window)
+    mstd = rolling_std(close, window, ddof=0)
+    upper = mavg + window_dev * mstd
+    lower = mavg - window_dev * mstd
+    band = upper - lower
+    with np.errstate(divide='ignore', invalid='ignore'):
+        width = band / mavg * 100
+        pct = (close - lower) / np.where(band != 0, band, np.nan)
+    return upper, mavg, lower, width, pct
+
+
+def obv(close, volume):
+    """ta OnBalanceVolumeIndicator (integer volume keeps an integer OBV, as in ta)"""
+    signed = np.where(close < shift(close), -volume, volume)
+    if np.issubdtype(signed.dtype, np.integer):
+        return np.cumsum(signed, axis=-1)
+    total = np.cumsum(np.nan_to_num(signed), axis=-1)
+    return np.where(np.isnan(signed), np.nan, total)
+
+
+# =============================================================================
+# INDICATOR GRAPH: columns are computed on demand, each at most once
+# =============================================================================
+
+# Columns TechnicalAnalysis.get_signal_score reads (a rules-only consumer needs no more)
+SIGNAL_COLUMNS = ['ema_20', 'ema_50', 'rsi', 'macd', 'macd_signal', 'macd_diff',
+                  'stoch_k', 'stoch_d', 'bb_pct', 'bb_width', 'obv', 'obv_ema']
+
+_NODES = {}
+
+
+def _node(*names):
+    """Register fn(graph) as the producer of one or more columns (fn returns one array per name)"""
+    def register(fn):
+        for i, name in enumerate(names):
+            _NODES[name] = (fn, i if len(names) > 1 else None)
+        return fn
+    return register
+
+
+class IndicatorGraph:
+    """
+    Lazily computed indicator columns over one OHLC(V) series. get(column) computes
+    the column and whatever it depends on (MACD -> EMA 12/26, rsi_ema -> rsi, ...)
+    exactly once; later requests reuse the cached arrays.
+    """
+
+    def __init__(self, high, low, close, volume=None):
+        """
+        Args:
+            high, low, close: 1D (bars,) or 2D (symbols, bars) arrays
+            volume: Same shape, or None for frames without a volume column
+                    (obv/obv_ema/volume_sma are then 0)
+        """
+        self.high, self.low, self.close = (np.asarray(a, dtype='float64') for a in (high, low, close))
+        self.volume = np.asarray(volume) if volume is not None else None
+        self._cache = {}
+
+    def get(self, name):
+        if name not in self._cache:
+            if name not in _NODES:
+                raise KeyError(f"Unknown indicator column: {name}")
+            fn, position = _NODES[name]
+            values = fn(self)
+            if position is None:
+                self._cache[name] = values
+            else:
+                # Multi-output node: cache every column it produced
+                for column, (node, i) in _NODES.items():
+                    if node is fn:
+                        self._cache[column] = values[i]
+        return self._cache[name]
+
+    def compute(self, columns=None):
+        """{column: array} for columns (default: every add_indicators column, in INDICATOR_COLUMNS order)"""
+        return {column: self.get(column) for column in (columns if columns is not None else INDICATOR_COLUMNS)}
+
+    @property
+    def computed(self):
+        """Columns and intermediates computed so far"""
+        return list(self._cache)
+
+    def _volume_zeros(self):
+        return np.where(np.isnan(self.close), np.nan, 0.0)
+
+
+@_node('prev_close')
+def _prev_close(g):
+    return shift(g.close)
+
+
+@_node('ema_12')
+def _ema_12(g):
+    return ema(g.close, span=12, min_periods=12)
+
+
+@_node('ema_20')
+def _ema_20(g):
+    return ema(g.close, span=20, min_periods=20)
+
+
+@_node('ema_26')
+def _ema_26(g):
+    return ema(g.close, span=26, min_periods=26)
+
+
+@_node('ema_50')
+def _ema_50(g):
+    return ema(g.close, span=50, min_periods=50)
+
+
+@_node('rsi')
+def _rsi(g):
+    return rsi(g.close)
+
+
+@_node('macd', 'macd_signal', 'macd_diff')
+def _macd(g):
+    macd = g.get('ema_12') - g.get('ema_26')
+    signal = ema(macd, span=9, min_periods=9)
+    return macd, signal, macd - signal
+
+
+@_node('atr')
+def _atr(g):
+    return atr(g.high, g.low, g.close)
+
+
+@_node('stoch_k', 'stoch_d')
+def _stochastic(g):
+    return stochastic(g.high, g.low, g.close)
+
+
+@_node('bb_upper', 'bb_middle', 'bb_lower', 'bb_width', 'bb_pct')
+def _bollinger(g):
+    return bollinger(g.close)
+
+
+@_node('obv')
+def _obv(g):
+    return obv(g.close, g.volume) if g.volume is not None else g._volume_zeros()
+
+
+@_node('obv_ema')
+def _obv_ema(g):
+    if g.volume is None:
+        return g._volume_zeros()
+    return ema(g.get('obv').astype('float64'), span=20, adjust=True)
+
+
+@_node('volume_sma')
+def _volume_sma(g):
+    return rolling_mean(g.volume.astype('float64'), 20) if g.volume is not None else g._volume_zeros()
+
+
+@_node('price_change')
+def _price_change(g):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return g.close / g.get('prev_close') - 1
+
+
+@_node('volatility')
+def _volatility(g):
+    return rolling_std(g.close, 20, ddof=1)
+
+
+@_node('momentum')
+def _momentum(g):
+    return g.close - shift(g.close, 10)
+
+
+@_node('rsi_ema')
+def _rsi_ema(g):
+    return ema(g.get('rsi'), span=9, adjust=True)
+
+
+@_node('atr_pct')
+def _atr_pct(g):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return g.get('atr') / g.close * 100
+
+
+@_node('high_low_pct')
+def _high_low_pct(g):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (g.high - g.low) / g.close * 100
+
+
+def compute_indicators(high, low, close, volume=None, columns=None):
+    """
+    add_indicators columns for 1D or 2D OHLC(V) arrays (IndicatorGraph).
+    volume=None mirrors a frame without a volume column (obv/obv_ema/volume_sma = 0).
+    columns: subset to compute (only it and its dependencies run); default all.
+    Returns {column: array} in the requested (default INDICATOR_COLUMNS) order.
+    """
+    return IndicatorGraph(high, low, close, volume).compute(columns)
@@ -1,8 +1,8 @@
 
-import schedule
 import time
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from config import Config
 from utils import init_db, logger, get_db_connection, check_api_keys
@@ -14,25 +14,146 @@ from colorama import Fore, Style, init
 # Initialize Colorama
 init(autoreset=True)
 
-def run_analysis_cycle(mode="background"):
+def scan_pairs(engine, pairs, max_workers=None):
+    """
+    Analyze pairs concurrently on a bounded thread pool.
+    Yields (pair, result, seconds) as each pair finishes; result is None if analysis raised.
+    Provider rate limits are enforced by the shared DataLoader, so workers simply queue
+    on the provider budget instead of sleeping a fixed amount between pairs.
+    """
+    max_workers = max(1, min(max_workers or Config.SCAN_MAX_WORKERS, len(pairs) or 1))
+
+    def timed_analyze(pair):
+        started = time.perf_counter()
+        try:
+            return engine.analyze_pair(pair), time.perf_counter() - started
+        except Exception as e:
+            logger.error(f"Error analyzing {pair}: {e}")
+            return None, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan") as pool:
+        futures = {pool.submit(timed_analyze, pair): pair for pair in pairs}
+        for future in as_completed(futures):
+            result, seconds = future.result()
+            yield futures[future], result, seconds
+
+_process_scanner = None
+
+def get_process_scanner():
+    """Process-pool scanner shared by every cycle (workers and their ML models load once)"""
+    global _process_scanner
+    if _process_scanner is None:
+        from process_scanner import ProcessScanner
+        _process_scanner = ProcessScanner(Config.SCAN_PROCESSES)
+    return _process_scanner
+
+def store_pair_result(pair, result, db_mongo, mode="background"):
+    """
+    Persist market data, signal and pattern history for one analyzed pair.
+    Returns (data_saved, signal_saved) flags.
+    """
+    data_saved = False
+    signal_saved = False
+
+    # Save Market Data & Indicators (Every Cycle - Every 15 Minutes)
+    if 'raw_data' in result:
+        rd = result['raw_data']
+        try:
+            # Convert timestamp to ISO string if needed
+            time_str = rd['time'].isoformat() if hasattr(rd['time'], 'isoformat') else str(rd['time'])
+            
+            # Mongo Save
+            if db_mongo is not None:
+                mongo_data = {
+                    "time": time_str,
+                    "pair": pair,
+                    "open": rd['open'], "high": rd['high'], "low": rd['low'], "close": rd['close'],
+                    "rsi": rd['rsi'], "macd": rd['macd'], "atr": rd['atr'],
+                    "pos_atr": rd.get('pos_atr'), # Bollinger/Keltner helpers if exist
+                    "ema_20": rd['ema_20'], "ema_50": rd['ema_50']
+                }
+                # Upsert based on time+pair
+                db_mongo.market_data.update_one(
+                    {"pair": pair, "time": time_str},
+                    {"$set": mongo_data},
+                    upsert=True
+                )
+                data_saved = True
+                if mode == "background":
+                    logger.info(f"✓ Saved market data & indicators for {pair} (Price: {result['price']}) to MongoDB")
+        except Exception as e:
+            logger.error(f"DB Save Error {pair}: {e}")
+
+    # Mongo Save Signal
+    if db_mongo is not None:
+        signal_doc = {
+            "time": result['time'],
+            "pair": pair,
+            "signal": result['signal'],
+            "confidence": result['confidence'],
+            "entry_price": result['price'],
+            "stop_loss": result['stop_loss'],
+            "take_profit": result['take_profit'],
+            "reason": result['reason'],
+            "created_at": datetime.utcnow()
+        }
+        db_mongo.signals.insert_one(signal_doc)
+        signal_saved = True
+        if mode == "background":
+            logger.info(f"[SIGNAL] Saved signal for {pair}: {result['signal']} at {result['time']}")
+    
+    # Save Chart Patterns to History
+    if 'pattern_details' in result and result['pattern_details']:
+        if db_mongo is not None:
+            for pattern_name, details in result['pattern_details'].items():
+                db_mongo.pattern_history.insert_one({
+                    "time": result['time'],
+                    "pair": pair,
+                    "pattern_name": pattern_name,
+                    "bias": details['bias'],
+                    "score": details['score'],
+                    "confidence": details['confidence']
+                })
+    
+    # Only log BUY/SELL signals to console in background mode
+    if mode == "background" and result['signal'] != "WAIT":
+        logger.info(f"🚨 TRADING SIGNAL: {pair} {result['signal']} ({result['confidence']}%)")
+        if result.get('patterns'):
+            logger.info(f"   📊 Patterns: {', '.join(result['patterns'])}")
+
+    return data_saved, signal_saved
+
+def run_analysis_cycle(mode="background", pairs=None):
     """
     Background cycle: Fetches news, updates sentiment, scans core pairs silently, logs to DB.
+    pairs: symbols to scan (default Config.SCAN_SYMBOLS; the bar-close scheduler passes
+    only the symbols whose bar just closed).
+    Config.SCAN_SYMBOLS are scanned concurrently (Config.SCAN_MAX_WORKERS threads, or
+    Config.SCAN_PROCESSES worker processes); per-pair durations are logged.
     """
     if mode == "background":
         logger.info(f"Background Cycle Started: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # 1. Update News & Sentiment (Global)
+    # 1. Update News & Sentiment (Global) alongside the pair scan, so a slow
+    # news API doesn't delay analysis; pairs use the sentiment already stored.
     loader = DataLoader()
     sentiment = SentimentEngine()
     
-    # Fetch news every cycle (every 15 minutes)
-    if mode == "background":
-        logger.info("Fetching news from all sources...")
-    loader.fetch_all_news()
-    
-    if mode == "background":
-        logger.info("Updating sentiment scores for news...")
-    sentiment.update_sentiment_scores()
+    def refresh_news():
+        try:
+            # Fetch news every cycle (every 15 minutes)
+            if mode == "background":
+                logger.info("Fetching news from all sources...")
+            loader.fetch_all_news()
+            
+            if mode == "background":
+                logger.info("Updating sentiment scores for news...")
+            sentiment.update_sentiment_scores()
+        except Exception as e:
+            logger.error(f"News refresh failed: {e}")
+
+    news_thread = threading.Thread(target=refresh_news, name="news-refresh", daemon=True)
+    news_thread.start()
     
     # 2. Analyze Core Pairs and Store Data (Every 15 Minutes)
     engine = DecisionEngine()
@@ -43,100 +164,75 @@ def run_analysis_cycle(mode="background"):
 
     # Note: We are no longer using local SQLite. All data goes to MongoDB.
 
+    pairs = pairs or Config.SCAN_SYMBOLS
     if mode == "background":
-        logger.info(f"Processing {len(Config.PAIRS)} symbols: {', '.join(Config.PAIRS)}")
+        logger.info(f"Processing {len(pairs)} symbols: {', '.join(pairs)}")
     
     data_saved_count = 0
     signals_saved_count = 0
+    pair_durations = {}
+    cycle_started = time.perf_counter()
     
-    for pair in Config.PAIRS:
+    # Large universes: shard across worker processes instead of threads
+    scan = get_process_scanner().scan(pairs) if Config.SCAN_PROCESSES > 0 else scan_pairs(engine, pairs)
+    for pair, result, seconds in scan:
+        pair_durations[pair] = seconds
+        if result is None:
+            continue
         try:
-            # Add delay to respect free API rate limits
-            # TwelveData free tier: 8 calls/min, so ~8 seconds between calls
-            # This ensures we don't exceed any API limits
-            time.sleep(2)  # 2 seconds between pairs
-                
-            result = engine.analyze_pair(pair)
-            
-            # Save Market Data & Indicators (Every Cycle - Every 15 Minutes)
-            if 'raw_data' in result:
-                rd = result['raw_data']
-                try:
-                    # Convert timestamp to ISO string if needed
-                    time_str = rd['time'].isoformat() if hasattr(rd['time'], 'isoformat') else str(rd['time'])
-                    
-                    # Mongo Save
-                    if db_mongo is not None:
-                        mongo_data = {
-                            "time": time_str,
-                            "pair": pair,
-                            "open": rd['open'], "high": rd['high'], "low": rd['low'], "close": rd['close'],
-                            "rsi": rd['rsi'], "macd": rd['macd'], "atr": rd['atr'],
-                            "pos_atr": rd.get('pos_atr'), # Bollinger/Keltner helpers if exist
-                            "ema_20": rd['ema_20'], "ema_50": rd['ema_50']
-                        }
-                        # Upsert based on time+pair
-                        db_mongo.market_data.update_one(
-                            {"pair": pair, "time": time_str},
-                            {"$set": mongo_data},
-                            upsert=True
-                        )
-                        data_saved_count += 1
-                        if mode == "background":
-                            logger.info(f"✓ Saved market data & indicators for {pair} (Price: {result['price']}) to MongoDB")
-                except Exception as e:
-                    logger.error(f"DB Save Error {pair}: {e}")
-
-            # Mongo Save Signal
-            if db_mongo is not None:
-                signal_doc = {
-                    "time": result['time'],
-                    "pair": pair,
-                    "signal": result['signal'],
-                    "confidence": result['confidence'],
-                    "entry_price": result['price'],
-                    "stop_loss": result['stop_loss'],
-                    "take_profit": result['take_profit'],
-                    "reason": result['reason'],
-                    "created_at": datetime.utcnow()
-                }
-                db_mongo.signals.insert_one(signal_doc)
-                signals_saved_count += 1
-                if mode == "background":
-                    logger.info(f"[SIGNAL] Saved signal for {pair}: {result['signal']} at {result['time']}")
-            
-            # Save Chart Patterns to History
-            if 'pattern_details' in result and result['pattern_details']:
-                if db_mongo is not None:
-                    for pattern_name, details in result['pattern_details'].items():
-                        db_mongo.pattern_history.insert_one({
-                            "time": result['time'],
-                            "pair": pair,
-                            "pattern_name": pattern_name,
-                            "bias": details['bias'],
-                            "score": details['score'],
-                            "confidence": details['confidence']
-                        })
-            
-            # Only log BUY/SELL signals to console in background mode
-            if mode == "background" and result['signal'] != "WAIT":
-                logger.info(f"🚨 TRADING SIGNAL: {pair} {result['signal']} ({result['confidence']}%)")
-                if result.get('patterns'):
-                    logger.info(f"   📊 Patterns: {', '.join(result['patterns'])}")
+            data_saved, signal_saved = store_pair_result(pair, result, db_mongo, mode)
+            data_saved_count += data_saved
+            signals_saved_count += signal_saved
         except Exception as e:
-            logger.error(f"Error analyzing {pair}: {e}")
+            logger.error(f"Error storing {pair}: {e}")
+
+    cycle_seconds = time.perf_counter() - cycle_started
+    timings = ", ".join(f"{p}={s:.2f}s" for p, s in sorted(pair_durations.items(), key=lambda kv: -kv[1]))
+    logger.info(f"Scanned {len(pair_durations)} pairs in {cycle_seconds:.2f}s ({timings})")
+    cache_bytes = engine.resampler.memory_usage()
+    if cache_bytes:
+        logger.info(f"Derived candle cache: {sum(cache_bytes.values()) / len(cache_bytes) / 1024:.1f} KB per symbol "
+                    f"({'float32' if Config.LOW_MEMORY_INDICATORS else 'float64'})")
+
+    # Let news ingestion finish before the cycle is reported complete
+    news_thread.join()
 
     if mode == "background":
         logger.info(f"✓ Stored {data_saved_count} market data records with indicators")
         logger.info(f"✓ Stored {signals_saved_count} signal records")
-        logger.info("Background Cycle Complete - Next cycle in 15 minutes.")
+        logger.info(f"Background Cycle Complete - Next cycle at the next {Config.TIMEFRAME} bar close.")
+        if scheduler is not None:
+            # Totals up to the previous close; this cycle's lag is added once the job returns
+            m = scheduler.metrics()
+            logger.info(f"Bar-close scheduler: {m['runs']} runs, skipped {m['skipped_overlap']} overlapping / "
+                        f"{m['skipped_closed']} closed-market closes, finish lag avg {m['avg_finish_lag']}s "
+                        f"max {m['max_finish_lag']}s, start lag max {m['max_start_lag']}s")
+
+scheduler = None
 
 def background_job():
-    """Thread target for scheduler"""
-    schedule.every(15).minutes.do(run_analysis_cycle, mode="background")
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    """Thread target for scheduler: one cycle per TIMEFRAME bar close, for the symbols that closed"""
+    global scheduler
+    from bar_scheduler import BarCloseScheduler
+    scheduler = BarCloseScheduler(
+        lambda symbols, bar_close: run_analysis_cycle(mode="background", pairs=symbols),
+        {Config.TIMEFRAME: Config.SCAN_SYMBOLS}
+    )
+    scheduler.run_forever()
+
+def streaming_job():
+    """Thread target for live tick streaming: analyze each pair as its bar closes"""
+    from streaming import StreamingEngine, WebSocketTickFeed
+    from utils import get_mongo_db
+    db_mongo = get_mongo_db()
+    streamer = StreamingEngine(
+        DecisionEngine(),
+        WebSocketTickFeed(Config.VALID_SYMBOLS),
+        symbols=Config.VALID_SYMBOLS,
+        on_result=lambda pair, result: store_pair_result(pair, result, db_mongo, mode="background")
+    )
+    streamer.seed_history()
+    streamer.run()
 
 def print_report(result):
     color = Fore.YELLOW
@@ -208,7 +304,7 @@ def interactive_mode():
                 continue
             
             print(f"Fetching data for {user_input}...")
-            result = engine.analyze_pair(user_input)
+            result = engine.analyze_pair(user_input, hedge=Config.HEDGE_INTERACTIVE)
             
             # Immediate Price Output
             if result['price'] > 0:
@@ -241,6 +337,8 @@ def main():
     # 2. Start Background Thread
     t = threading.Thread(target=background_job, daemon=True)
     t.start()
+    if Config.STREAM_ENABLED:
+        threading.Thread(target=streaming_job, name="streaming", daemon=True).start()
     
     # 3. Enter Interactive Mode if TTY is present
     if sys.stdin.isatty():
@@ -347,9 +347,30 @@ class TradingMLModel:
         
         signal_map = {0: 'SELL', 1: 'HOLD', 2: 'BUY'}
         signal = signal_map[pred]
-        
+
         return signal, confidence
-    
+
+    def predict_many(self, features):
+        """
+        predict_single for many data points with one scaler/predict_proba pass
+
+        Args:
+            features: DataFrame with one row per data point (feature_columns present)
+
+        Returns:
+            [(signal, confidence)] in row order
+        """
+        if len(features) == 0:
+            return []
+        predictions, probabilities = self.predict(features[self.feature_columns])
+
+        if predictions is None:
+            return [('HOLD', 0.0)] * len(features)
+
+        signal_map = {0: 'SELL', 1: 'HOLD', 2: 'BUY'}
+        return [(signal_map[int(pred)], float(proba[int(pred)]))
+                for pred, proba in zip(predictions, probabilities)]
+
     def get_feature_importance(self, top_n=15):
         """
         Get feature importance scores
@@ -412,33 +433,72 @@ class TradingMLModel:
             return False
 
 
-def train_models_from_historical_data(pairs=None, optimize=True):
+def load_candle_store_history(pairs=None, timeframe=None):
+    """
+    Load OHLCV history for training from the local candle store
+    
+    Args:
+        pairs: List of trading pairs to load (None = every stored pair)
+        timeframe: Candle timeframe (default: Config.TIMEFRAME)
+        
+    Returns:
+        DataFrame in the market_data layout (pair, time, open, high, low, close, volume)
+    """
+    from config import Config
+    from candle_store import CandleStore
+    
+    timeframe = timeframe or Config.TIMEFRAME
+    store = CandleStore()
+    frames = []
+    for symbol, tf in store.keys():
+        if tf != timeframe or (pairs and symbol not in pairs):
+            continue
+        candles = store.load(symbol, tf)
+        if candles is None:
+            continue
+        frame = candles.rename(columns={'datetime': 'time'})
+        frame.insert(0, 'pair', symbol)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def train_models_from_historical_data(pairs=None, optimize=True, source='mongo'):
     """
-    Train ML models using historical data from MongoDB
+    Train ML models using historical data from MongoDB or the local candle store
     
     Args:
         pairs: List of trading pairs to use (None = use all available)
         optimize: Whether to optimize hyperparameters
+        source: 'mongo' (market_data collection) or 'candles' (local candle store)
     """
     logger.info("="*60)
     logger.info("Starting ML Model Training Pipeline")
     logger.info("="*60)
     
-    # Get data from MongoDB
-    db = get_mongo_db()
-    if db is None:
-        logger.error("MongoDB connection failed!")
-        return
-    
-    # Fetch historical market data
-    market_data = list(db.market_data.find())
-    
-    if len(market_data) == 0:
-        logger.error("No historical data available in MongoDB!")
-        logger.info("Please run the bot for a while to collect data first.")
-        return
-    
-    df = pd.DataFrame(market_data)
+    if source == 'candles':
+        df = load_candle_store_history(pairs)
+        if df.empty:
+            logger.error("No historical data available in the candle store!")
+            logger.info("Run the bot or a backfill to populate it first.")
+            return
+    else:
+        # Get data from MongoDB
+        db = get_mongo_db()
+        if db is None:
+            logger.error("MongoDB connection failed!")
+            return
+        
+        # Fetch historical market data
+        market_data = list(db.market_data.find())
+        
+        if len(market_data) == 0:
+            logger.error("No historical data available in MongoDB!")
+            logger.info("Please run the bot for a while to collect data first.")
+            return
+        
+        df = pd.DataFrame(market_data)
     logger.info(f"Loaded {len(df)} historical data points")
     
     if pairs:
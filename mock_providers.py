@@ -0,0 +1,375 @@
+"""
+Local Stand-in for Market & News Providers
+==========================================
+A single HTTP server that impersonates TwelveData, Polygon, AlphaVantage, FMP,
+NewsAPI/NewsData, Finnhub and Taapi under path prefixes (/twelvedata, /polygon, ...).
+
+Modes:
+- record: proxy every request to the real provider (config.UPSTREAM_URLS) and
+          save the response as a fixture file
+- replay: serve fixtures; requests without a fixture get deterministic synthetic
+          candles/news, so any number of symbols can be exercised offline
+Replay can inject latency, server errors and per-provider rate limiting (429 +
+Retry-After) to mimic real upstream behaviour.
+
+Point the engine at it with MOCK_PROVIDERS_URL=http://127.0.0.1:8765 (see Config).
+
+Usage:
+    python mock_providers.py record --port 8765
+    python mock_providers.py replay --port 8765 --latency 0.2 --error-rate 0.02 --rate-limit 60
+    python mock_providers.py bench --symbols 10,100,1000 --latency 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import numpy as np
+import pandas as pd
+import requests
+from config import Config, UPSTREAM_URLS
+
+FIXTURE_DIR = os.path.join("data", "fixtures")
+SECRET_PARAMS = {'apikey', 'apiKey', 'token', 'secret'}
+
+
+def fixture_key(provider, path, query):
+    """Stable fixture name for a request, ignoring credentials"""
+    params = sorted((k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k not in SECRET_PARAMS)
+    digest = hashlib.sha1(f"{path}?{urlencode(params)}".encode()).hexdigest()[:16]
+    return os.path.join(provider, f"{digest}.json")
+
+
+# ----------------------------------------------------------------------
+# Synthetic responses
+# ----------------------------------------------------------------------
+def _interval_minutes(interval):
+    interval = interval.lower()
+    if interval.endswith('min'):
+        return int(interval[:-3])
+    if interval.endswith('h'):
+        return int(interval[:-1]) * 60
+    return 15
+
+
+def _hash_noise(symbol, stamps, seed, salt=0):
+    """Uniform [-0.5, 0.5) noise that depends only on (symbol, timestamp)"""
+    minute = (stamps.asi8 // 60_000_000_000).astype(np.uint64)
+    key = np.uint64((zlib.crc32(symbol.encode()) ^ seed ^ (salt * 0x9E3779B9)) & 0xFFFFFFFF)
+    mixed = ((minute + key) * np.uint64(2654435761)) % np.uint64(2**32)
+    return mixed / 2**32 - 0.5
+
+
+def _price_at(symbol, stamps, seed):
+    """Synthetic price as a pure function of time, so any two requests agree on overlapping bars"""
+    base = 1.0 + (zlib.crc32(symbol[::-1].encode()) % 20000) / 100.0
+    minutes = (stamps.asi8 // 60_000_000_000).astype('float64')
+    phase = (zlib.crc32(symbol.encode()) % 1000) / 1000.0 * 2 * np.pi
+    cycles = (0.02 * np.sin(2 * np.pi * minutes / (60 * 24 * 9) + phase)
+              + 0.006 * np.sin(2 * np.pi * minutes / (60 * 31) + 2 * phase)
+              + 0.002 * np.sin(2 * np.pi * minutes / (60 * 3.7) + 3 * phase))
+    return base * (1.0 + cycles + 0.0008 * _hash_noise(symbol, stamps, seed))
+
+
+def synthetic_candles(symbol, minutes, count, seed=0, end=None, start=None):
+    """
+    Deterministic OHLC bars for symbol: the `count` bars ending at `end` (default now),
+    or the first `count` bars from `start` when start is given. Never past the current bar.
+    """
+    count = max(1, min(int(count), 50000))
+    freq = f"{minutes}min"
+    now = pd.Timestamp.now('UTC').tz_localize(None)
+    end = min(pd.Timestamp(end), now) if end is not None else now
+    if start is not None:
+        index = pd.date_range(start=pd.Timestamp(start).ceil(freq), end=end.floor(freq), freq=freq)[:count]
+    else:
+        index = pd.date_range(end=end.floor(freq), periods=count, freq=freq)
+    close = _price_at(symbol, index, seed)
+    open_ = _price_at(symbol, index - pd.Timedelta(freq), seed)
+    spread = (np.abs(_hash_noise(symbol, index, seed, salt=1)) + 0.1) * close * 0.001
+    return pd.DataFrame({
+        'datetime': index,
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close
+    })
+
+
+def _twelvedata_series(td_symbol, params, seed):
+    minutes = _interval_minutes(params.get('interval', '15min'))
+    count = int(params.get('outputsize', 30))
+    # Latest `outputsize` bars up to end_date, then clipped to start_date (like the real API)
+    df = synthetic_candles(td_symbol.replace('/', ''), minutes, count, seed, end=params.get('end_date'))
+    if 'start_date' in params:
+        df = df[df['datetime'] >= pd.Timestamp(params['start_date'])]
+    values = [{
+        'datetime': row.datetime.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': f"{row.open:.5f}", 'high': f"{row.high:.5f}",
+        'low': f"{row.low:.5f}", 'close': f"{row.close:.5f}"
+    } for row in df.iloc[::-1].itertuples()]
+    return {'meta': {'symbol': td_symbol, 'interval': params.get('interval')}, 'values': values, 'status': 'ok'}
+
+
+def _polygon_time(value, is_end=False):
+    """Polygon range bound: millisecond timestamp or YYYY-MM-DD (end dates are inclusive)"""
+    if value.isdigit():
+        return pd.Timestamp(int(value), unit='ms')
+    day = pd.Timestamp(value)
+    return day + pd.Timedelta(days=1) - pd.Timedelta(seconds=1) if is_end else day
+
+
+def synthetic_response(provider, path, params, seed=0):
+    """(status, body) for a request without a fixture"""
+    if provider == 'twelvedata' and path.endswith('/time_series'):
+        symbols = params.get('symbol', '').split(',')
+        if len(symbols) == 1:
+            return 200, _twelvedata_series(symbols[0], params, seed)
+        return 200, {s: _twelvedata_series(s, params, seed) for s in symbols}
+
+    if provider == 'polygon' and '/v2/aggs/ticker/' in path:
+        # /v2/aggs/ticker/C:EURUSD/range/15/minute/<from>/<to>
+        parts = path.split('/')
+        ticker, multiplier = parts[4], int(parts[6])
+        start, end = _polygon_time(parts[8]), _polygon_time(parts[9], is_end=True)
+        limit = int(params.get('limit', 5000))
+        df = synthetic_candles(ticker.split(':')[-1], multiplier, limit, seed, start=start, end=end)
+        results = [{'t': int(row.datetime.value // 10**6), 'o': row.open, 'h': row.high,
+                    'l': row.low, 'c': row.close, 'v': 0} for row in df.itertuples()]
+        return 200, {'status': 'OK', 'ticker': ticker, 'resultsCount': len(results), 'results': results}
+
+    if provider == 'alphavantage':
+        interval = params.get('interval', '15min')
+        symbol = params.get('from_symbol', '') + params.get('to_symbol', '')
+        df = synthetic_candles(symbol, _interval_minutes(interval), 100, seed)
+        series = {row.datetime.strftime('%Y-%m-%d %H:%M:%S'): {
+            '1. open': f"{row.open:.5f}", '2. high': f"{row.high:.5f}",
+            '3. low': f"{row.low:.5f}", '4. close': f"{row.close:.5f}"
+        } for row in df.itertuples()}
+        return 200, {f"Time Series FX ({interval})": series}
+
+    now = pd.Timestamp.now('UTC').tz_localize(None)
+    headlines = [f"Synthetic {provider} headline {i}: dollar steady as inflation cools" for i in range(5)]
+    if provider == 'fmp':
+        return 200, {'content': [{'date': now.isoformat(), 'title': h, 'content': h} for h in headlines]}
+    if provider == 'newsapi':
+        return 200, {'articles': [{'publishedAt': now.isoformat(), 'title': h, 'description': h} for h in headlines]}
+    if provider == 'newsdata':
+        return 200, {'results': [{'pubDate': now.isoformat(), 'title': h, 'description': h} for h in headlines]}
+    if provider == 'finnhub':
+        return 200, [{'datetime': int(now.timestamp()), 'headline': h, 'summary': h} for h in headlines]
+    if provider == 'taapi':
+        return 200, {'value': 50.0}
+    return 404, {'status': 'error', 'message': f"No fixture or generator for {provider}{path}"}
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+class ProviderStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, mode='replay', fixture_dir=FIXTURE_DIR, latency=0.0, jitter=0.0,
+                 error_rate=0.0, rate_limit=None, seed=0):
+        """
+        Args:
+            mode: 'record' (proxy upstream and save fixtures) or 'replay'
+            latency / jitter: seconds added to every replayed response
+            error_rate: fraction of replayed requests answered with HTTP 500
+            rate_limit: requests per minute per provider before answering 429 (None = unlimited)
+            seed: seed for synthetic data and injected faults
+        """
+        super().__init__(address, _Handler)
+        self.mode = mode
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = {}  # provider -> timestamps of requests in the last minute
+        self.stats = {}   # provider -> {'requests', 'errors', 'throttled'}
+
+    def count(self, provider, field):
+        with self.lock:
+            entry = self.stats.setdefault(provider, {'requests': 0, 'errors': 0, 'throttled': 0})
+            entry[field] += 1
+
+    def throttle_wait(self, provider):
+        """Seconds until provider may be called again, or 0 if allowed now"""
+        if not self.rate_limit:
+            return 0.0
+        now = time.time()
+        with self.lock:
+            recent = [t for t in self.window.get(provider, []) if now - t < 60.0]
+            if len(recent) >= self.rate_limit:
+                self.window[provider] = recent
+                return 60.0 - (now - recent[0])
+            recent.append(now)
+            self.window[provider] = recent
+            return 0.0
+
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status, body, headers=None):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        segments = parts.path.lstrip('/').split('/', 1)
+        provider = segments[0]
+        path = '/' + segments[1] if len(segments) > 1 else ''
+        if provider not in UPSTREAM_URLS:
+            return self._send(404, {'status': 'error', 'message': f"Unknown provider {provider}"})
+        server.count(provider, 'requests')
+        fixture_path = os.path.join(server.fixture_dir, fixture_key(provider, path, parts.query))
+
+        if server.mode == 'record':
+            upstream = f"{UPSTREAM_URLS[provider]}{path}"
+            if parts.query:
+                upstream += f"?{parts.query}"
+            try:
+                resp = requests.get(upstream, timeout=Config.HTTP_TIMEOUT)
+            except Exception as e:
+                server.count(provider, 'errors')
+                return self._send(502, {'status': 'error', 'message': str(e)})
+            os.makedirs(os.path.dirname(fixture_path), exist_ok=True)
+            with open(fixture_path, 'w') as f:
+                json.dump({'status': resp.status_code, 'body': resp.text}, f)
+            return self._send(resp.status_code, resp.content)
+
+        # Replay: rate limit, injected latency/errors, then fixture or synthetic data
+        wait = server.throttle_wait(provider)
+        if wait > 0:
+            server.count(provider, 'throttled')
+            return self._send(429, {'status': 'error', 'code': 429, 'message': 'rate limit exceeded'},
+                              {'Retry-After': str(int(wait) + 1)})
+        delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and server.random.random() < server.error_rate:
+            server.count(provider, 'errors')
+            return self._send(500, {'status': 'error', 'message': 'injected failure'})
+
+        if os.path.exists(fixture_path):
+            with open(fixture_path) as f:
+                fixture = json.load(f)
+            return self._send(fixture['status'], fixture['body'].encode())
+        status, body = synthetic_response(provider, path, dict(parse_qsl(parts.query)), server.seed)
+        return self._send(status, body)
+
+
+def start_server(port=0, **options):
+    """Start a stand-in server on a background thread; returns the server"""
+    server = ProviderStandIn(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, name="provider-stand-in", daemon=True).start()
+    return server
+
+
+def point_config_at(base_url):
+    """Route every provider URL in Config to the stand-in server"""
+    for name in UPSTREAM_URLS:
+        setattr(Config, f"URL_{name.upper()}", f"{base_url}/{name}")
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def run_benchmark(symbol_counts, latency=0.1, error_rate=0.0, rate_limit=None, seed=0):
+    """Time fetch + indicators + scoring for synthetic universes of each size"""
+    server = start_server(latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=seed)
+    point_config_at(server.url())
+    for key in ('API_KEY_TWELVEDATA', 'API_KEY_POLYGON', 'API_KEY_ALPHAVANTAGE'):
+        setattr(Config, key, 'MOCK_KEY')
+    # Budget the client exactly like the stand-in so benchmarks measure scheduling, not 429s
+    per_minute = float(rate_limit) if rate_limit else 1e6
+    Config.RATE_LIMITS = {p: {'per_minute': per_minute, 'burst': int(min(per_minute, 1e6)), 'daily': None}
+                          for p in ('twelvedata', 'polygon', 'alphavantage')}
+    Config.RATE_LIMIT_BACKEND = 'memory'
+
+    from data_loader import DataLoader
+    from indicators import TechnicalAnalysis
+
+    print(f"Stand-in at {server.url()} (latency={latency}s, error_rate={error_rate}, rate_limit={rate_limit}/min)")
+    print(f"{'symbols':>8} {'requests':>9} {'fetch s':>9} {'analysis s':>11} {'total s':>9} {'sym/s':>8}")
+    for count in symbol_counts:
+        Config.CANDLE_STORE_DIR = tempfile.mkdtemp(prefix="bench_candles_")
+        server.stats.clear()
+        loader = DataLoader()
+        symbols = [f"SYM{i:04d}" for i in range(count)]
+
+        started = time.perf_counter()
+        frames = loader.fetch_market_data_many(symbols)
+        fetched = time.perf_counter()
+        for symbol, df in frames.items():
+            if df is None or len(df) < 50:
+                continue
+            df = TechnicalAnalysis.add_indicators(df)
+            if not df.empty:
+                TechnicalAnalysis.get_signal_score(df.iloc[-1])
+                TechnicalAnalysis.detect_chart_patterns(df, lookback=100)
+        finished = time.perf_counter()
+
+        requests_made = sum(s['requests'] for s in server.stats.values())
+        total = finished - started
+        print(f"{count:>8} {requests_made:>9} {fetched - started:>9.2f} {finished - fetched:>11.2f} "
+              f"{total:>9.2f} {count / total:>8.1f}")
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record/replay stand-in for market and news providers')
+    parser.add_argument('mode', choices=['record', 'replay', 'bench'])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', type=str, default=FIXTURE_DIR, help='Fixture directory')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to each replayed response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of replayed requests failing with 500')
+    parser.add_argument('--rate-limit', type=int, default=None, help='Requests/minute per provider before 429')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--symbols', type=str, default='10,100,1000', help='bench: universe sizes')
+    args = parser.parse_args()
+
+    if args.mode == 'bench':
+        counts = [int(c) for c in args.symbols.split(',')]
+        run_benchmark(counts, latency=args.latency, error_rate=args.error_rate,
+                      rate_limit=args.rate_limit, seed=args.seed)
+        return
+
+    server = ProviderStandIn(('127.0.0.1', args.port), mode=args.mode, fixture_dir=args.fixtures,
+                             latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             rate_limit=args.rate_limit, seed=args.seed)
+    print(f"Provider stand-in ({args.mode}) listening on {server.url()}")
+    print(f"Run the engine with MOCK_PROVIDERS_URL={server.url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Chart Pattern Engine
+====================
+detect_chart_patterns as a set of registered detectors over one shared swing
+geometry context:
+
+- PatternContext is built once per call: swing points, the last 2-3 swing
+  highs/lows, the 3-swing trendline fits (slope, intercept, price-normalised
+  slope) and window statistics. The triangle, wedge and trendline detectors
+  all read the same fits instead of refitting
+- Each pattern is a function decorated with @detector; detectors run in
+  registration order and return PatternHit tuples, so a new pattern is one
+  decorated function reading the context
+- PatternEngine keeps per-detector call counts and cumulative time
+  (engine.timings(), logged with engine.log_timings())
+
+Output (patterns list, total score, details dict) is identical to the original
+inline detector, including detector order and details-key overwrites.
+"""
+
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from utils import logger
+
+# name: details key; label is "name (bias)"; weight is the total_score contribution
+PatternHit = namedtuple('PatternHit', ['name', 'bias', 'score', 'confidence', 'weight'])
+
+DETECTORS = []
+
+
+def detector(name):
+    """Register a detector function fn(ctx) -> PatternHit | list of PatternHit | None"""
+    def register(fn):
+        DETECTORS.append((name, fn))
+        return fn
+    return register
+
+
+def _bull(name, confidence, weight=1.0):
+    return PatternHit(name, 'Bullish', 1, confidence, weight)
+
+
+def _bear(name, confidence, weight=1.0):
+    return PatternHit(name, 'Bearish', -1, confidence, -weight)
+
+
+class PatternContext:
+    """Swing geometry shared by every detector for one detect call"""
+
+    def __init__(self, swing_highs, swing_lows, highs, lows, closes):
+        self.swing_highs = swing_highs
+        self.swing_lows = swing_lows
+        self.highs = highs
+        self.lows = lows
+        self.closes = closes
+        self.n = len(closes)
+        self.last_close = closes[-1]
+        self.avg_price = np.mean(closes)
+        # Values of the last (up to) 3 swings, oldest first
+        self.recent_highs = [highs[i] for i in swing_highs[-3:]]
+        self.recent_lows = [lows[i] for i in swing_lows[-3:]]
+        self._fits = {}
+
+    def fit(self, side):
+        """(slope, intercept, slope / avg_price) of the line through the last 3 'high' or 'low' swings"""
+        if side not in self._fits:
+            idx = self.swing_highs if side == 'high' else self.swing_lows
+            values = self.recent_highs if side == 'high' else self.recent_lows
+            slope, intercept = np.polyfit(np.array(idx[-3:]), np.array(values), 1)
+            self._fits[side] = (slope, intercept, slope / self.avg_price)
+        return self._fits[side]
+
+    def count(self, side):
+        return len(self.swing_highs if side == 'high' else self.swing_lows)
+
+
+class PatternEngine:
+    def __init__(self, detectors=None):
+        """
+        Args:
+            detectors: [(name, fn)] to run, in order (default: every registered detector)
+        """
+        self.detectors = detectors if detectors is not None else DETECTORS
+        self._lock = threading.Lock()
+        self._seconds = {}
+        self._calls = {}
+
+    def detect(self, swing_highs, swing_lows, highs, lows, closes):
+        """Run the detectors over one window; returns (patterns_list, total_score, pattern_details)"""
+        patterns = []
+        pattern_details = {}
+        total_score = 0.0
+        ctx = PatternContext(swing_highs, swing_lows, highs, lows, closes)
+        elapsed = []
+        try:
+            for name, fn in self.detectors:
+                started = time.perf_counter()
+                try:
+                    hits = fn(ctx)
+                finally:
+                    elapsed.append((name, time.perf_counter() - started))
+                if hits is None:
+                    continue
+                for hit in (hits if isinstance(hits, list) else [hits]):
+                    patterns.append(f"{hit.name} ({hit.bias})")
+                    pattern_details[hit.name] = {'bias': hit.bias, 'score': hit.score, 'confidence': hit.confidence}
+                    total_score += hit.weight
+        except Exception:
+            # Fail gracefully: keep what the earlier detectors found (as the inline detector did)
+            pass
+        with self._lock:
+            for name, seconds in elapsed:
+                self._seconds[name] = self._seconds.get(name, 0.0) + seconds
+                self._calls[name] = self._calls.get(name, 0) + 1
+        return patterns, total_score, pattern_details
+
+    def timings(self):
+        """{detector: {'calls', 'seconds', 'avg_us'}}, slowest first"""
+        with self._lock:
+            stats = {name: {'calls': self._calls[name], 'seconds': round(seconds, 6),
+                            'avg_us': round(seconds / self._calls[name] * 1e6, 2)}
+                     for name, seconds in self._seconds.items()}
+        return dict(sorted(stats.items(), key=lambda item: -item[1]['seconds']))
+
+    def reset_timings(self):
+        with self._lock:
+            self._seconds.clear()
+            self._calls.clear()
+
+    def log_timings(self):
+        for name, stats in self.timings().items():
+            logger.info(f"Pattern detector {name}: {stats['calls']} calls, "
+                        f"{stats['seconds']:.4f}s ({stats['avg_us']} us/call)")
+
+
+# =============================================================================
+# DETECTORS (registration order = output order)
+# =============================================================================
+
+@detector('trend_structure')
+def _trend_structure(ctx):
+    """1-2. Higher highs / higher lows, lower highs / lower lows"""
+    if ctx.count('high') < 2 or ctx.count('low') < 2:
+        return None
+    h, l = ctx.recent_highs[-2:], ctx.recent_lows[-2:]
+    if h[-1] > h[-2] and l[-1] > l[-2]:
+        return _bull('Higher Highs/Higher Lows', 80)
+    if h[-1] < h[-2] and l[-1] < l[-2]:
+        return _bear('Lower Highs/Lower Lows', 80)
+    return None
+
+
+@detector('trendline_break')
+def _trendline_break(ctx):
+    """3. Close 0.5% through the swing-low support / swing-high resistance line"""
+    hits = []
+    if ctx.count('low') >= 3:
+        slope, intercept, _ = ctx.fit('low')
+        if ctx.last_close < (slope * (ctx.n - 1) + intercept) * 0.995:
+            hits.append(_bear('Trendline Break', 70))
+    if ctx.count('high') >= 3:
+        slope, intercept, _ = ctx.fit('high')
+        if ctx.last_close > (slope * (ctx.n - 1) + intercept) * 1.005:
+            hits.append(_bull('Trendline Break', 70))
+    return hits
+
+
+@detector('support_resistance')
+def _support_resistance(ctx):
+    """4. Support / resistance break and retest (last two swings, last 5 closes)"""
+    hits = []
+    recent = ctx.closes[-10:][-5:]
+    close = ctx.last_close
+    if ctx.count('low') >= 2:
+        support = np.mean(ctx.recent_lows[-2:])
+        if close < support * 0.995 and max(recent) >= support * 0.998:
+            hits.append(_bear('Support Break', 75))
+        elif close > support * 1.002 and min(recent) <= support * 1.005:
+            hits.append(_bull('Support Retest', 75))
+    if ctx.count('high') >= 2:
+        resistance = np.mean(ctx.recent_highs[-2:])
+        if close > resistance * 1.005 and min(recent) <= resistance * 1.002:
+            hits.append(_bull('Resistance Break', 75))
+        elif close < resistance * 0.998 and max(recent) >= resistance * 0.995:
+            hits.append(_bear('Resistance Retest', 75))
+    return hits
+
+
+@detector('triangles')
+def _triangles(ctx):
+    """5-7. Ascending / descending / symmetrical triangle from the shared trendline fits"""
+    if ctx.count('high') < 3 or ctx.count('low') < 3:
+        return None
+    norm_h, norm_l = ctx.fit('high')[2], ctx.fit('low')[2]
+    if abs(norm_h) < 5e-5 and norm_l > 1e-4:
+        return _bull('Ascending Triangle', 85, 1.5)
+    if norm_h < -1e-4 and abs(norm_l) < 5e-5:
+        return _bear('Descending Triangle', 85, 1.5)
+    if norm_h < -5e-5 and norm_l > 5e-5:
+        return PatternHit('Symmetrical Triangle', 'Neutral', 0, 70, 0.0)  # awaiting breakout
+    return None
+
+
+@detector('flags')
+def _flags(ctx):
+    """8-9. Pole closes[-40:-20] followed by a tight counter-trend flag closes[-20:]"""
+    if ctx.n < 40:
+        return None
+    pole = ctx.closes[-40:-20]
+    flag = ctx.closes[-20:]
+    pole_move = pole[-1] - pole[0]
+    flag_range = flag.max() - flag.min()
+    flag_slope = (flag[-1] - flag[0]) / len(flag)
+    if pole_move > 0 and flag_range / abs(pole_move) < 0.4 and flag_slope < 0:
+        return _bull('Bullish Flag', 80)
+    if pole_move < 0 and flag_range / abs(pole_move) < 0.4 and flag_slope > 0:
+        return _bear('Bearish Flag', 80)
+    return None
+
+
+@detector('rectangle')
+def _rectangle(ctx):
+    """10. Breakout from a low-volatility 30-bar range"""
+    if ctx.n < 30:
+        return None
+    window = ctx.closes[-30:]
+    if window.std() / np.mean(window) >= 0.015:
+        return None
+    if ctx.last_close > window.max() * 1.003:
+        return _bull('Rectangle Breakout', 80)
+    if ctx.last_close < window.min() * 0.997:
+        return _bear('Rectangle Breakout', 80)
+    return None
+
+
+@detector('double_top_bottom')
+def _double_top_bottom(ctx):
+    """11-12. Two swings within 0.8% with a 2% valley/peak between them"""
+    hits = []
+    if ctx.count('high') >= 2:
+        p1, p2 = ctx.swing_highs[-2], ctx.swing_highs[-1]
+        h1, h2 = ctx.highs[p1], ctx.highs[p2]
+        if abs(h1 - h2) / max(h1, h2) < 0.008 and ctx.lows[p1:p2].min() < min(h1, h2) * 0.98:
+            hits.append(_bear('Double Top', 85, 1.5))
+    if ctx.count('low') >= 2:
+        t1, t2 = ctx.swing_lows[-2], ctx.swing_lows[-1]
+        l1, l2 = ctx.lows[t1], ctx.lows[t2]
+        if abs(l1 - l2) / max(abs(l1), abs(l2)) < 0.008 and ctx.highs[t1:t2].max() > max(l1, l2) * 1.02:
+            hits.append(_bull('Double Bottom', 85, 1.5))
+    return hits
+
+
+@detector('head_shoulders')
+def _head_shoulders(ctx):
+    """13-14. Middle of the last 3 swings 1.5% beyond shoulders that agree within 3%"""
+    hits = []
+    if ctx.count('high') >= 3:
+        h = ctx.recent_highs
+        if (h[1] > h[0] and h[1] > h[2] and abs(h[0] - h[2]) / max(h[0], h[2]) < 0.03
+                and (h[1] - max(h[0], h[2])) / h[1] > 0.015):
+            hits.append(_bear('Head & Shoulders', 90, 2.0))
+    if ctx.count('low') >= 3:
+        l = ctx.recent_lows
+        if (l[1] < l[0] and l[1] < l[2] and abs(l[0] - l[2]) / max(abs(l[0]), abs(l[2])) < 0.03
+                and (min(l[0], l[2]) - l[1]) / abs(l[1]) > 0.015):
+            hits.append(_bull('Inverse Head & Shoulders', 90, 2.0))
+    return hits
+
+
+@detector('wedges')
+def _wedges(ctx):
+    """15. Rising / falling wedge: both trendlines sloping the same way and converging"""
+    if ctx.count('high') < 3 or ctx.count('low') < 3:
+        return None
+    norm_h, norm_l = ctx.fit('high')[2], ctx.fit('low')[2]
+    if norm_h > 5e-5 and norm_l > 5e-5 and norm_h < norm_l:
+        return _bear('Rising Wedge', 75)
+    if norm_h < -5e-5 and norm_l < -5e-5 and norm_h > norm_l:
+        return _bull('Falling Wedge', 75)
+    return None
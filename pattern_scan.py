@@ -0,0 +1,226 @@
+"""
+Rolling Chart Pattern Scan
+==========================
+For every bar of a long history, the pattern flags and score that
+TechnicalAnalysis.detect_chart_patterns would have returned had it been called
+on the history up to that bar, computed in vectorized passes instead of one
+detector call per bar (O(n) work instead of O(n * lookback)).
+
+- Swing points are found once over the whole series (indicator_kernels.swing_flags):
+  a pivot inside a bar's lookback window is exactly a global pivot whose
+  neighbourhood fits in the window, so each bar's last 2-3 swings are gathered
+  with searchsorted on the global swing index arrays
+- Valleys/peaks between consecutive swings come from one reduceat pass
+- Trendline fits through 3 swings use closed-form least squares (x relative to
+  the bar), the window mean and the flag/range windows use rolling kernels
+
+Rows mirror the live detector: bars with fewer than 50 candles of history have
+no patterns. Trendline slopes are computed in closed form rather than with
+np.polyfit, so a value sitting within rounding error of a threshold could flip;
+validate_patterns.py checks the scan bar-for-bar against the live detector.
+
+Usage:
+    scan = TechnicalAnalysis.scan_chart_patterns(df)   # one row per candle
+    X = df.join(scan[PATTERN_COLUMNS + ['pattern_score']])
+"""
+
+import numpy as np
+import pandas as pd
+from indicator_kernels import swing_flags, rolling_max, rolling_min, rolling_mean, rolling_std, shift
+
+MIN_BARS = 50  # detect_chart_patterns returns nothing below this
+
+# (column, detect_chart_patterns label, score contribution)
+PATTERNS = [
+    ('higher_highs_higher_lows', 'Higher Highs/Higher Lows (Bullish)', 1.0),
+    ('lower_highs_lower_lows', 'Lower Highs/Lower Lows (Bearish)', -1.0),
+    ('trendline_break_bearish', 'Trendline Break (Bearish)', -1.0),
+    ('trendline_break_bullish', 'Trendline Break (Bullish)', 1.0),
+    ('support_break', 'Support Break (Bearish)', -1.0),
+    ('support_retest', 'Support Retest (Bullish)', 1.0),
+    ('resistance_break', 'Resistance Break (Bullish)', 1.0),
+    ('resistance_retest', 'Resistance Retest (Bearish)', -1.0),
+    ('ascending_triangle', 'Ascending Triangle (Bullish)', 1.5),
+    ('descending_triangle', 'Descending Triangle (Bearish)', -1.5),
+    ('symmetrical_triangle', 'Symmetrical Triangle (Neutral)', 0.0),
+    ('bullish_flag', 'Bullish Flag (Bullish)', 1.0),
+    ('bearish_flag', 'Bearish Flag (Bearish)', -1.0),
+    ('rectangle_breakout_bullish', 'Rectangle Breakout (Bullish)', 1.0),
+    ('rectangle_breakout_bearish', 'Rectangle Breakout (Bearish)', -1.0),
+    ('double_top', 'Double Top (Bearish)', -1.5),
+    ('double_bottom', 'Double Bottom (Bullish)', 1.5),
+    ('head_shoulders', 'Head & Shoulders (Bearish)', -2.0),
+    ('inverse_head_shoulders', 'Inverse Head & Shoulders (Bullish)', 2.0),
+    ('rising_wedge', 'Rising Wedge (Bearish)', -1.0),
+    ('falling_wedge', 'Falling Wedge (Bullish)', 1.0),
+]
+PATTERN_COLUMNS = [column for column, _, _ in PATTERNS]
+PATTERN_LABELS = {column: label for column, label, _ in PATTERNS}
+
+
+class _RecentSwings:
+    """The last swings inside every bar's lookback window, from one global swing index array"""
+
+    def __init__(self, flags, values, window_start, bar, order):
+        self.index = np.flatnonzero(flags)
+        self.values = values
+        # Swings visible at bar t lie in [window_start + order, t - order]
+        self.stop = np.searchsorted(self.index, bar - order, side='right')
+        self.count = self.stop - np.searchsorted(self.index, window_start + order, side='left')
+
+    def position(self, back):
+        """Position in the swing array of the back-th most recent visible swing (1 = latest)"""
+        return np.clip(self.stop - back, 0, max(len(self.index) - 1, 0))
+
+    def at(self, back):
+        """(bar index, value) of the back-th most recent visible swing (garbage where count < back)"""
+        if len(self.index) == 0:
+            zeros = np.zeros(len(self.stop), dtype='int64')
+            return zeros, np.full(len(self.stop), np.nan)
+        idx = self.index[self.position(back)]
+        return idx, self.values[idx]
+
+    def between(self, reducer, other):
+        """reducer(other[swing_j:swing_j+1]) for the two latest visible swings (valley/peak between)"""
+        if len(self.index) == 0:
+            return np.full(len(self.stop), np.nan)
+        segments = reducer.reduceat(other, self.index)
+        return segments[self.position(2)]
+
+
+def _trend_fit(swings, bar):
+    """Least-squares line through the 3 latest visible swings: (slope, value at bar)"""
+    xs, ys = zip(*(swings.at(back) for back in (3, 2, 1)))
+    x = [(i - bar).astype('float64') for i in xs]
+    x_mean = (x[0] + x[1] + x[2]) / 3
+    y_mean = (ys[0] + ys[1] + ys[2]) / 3
+    dx = [xi - x_mean for xi in x]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = sum(d * (y - y_mean) for d, y in zip(dx, ys)) / sum(d * d for d in dx)
+    return slope, y_mean - slope * x_mean
+
+
+def scan_patterns(high, low, close, lookback=100, order=5):
+    """
+    Pattern flags for every bar of 1D high/low/close arrays.
+    Returns ({column: bool array} in PATTERN_COLUMNS order, score array).
+    """
+    if lookback < MIN_BARS:
+        raise ValueError(f"lookback must be at least {MIN_BARS} bars (got {lookback})")
+    high, low, close = (np.asarray(a, dtype='float64') for a in (high, low, close))
+    n = len(close)
+    bar = np.arange(n)
+    window_start = np.maximum(bar - lookback + 1, 0)
+    window_len = bar - window_start + 1
+    active = bar + 1 >= MIN_BARS
+
+    is_high, is_low = swing_flags(high, low, order)
+    sh = _RecentSwings(is_high, high, window_start, bar, order)
+    sl = _RecentSwings(is_low, low, window_start, bar, order)
+    _, h1 = sh.at(1)
+    _, h2 = sh.at(2)
+    _, h3 = sh.at(3)
+    _, l1 = sl.at(1)
+    _, l2 = sl.at(2)
+    _, l3 = sl.at(3)
+
+    # Window mean (detect_chart_patterns' avg_price) via re-anchored cumulative sums
+    reference = close[0] if n else 0.0
+    sums = np.concatenate([[0.0], np.cumsum(close - reference)])
+    avg_price = (sums[bar + 1] - sums[window_start]) / window_len + reference
+
+    recent_max = rolling_max(close, 5)
+    recent_min = rolling_min(close, 5)
+    flags = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 1-2. Higher highs / lower lows
+        two = (sh.count >= 2) & (sl.count >= 2)
+        flags['higher_highs_higher_lows'] = two & (h1 > h2) & (l1 > l2)
+        flags['lower_highs_lower_lows'] = two & ~flags['higher_highs_higher_lows'] & (h1 < h2) & (l1 < l2)
+
+        # 3. Trendline breaks
+        slope_l, support_line = _trend_fit(sl, bar)
+        slope_h, resistance_line = _trend_fit(sh, bar)
+        flags['trendline_break_bearish'] = (sl.count >= 3) & (close < support_line * 0.995)
+        flags['trendline_break_bullish'] = (sh.count >= 3) & (close > resistance_line * 1.005)
+
+        # 4. Support / resistance break and retest
+        support = (l1 + l2) / 2
+        breaks = (close < support * 0.995) & (recent_max >= support * 0.998)
+        flags['support_break'] = (sl.count >= 2) & breaks
+        flags['support_retest'] = (sl.count >= 2) & ~breaks & (close > support * 1.002) & (recent_min <= support * 1.005)
+        resistance = (h1 + h2) / 2
+        breaks = (close > resistance * 1.005) & (recent_min <= resistance * 1.002)
+        flags['resistance_break'] = (sh.count >= 2) & breaks
+        flags['resistance_retest'] = ((sh.count >= 2) & ~breaks & (close < resistance * 0.998)
+                                      & (recent_max >= resistance * 0.995))
+
+        # 5-7. Triangles, 15. wedges (same normalised slopes)
+        three = (sh.count >= 3) & (sl.count >= 3)
+        norm_h = slope_h / avg_price
+        norm_l = slope_l / avg_price
+        ascending = (np.abs(norm_h) < 5e-5) & (norm_l > 1e-4)
+        descending = ~ascending & (norm_h < -1e-4) & (np.abs(norm_l) < 5e-5)
+        flags['ascending_triangle'] = three & ascending
+        flags['descending_triangle'] = three & descending
+        flags['symmetrical_triangle'] = three & ~ascending & ~descending & (norm_h < -5e-5) & (norm_l > 5e-5)
+
+        # 8-9. Flags: pole closes[-40:-20], flag closes[-20:]
+        pole_move = close - shift(close, 19)
+        pole_move = shift(pole_move, 20)
+        flag_range = rolling_max(close, 20) - rolling_min(close, 20)
+        flag_slope = (close - shift(close, 19)) / 20
+        tight = flag_range / np.abs(pole_move) < 0.4
+        has_pole = window_len >= 40
+        bullish_flag = (pole_move > 0) & tight & (flag_slope < 0)
+        flags['bullish_flag'] = has_pole & bullish_flag
+        flags['bearish_flag'] = has_pole & ~bullish_flag & (pole_move < 0) & tight & (flag_slope > 0)
+
+        # 10. Rectangle breakout over the last 30 closes
+        ranging = (window_len >= 30) & (rolling_std(close, 30, ddof=0) / rolling_mean(close, 30) < 0.015)
+        high_range = rolling_max(close, 30)
+        flags['rectangle_breakout_bullish'] = ranging & (close > high_range * 1.003)
+        flags['rectangle_breakout_bearish'] = (ranging & ~(close > high_range * 1.003)
+                                               & (close < rolling_min(close, 30) * 0.997))
+
+        # 11-12. Double top / bottom
+        valley = sh.between(np.minimum, low)
+        flags['double_top'] = ((sh.count >= 2) & (np.abs(h2 - h1) / np.maximum(h2, h1) < 0.008)
+                               & (valley < np.minimum(h2, h1) * 0.98))
+        peak = sl.between(np.maximum, high)
+        flags['double_bottom'] = ((sl.count >= 2) & (np.abs(l2 - l1) / np.maximum(np.abs(l2), np.abs(l1)) < 0.008)
+                                  & (peak > np.maximum(l2, l1) * 1.02))
+
+        # 13-14. Head & shoulders (h3 = left shoulder, h2 = head, h1 = right shoulder)
+        flags['head_shoulders'] = ((sh.count >= 3) & (h2 > h3) & (h2 > h1)
+                                   & (np.abs(h3 - h1) / np.maximum(h3, h1) < 0.03)
+                                   & ((h2 - np.maximum(h3, h1)) / h2 > 0.015))
+        flags['inverse_head_shoulders'] = ((sl.count >= 3) & (l2 < l3) & (l2 < l1)
+                                           & (np.abs(l3 - l1) / np.maximum(np.abs(l3), np.abs(l1)) < 0.03)
+                                           & ((np.minimum(l3, l1) - l2) / np.abs(l2) > 0.015))
+
+        rising = (norm_h > 5e-5) & (norm_l > 5e-5) & (norm_h < norm_l)
+        flags['rising_wedge'] = three & rising
+        flags['falling_wedge'] = three & ~rising & (norm_h < -5e-5) & (norm_l < -5e-5) & (norm_h > norm_l)
+
+    flags = {column: flags[column] & active for column in PATTERN_COLUMNS}
+    score = np.zeros(n)
+    for column, _, weight in PATTERNS:
+        score += flags[column] * weight
+    return flags, score
+
+
+def scan_frame(df, lookback=100, order=5):
+    """scan_patterns for a candle frame: one row per candle (same index), bool flags + pattern_score"""
+    flags, score = scan_patterns(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+                                 lookback=lookback, order=order)
+    result = pd.DataFrame(flags, index=df.index)
+    result['pattern_score'] = score
+    if 'datetime' in df.columns:
+        result.insert(0, 'datetime', df['datetime'])
+    return result
+
+
+def pattern_labels(row):
+    """detect_chart_patterns-style pattern list for one scan row"""
+    return [PATTERN_LABELS[column] for column in PATTERN_COLUMNS if row[column]]
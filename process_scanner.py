@@ -0,0 +1,219 @@
+"""
+Process-Pool Scanner
+====================
+Scans large symbol universes across worker processes, so the CPU-bound part of
+analysis (indicators, pattern detection, RF inference) runs on every core instead
+of behind one interpreter's GIL.
+
+- The parent does the I/O: candles for every symbol (DataLoader.fetch_market_data_many)
+  and pair sentiment from one aggregation. Closed markets are checked first and
+  served from the last result without fetching
+- Candles are packed once into a shared_memory block: (5, symbols, bars) float64
+  OHLCV followed by (symbols, bars) int64 datetimes, rows right-aligned like
+  batch_indicators. Workers attach by name and read only their own rows; no
+  DataFrame is pickled on the way in
+- Each worker builds one DecisionEngine (and loads the ML model) in its initializer
+  and reuses it for every shard of every scan
+- Symbols are split into shards (several per worker, to balance uneven work); each
+  shard runs DecisionEngine.analyze_frames and sends back its result dicts, which are
+  merged in the parent
+
+Usage:
+    with ProcessScanner(processes=8) as scanner:
+        for pair, result, seconds in scanner.scan(symbols):
+            ...
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from config import Config
+from utils import logger, get_symbol_trading_hours
+
+PRICE_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+SHARDS_PER_WORKER = 4
+
+# Per-process engine, built once by _init_worker
+_ENGINE = None
+
+
+def _init_worker(use_ml):
+    global _ENGINE
+    from strategy import DecisionEngine
+    _ENGINE = DecisionEngine(use_ml=use_ml)
+
+
+class SharedCandles:
+    """Candle frames packed into one shared_memory block (created by the parent, attached by workers)"""
+
+    def __init__(self, shm, n_symbols, bars, owner=False):
+        """
+        Args:
+            shm: SharedMemory block
+            n_symbols: Rows in the block
+            bars: Columns (longest frame)
+            owner: True in the process that created (and must unlink) the block
+        """
+        self.shm = shm
+        self.n_symbols = n_symbols
+        self.bars = bars
+        self.owner = owner
+        price_bytes = len(PRICE_FIELDS) * n_symbols * bars * 8
+        self.prices = np.ndarray((len(PRICE_FIELDS), n_symbols, bars), dtype='float64', buffer=shm.buf)
+        self.datetimes = np.ndarray((n_symbols, bars), dtype='int64', buffer=shm.buf, offset=price_bytes)
+
+    @classmethod
+    def pack(cls, frames):
+        """Copy [candle DataFrame] into a new block; returns (SharedCandles, lengths)"""
+        bars = max((len(df) for df in frames), default=0)
+        size = max(1, (len(PRICE_FIELDS) + 1) * len(frames) * bars * 8)
+        block = cls(shared_memory.SharedMemory(create=True, size=size), len(frames), bars, owner=True)
+        block.prices.fill(np.nan)
+        block.datetimes.fill(np.iinfo('int64').min)  # NaT
+        lengths = []
+        for i, df in enumerate(frames):
+            n = len(df)
+            for f, field in enumerate(PRICE_FIELDS):
+                if field in df.columns:
+                    block.prices[f, i, bars - n:] = df[field].to_numpy(dtype='float64')
+            if 'datetime' in df.columns:
+                block.datetimes[i, bars - n:] = pd.to_datetime(df['datetime']).to_numpy(dtype='datetime64[ns]').view('int64')
+            lengths.append(n)
+        return block, lengths
+
+    @classmethod
+    def attach(cls, name, n_symbols, bars):
+        return cls(shared_memory.SharedMemory(name=name), n_symbols, bars)
+
+    def frame(self, row, length, has_volume):
+        """Candle DataFrame for one row (copied out, so the block can be closed afterwards)"""
+        start = self.bars - length
+        data = {'datetime': self.datetimes[row, start:].astype('datetime64[ns]')}
+        for f, field in enumerate(PRICE_FIELDS):
+            if field != 'volume' or has_volume:
+                data[field] = self.prices[f, row, start:].copy()
+        return pd.DataFrame(data)
+
+    def close(self):
+        # Views must go before the buffer can be released
+        del self.prices, self.datetimes
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _scan_shard(name, n_symbols, bars, members):
+    """
+    Worker task: analyze one shard of the shared block.
+    members: [(row, pair, length, has_volume, sentiment_score)]
+    Returns ([(pair, result)], seconds).
+    """
+    started = time.perf_counter()
+    block = SharedCandles.attach(name, n_symbols, bars)
+    try:
+        frames = {pair: block.frame(row, length, has_volume) for row, pair, length, has_volume, _ in members}
+    finally:
+        block.close()
+    sentiment = {pair: score for _, pair, _, _, score in members}
+    results = _ENGINE.analyze_frames(frames, sentiment=sentiment)
+    return list(results.items()), time.perf_counter() - started
+
+
+class ProcessScanner:
+    def __init__(self, processes=None, use_ml=True, loader=None, sentiment=None):
+        """
+        Args:
+            processes: Worker processes (default Config.SCAN_PROCESSES, else os.cpu_count())
+            use_ml: Load the ML model in each worker
+            loader: DataLoader used for candle fetches in the parent (default: a new one)
+            sentiment: SentimentEngine used in the parent (default: a new one)
+        """
+        if loader is None:
+            from data_loader import DataLoader
+            loader = DataLoader()
+        if sentiment is None:
+            from sentiment import SentimentEngine
+            sentiment = SentimentEngine()
+        self.processes = max(1, processes or Config.SCAN_PROCESSES or os.cpu_count() or 1)
+        self.loader = loader
+        self.sentiment = sentiment
+        # Last scored result per pair, served while its market is closed (as DecisionEngine does)
+        self._last_results = {}
+        self.pool = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker, initargs=(use_ml,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def scan(self, pairs):
+        """
+        Analyze pairs across the pool.
+        Yields (pair, result, seconds) as shards finish; result is None if its shard raised,
+        seconds is the pair's share of its shard's compute time.
+        """
+        from strategy import DecisionEngine
+
+        started = time.perf_counter()
+        pairs = list(dict.fromkeys(p.upper() for p in pairs))
+        valid = []
+        for pair in pairs:
+            if pair not in Config.VALID_SYMBOLS:
+                yield pair, DecisionEngine._invalid_result(pair), 0.0
+                continue
+            # Session check before any I/O: closed markets are served from the last result
+            session_info = get_symbol_trading_hours(pair)
+            if not session_info['is_open'] and pair in self._last_results:
+                yield pair, DecisionEngine.closed_result(self._last_results[pair], session_info), 0.0
+            else:
+                valid.append(pair)
+
+        fetched = self.loader.fetch_market_data_many(valid) if valid else {}
+        frames = {}
+        for pair in valid:
+            df = fetched.get(pair)
+            if df is None or len(df) < 50:
+                yield pair, DecisionEngine._wait_result(pair, "Insufficient Data"), 0.0
+            else:
+                frames[pair] = df
+        if not frames:
+            return
+        sentiment = self.sentiment.get_pair_sentiment_scores(list(frames))
+        fetch_seconds = time.perf_counter() - started
+
+        block, lengths = SharedCandles.pack(list(frames.values()))
+        try:
+            members = [(row, pair, lengths[row], 'volume' in df.columns, sentiment[pair])
+                       for row, (pair, df) in enumerate(frames.items())]
+            shard_size = math.ceil(len(members) / (self.processes * SHARDS_PER_WORKER))
+            futures = {}
+            for i in range(0, len(members), shard_size):
+                shard = members[i:i + shard_size]
+                future = self.pool.submit(_scan_shard, block.shm.name, block.n_symbols, block.bars, shard)
+                futures[future] = [pair for _, pair, _, _, _ in shard]
+
+            for future in as_completed(futures):
+                try:
+                    results, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"Scan shard {', '.join(futures[future])} failed: {e}")
+                    for pair in futures[future]:
+                        yield pair, None, 0.0
+                    continue
+                for pair, result in results:
+                    if 'session_info' in result:  # scored (not an Insufficient Data WAIT)
+                        self._last_results[pair] = result
+                    yield pair, result, seconds / len(results)
+        finally:
+            block.close()
+
+        logger.info(f"Process scan: {len(frames)} symbols on {self.processes} workers in "
+                    f"{time.perf_counter() - started:.2f}s (fetch + sentiment {fetch_seconds:.2f}s)")
@@ -0,0 +1,183 @@
+"""
+Market Data Provider Health
+===========================
+Rolling success/latency statistics and circuit breakers per data provider,
+shared by every DataLoader in the process:
+- A breaker opens after Config.BREAKER_FAILURE_THRESHOLD consecutive failures,
+  or immediately on a rate-limit response (honouring Retry-After)
+- Open breakers are skipped until their cooldown ends, then one half-open
+  probe is let through; success closes the breaker, failure re-opens it with
+  a doubled cooldown (capped at Config.BREAKER_MAX_COOLDOWN)
+- ranked() orders providers fastest-healthy-first for the fallback chain
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from config import Config
+from utils import logger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def parse_retry_after(value):
+    """Retry-After header (delta-seconds or HTTP date) -> seconds, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class _ProviderState:
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)  # (ok, latency_seconds)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = Config.BREAKER_COOLDOWN
+        self.probe_started = None
+
+
+class ProviderHealth:
+    def __init__(self, window=None):
+        """
+        Args:
+            window: Number of recent calls kept per provider (default: Config.PROVIDER_HEALTH_WINDOW)
+        """
+        self.window = window or Config.PROVIDER_HEALTH_WINDOW
+        self._lock = threading.Lock()
+        self._providers = {}
+
+    def _get(self, provider):
+        if provider not in self._providers:
+            self._providers[provider] = _ProviderState(self.window)
+        return self._providers[provider]
+
+    def allow(self, provider):
+        """True if a request to provider may be sent now (closed, or the half-open probe)"""
+        now = time.time()
+        with self._lock:
+            p = self._get(provider)
+            if p.state == CLOSED:
+                return True
+            if p.state == OPEN:
+                if now < p.open_until:
+                    return False
+                p.state = HALF_OPEN
+                p.probe_started = None
+            # Half-open: a single probe at a time; a probe that never reported back expires
+            if p.probe_started is None or now - p.probe_started > 2 * Config.HTTP_TIMEOUT:
+                p.probe_started = now
+                return True
+            return False
+
+    def record_success(self, provider, latency):
+        with self._lock:
+            p = self._get(provider)
+            p.samples.append((True, latency))
+            p.consecutive_failures = 0
+            if p.state != CLOSED:
+                logger.info(f"Circuit for {provider} closed (probe succeeded in {latency:.2f}s).")
+            p.state = CLOSED
+            p.cooldown = Config.BREAKER_COOLDOWN
+            p.probe_started = None
+
+    def record_failure(self, provider, latency=0.0, rate_limited=False, retry_after=None):
+        """
+        Record a failed call. Rate-limit responses open the breaker at once for
+        retry_after seconds (or the current cooldown when the server gave none).
+        """
+        now = time.time()
+        with self._lock:
+            p = self._get(provider)
+            p.samples.append((False, latency))
+            p.consecutive_failures += 1
+            if p.state == HALF_OPEN:
+                p.cooldown = min(p.cooldown * 2, Config.BREAKER_MAX_COOLDOWN)
+            if rate_limited or p.state == HALF_OPEN or p.consecutive_failures >= Config.BREAKER_FAILURE_THRESHOLD:
+                wait = retry_after if (rate_limited and retry_after is not None) else p.cooldown
+                p.state = OPEN
+                p.open_until = now + wait
+                p.probe_started = None
+                reason = "rate limited" if rate_limited else f"{p.consecutive_failures} consecutive failures"
+                logger.warning(f"Circuit for {provider} opened for {wait:.0f}s ({reason}).")
+
+    def stats(self, provider):
+        """(success_rate, mean_latency) over the rolling window, or None without samples"""
+        with self._lock:
+            samples = list(self._get(provider).samples)
+        if not samples:
+            return None
+        ok_latencies = [lat for ok, lat in samples if ok]
+        success_rate = len(ok_latencies) / len(samples)
+        mean_latency = sum(ok_latencies) / len(ok_latencies) if ok_latencies else float('inf')
+        return success_rate, mean_latency
+
+    def ranked(self, providers):
+        """
+        Order providers for a fallback chain: available before open breakers, then higher
+        success rate, then lower latency. Untried providers are ranked as healthy at the
+        median measured latency, so among equals the configured order decides.
+        """
+        now = time.time()
+        stats = {provider: self.stats(provider) for provider in providers}
+        latencies = sorted(s[1] for s in stats.values() if s is not None and s[1] != float('inf'))
+        typical = latencies[len(latencies) // 2] if latencies else 0.0
+
+        def key(item):
+            priority, provider = item
+            with self._lock:
+                p = self._get(provider)
+                is_open = p.state == OPEN and now < p.open_until
+            if stats[provider] is None:
+                return (is_open, 0.0, typical, priority)
+            success_rate, mean_latency = stats[provider]
+            # Bucket success rate so small differences don't outweigh latency
+            return (is_open, round(1.0 - success_rate, 1), mean_latency, priority)
+
+        return [provider for _, provider in sorted(enumerate(providers), key=key)]
+
+    def snapshot(self):
+        """Breaker state and rolling stats per provider (for status endpoints/logs)"""
+        now = time.time()
+        report = {}
+        with self._lock:
+            names = list(self._providers)
+        for provider in names:
+            stats = self.stats(provider)
+            with self._lock:
+                p = self._providers[provider]
+                report[provider] = {
+                    'state': p.state,
+                    'open_for': round(max(0.0, p.open_until - now), 1) if p.state == OPEN else 0.0,
+                    'consecutive_failures': p.consecutive_failures,
+                    'success_rate': round(stats[0], 3) if stats else None,
+                    'mean_latency': round(stats[1], 3) if stats and stats[1] != float('inf') else None
+                }
+        return report
+
+
+_shared_health = None
+_shared_lock = threading.Lock()
+
+
+def get_provider_health():
+    """Process-wide ProviderHealth shared by all DataLoaders"""
+    global _shared_health
+    with _shared_lock:
+        if _shared_health is None:
+            _shared_health = ProviderHealth()
+        return _shared_health
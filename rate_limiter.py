@@ -0,0 +1,217 @@
+"""
+Shared API Rate Limiter
+=======================
+Per-provider token buckets used by every DataLoader in the process (and,
+with the file backend, by every process on the host such as gunicorn workers):
+- Refill rate and burst capacity per provider (Config.RATE_LIMITS)
+- Optional daily quota that resets at 00:00 UTC
+- Blocking acquire() that sleeps exactly until a token is due
+- acquire_async() for asyncio callers, try_acquire() for non-blocking checks
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from config import Config
+from utils import logger
+
+try:
+    import fcntl  # POSIX only; file backend degrades to in-memory elsewhere
+except ImportError:
+    fcntl = None
+
+
+class MemoryBackend:
+    """Bucket state held in this process, guarded by a lock"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def transact(self, fn):
+        """Run fn(state_dict) atomically and return its result"""
+        with self._lock:
+            return fn(self._state)
+
+
+class FileBackend:
+    """Bucket state kept in a JSON file and guarded by flock, shared across processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def transact(self, fn):
+        """Run fn(state_dict) atomically across threads and processes"""
+        with self._lock:
+            with open(self.path, 'a+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    try:
+                        state = json.loads(raw) if raw else {}
+                    except ValueError:
+                        state = {}  # Corrupt/partial file: start from full buckets
+                    result = fn(state)
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                    return result
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    def __init__(self, limits=None, backend=None):
+        """
+        Initialize the limiter
+
+        Args:
+            limits: {provider: {'per_minute': float, 'burst': int, 'daily': int or None}}
+            backend: MemoryBackend or FileBackend (default: MemoryBackend)
+        """
+        self.limits = limits if limits is not None else Config.RATE_LIMITS
+        self.backend = backend or MemoryBackend()
+
+    def _reserve(self, provider, tokens, now, only_if_available=False):
+        """
+        Debit tokens from the provider bucket.
+        Returns seconds to wait before the reservation is honoured,
+        or None if the daily quota (or, with only_if_available, the bucket) cannot cover it.
+        """
+        limit = self.limits[provider]
+        rate = limit['per_minute'] / 60.0
+        capacity = float(limit.get('burst') or limit['per_minute'])
+        daily = limit.get('daily')
+        today = time.strftime('%Y-%m-%d', time.gmtime(now))
+
+        def apply(state):
+            bucket = state.get(provider)
+            if bucket is None:
+                bucket = {'tokens': capacity, 'updated': now, 'day': today, 'used_today': 0}
+            if bucket['day'] != today:
+                bucket['day'] = today
+                bucket['used_today'] = 0
+
+            # Refill since last update (tokens may be negative while reservations are queued)
+            elapsed = max(0.0, now - bucket['updated'])
+            bucket['tokens'] = min(capacity, bucket['tokens'] + elapsed * rate)
+            bucket['updated'] = now
+
+            if daily is not None and bucket['used_today'] + tokens > daily:
+                state[provider] = bucket
+                return None
+            if only_if_available and bucket['tokens'] < tokens:
+                state[provider] = bucket
+                return None
+
+            bucket['tokens'] -= tokens
+            bucket['used_today'] += tokens
+            state[provider] = bucket
+            return 0.0 if bucket['tokens'] >= 0 else -bucket['tokens'] / rate
+
+        return self.backend.transact(apply)
+
+    def _refund(self, provider, tokens):
+        """Return tokens from a reservation that will not be used"""
+        def apply(state):
+            bucket = state.get(provider)
+            if bucket is not None:
+                bucket['tokens'] += tokens
+                bucket['used_today'] = max(0, bucket['used_today'] - tokens)
+        self.backend.transact(apply)
+
+    def acquire(self, provider, tokens=1, timeout=None):
+        """
+        Block until `tokens` are available for provider.
+        Returns False if the daily quota is spent or the wait would exceed timeout.
+        Providers without a configured limit are never throttled.
+        """
+        if provider not in self.limits:
+            return True
+        wait = self._reserve(provider, tokens, time.time())
+        if wait is None:
+            logger.warning(f"Daily quota exhausted for {provider}.")
+            return False
+        if timeout is not None and wait > timeout:
+            self._refund(provider, tokens)
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, provider, tokens=1, timeout=None):
+        """asyncio variant of acquire(): awaits the token instead of blocking the loop"""
+        if provider not in self.limits:
+            return True
+        wait = self._reserve(provider, tokens, time.time())
+        if wait is None:
+            logger.warning(f"Daily quota exhausted for {provider}.")
+            return False
+        if timeout is not None and wait > timeout:
+            self._refund(provider, tokens)
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def try_acquire(self, provider, tokens=1):
+        """Take tokens only if they are available right now; never sleeps"""
+        if provider not in self.limits:
+            return True
+        return self._reserve(provider, tokens, time.time(), only_if_available=True) is not None
+
+    def release(self, provider, tokens=1):
+        """Give back tokens taken by try_acquire() for a request that was never sent"""
+        if provider in self.limits:
+            self._refund(provider, tokens)
+
+    def status(self):
+        """Snapshot of bucket levels and daily usage per provider"""
+        now = time.time()
+
+        def read(state):
+            snapshot = {}
+            for provider, limit in self.limits.items():
+                bucket = state.get(provider)
+                capacity = float(limit.get('burst') or limit['per_minute'])
+                if bucket is None:
+                    tokens, used = capacity, 0
+                else:
+                    elapsed = max(0.0, now - bucket['updated'])
+                    tokens = min(capacity, bucket['tokens'] + elapsed * limit['per_minute'] / 60.0)
+                    used = bucket['used_today']
+                snapshot[provider] = {
+                    'tokens': round(tokens, 2),
+                    'capacity': capacity,
+                    'used_today': used,
+                    'daily_quota': limit.get('daily')
+                }
+            return snapshot
+
+        return self.backend.transact(read)
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter built from Config (file-backed when supported)"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            backend = None
+            if Config.RATE_LIMIT_BACKEND == "file":
+                if fcntl is not None:
+                    backend = FileBackend(Config.RATE_LIMIT_FILE)
+                else:
+                    logger.warning("File rate-limit backend needs fcntl; using in-memory buckets.")
+            _shared_limiter = RateLimiter(Config.RATE_LIMITS, backend)
+        return _shared_limiter
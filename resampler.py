@@ -0,0 +1,122 @@
+"""
+Multi-Timeframe Resampling
+==========================
+Higher timeframes (1h, 4h, 1day, ...) are derived locally from the stored base
+timeframe (Config.TIMEFRAME) instead of being fetched separately, so analysing
+a symbol on several timeframes costs the API budget of one.
+
+- resample_candles: vectorized OHLCV aggregation (numpy reduceat over bucket runs)
+- Resampler: per (symbol, timeframe) cache of derived frames keyed on the store's
+  write version; after one write only the buckets from the first rewritten base
+  row onwards are recomputed (a refreshed forming bar, appended or backfilled rows)
+
+Buckets are aligned to the Unix epoch (UTC), e.g. 4h bars start at 00/04/08/...
+The last derived bar may still be forming, just like the latest REST candle.
+With Config.LOW_MEMORY_INDICATORS the cached frames are stored as float32.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from config import Config
+from candle_store import CandleStore, CANDLE_COLUMNS, timeframe_to_timedelta
+
+
+def resample_candles(df, timeframe):
+    """Aggregate a time-sorted candle frame into timeframe bars"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+    period = timeframe_to_timedelta(timeframe).value
+    times = df['datetime'].to_numpy(dtype='datetime64[ns]').astype('int64')
+    buckets = times // period
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    result = {'datetime': (buckets[starts] * period).astype('datetime64[ns]')}
+    result['open'] = df['open'].to_numpy(dtype='float64')[starts]
+    result['high'] = np.maximum.reduceat(df['high'].to_numpy(dtype='float64'), starts)
+    result['low'] = np.minimum.reduceat(df['low'].to_numpy(dtype='float64'), starts)
+    result['close'] = df['close'].to_numpy(dtype='float64')[ends]
+    if 'volume' in df.columns:
+        result['volume'] = np.add.reduceat(df['volume'].to_numpy(dtype='float64'), starts)
+    else:
+        result['volume'] = np.zeros(len(starts))
+    return pd.DataFrame(result)
+
+
+class _Derived:
+    def __init__(self, version, base_rows, frame):
+        self.version = version
+        self.base_rows = base_rows
+        self.frame = frame
+
+
+class Resampler:
+    def __init__(self, store=None, base_timeframe=None):
+        """
+        Args:
+            store: CandleStore holding the base timeframe (default: new CandleStore)
+            base_timeframe: Finest stored granularity (default: Config.TIMEFRAME)
+        """
+        self.store = store or CandleStore()
+        self.base_timeframe = base_timeframe or Config.TIMEFRAME
+        self._base_period = timeframe_to_timedelta(self.base_timeframe)
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def get(self, symbol, timeframe, limit=None):
+        """Candles for symbol on timeframe derived from stored base history (None if no history)"""
+        period = timeframe_to_timedelta(timeframe)
+        if period % self._base_period != pd.Timedelta(0):
+            raise ValueError(f"{timeframe} is not a multiple of the base timeframe {self.base_timeframe}")
+
+        if period == self._base_period:
+            # A copy: the stored tail is rewritten in place when the forming bar is refetched
+            return self.store.load(symbol, self.base_timeframe, limit=limit, copy=True)
+
+        # Revision first: a write landing between it and the load only makes the next call recompute
+        version, changed_from = self.store.revision(symbol, self.base_timeframe)
+        base = self.store.load(symbol, self.base_timeframe)
+        if base is None or base.empty:
+            return None
+
+        times = base['datetime'].to_numpy(dtype='datetime64[ns]')
+        key = (symbol, timeframe)
+        with self._lock:
+            cached = self._cache.get(key)
+
+        if cached and cached.version == version and cached.base_rows == len(base):
+            frame = cached.frame
+        elif cached and version == cached.version + 1 and 0 < changed_from < len(base) and len(cached.frame):
+            # One write since: rebuild from the derived bar holding its first rewritten row onwards
+            changed = int(times[changed_from].astype('int64'))
+            resume = np.datetime64(changed - changed % period.value, 'ns')
+            keep = int(np.searchsorted(cached.frame['datetime'].to_numpy(dtype='datetime64[ns]'), resume))
+            pos = int(np.searchsorted(times, resume))
+            tail = resample_candles(base.iloc[pos:], timeframe)
+            frame = pd.concat([cached.frame.iloc[:keep], tail], ignore_index=True)
+        else:
+            frame = resample_candles(base, timeframe)
+
+        if Config.LOW_MEMORY_INDICATORS:
+            frame = frame.astype({c: 'float32' for c in frame.columns if frame[c].dtype == 'float64'})
+        with self._lock:
+            self._cache[key] = _Derived(version, len(base), frame)
+        return frame.tail(limit).reset_index(drop=True) if limit else frame
+
+    def memory_usage(self):
+        """Bytes held by cached derived frames, per symbol"""
+        usage = {}
+        with self._lock:
+            for (symbol, _), derived in self._cache.items():
+                usage[symbol] = usage.get(symbol, 0) + int(derived.frame.memory_usage(index=True, deep=True).sum())
+        return usage
+
+    def invalidate(self, symbol=None):
+        """Drop cached frames (all, or one symbol's)"""
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == symbol]:
+                    del self._cache[key]
@@ -17,30 +17,52 @@ class SentimentEngine:
 
     def update_sentiment_scores(self):
         """
-        Read news from DB with 0 sentiment score, update them.
+        Read unscored news from DB, update them in one bulk write.
+        Scored items are flagged so neutral (0.0) headlines aren't rescored every cycle.
         """
         from utils import get_mongo_db
+        from pymongo import UpdateOne
         db_mongo = get_mongo_db()
         if db_mongo is None:
             return
 
-        # Get news where sentiment_score is 0
-        cursor = db_mongo.news.find({"sentiment_score": 0})
+        # Get news where sentiment_score is 0 and that haven't been scored yet
+        cursor = db_mongo.news.find(
+            {"sentiment_score": 0, "sentiment_scored": {"$ne": True}},
+            {"id": 1, "title": 1}
+        )
         
-        count = 0
+        updates = []
         for doc in cursor:
-            news_id = doc['id']
-            title = doc.get('title', '')
-            score = self.analyze_text(title)
+            score = self.analyze_text(doc.get('title', ''))
+            updates.append(UpdateOne(
+                {"id": doc['id']},
+                {"$set": {"sentiment_score": score, "sentiment_scored": True}}
+            ))
             
-            db_mongo.news.update_one(
-                {"id": news_id},
-                {"$set": {"sentiment_score": score}}
-            )
-            count += 1
-            
-        if count > 0:
-            logger.info(f"Updated sentiment for {count} news items.")
+        if updates:
+            db_mongo.news.bulk_write(updates, ordered=False)
+            logger.info(f"Updated sentiment for {len(updates)} news items.")
+
+    @staticmethod
+    def _currency_match(currency):
+        """$match condition for news about a currency (commodities matched by name)"""
+        # Aliases for Commodities
+        search_term = currency
+        if currency == 'XAU': search_term = 'Gold'
+        if currency == 'XAG': search_term = 'Silver'
+        return {
+            "$or": [
+                {"title": {"$regex": search_term, "$options": "i"}},
+                {"currency": currency}
+            ]
+        }
+
+    @staticmethod
+    def _cutoff(hours):
+        from datetime import datetime, timedelta
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        return cutoff_time.isoformat() # Assuming we store as ISO strings
 
     def get_currency_sentiment(self, currency, hours=24):
         """
@@ -52,25 +74,12 @@ class SentimentEngine:
         if db_mongo is None:
             return 0
         
-        # Aliases for Commodities
-        search_term = currency
-        if currency == 'XAU': search_term = 'Gold'
-        if currency == 'XAG': search_term = 'Silver'
-        
-        # Calculate time threshold
-        from datetime import datetime, timedelta
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-        cutoff_str = cutoff_time.isoformat() # Assuming we store as ISO strings
-
         # Pipeline to filter and average
         pipeline = [
             {
                 "$match": {
-                    "$or": [
-                        {"title": {"$regex": search_term, "$options": "i"}},
-                        {"currency": currency}
-                    ],
-                    "date": {"$gte": cutoff_str}
+                    **self._currency_match(currency),
+                    "date": {"$gte": self._cutoff(hours)}
                 }
             },
             {
@@ -92,6 +101,37 @@ class SentimentEngine:
             
         return 0
 
+    def get_currency_sentiments(self, currencies, hours=24):
+        """
+        get_currency_sentiment for many currencies with one aggregation:
+        one date $match, then a $facet branch per currency.
+        Returns {currency: score}.
+        """
+        from utils import get_mongo_db
+        currencies = list(dict.fromkeys(currencies))
+        scores = dict.fromkeys(currencies, 0)
+        db_mongo = get_mongo_db()
+        if db_mongo is None or not currencies:
+            return scores
+
+        group = {"$group": {"_id": None, "avg_score": {"$avg": "$sentiment_score"}, "count": {"$sum": 1}}}
+        pipeline = [
+            {"$match": {"date": {"$gte": self._cutoff(hours)}}},
+            {"$facet": {currency: [{"$match": self._currency_match(currency)}, group] for currency in currencies}}
+        ]
+
+        try:
+            result = list(db_mongo.news.aggregate(pipeline))
+            facets = result[0] if result else {}
+            for currency in currencies:
+                rows = facets.get(currency) or []
+                if rows:
+                    scores[currency] = (rows[0]['avg_score'] or 0) * 2 # Scaled
+        except Exception as e:
+            logger.error(f"Sentiment Query Error: {e}")
+
+        return scores
+
     def get_pair_sentiment_score(self, pair):
         """
         EURUSD -> Score(EUR) - Score(USD)
@@ -103,3 +143,8 @@ class SentimentEngine:
         s_quote = self.get_currency_sentiment(quote)
         
         return s_base - s_quote
+
+    def get_pair_sentiment_scores(self, pairs):
+        """get_pair_sentiment_score for many pairs from one get_currency_sentiments query"""
+        scores = self.get_currency_sentiments([c for pair in pairs for c in (pair[:3], pair[3:])])
+        return {pair: scores[pair[:3]] - scores[pair[3:]] for pair in pairs}
@@ -0,0 +1,202 @@
+"""
+Session Calendar
+================
+Precomputed trading sessions per asset class, so "is this market open?" is an
+O(1) lookup that can run before any data fetch:
+
+- Each asset class has a minute-of-week table (7 x 1440 entries, in the class's
+  own timezone) holding an open flag and a session-name id, plus a table of
+  minutes until the next open minute
+- Holidays close the whole local day: fixed annual dates (FX/metals Christmas and
+  New Year) and dated exchange holidays, extendable with Config.MARKET_HOLIDAYS
+- Crypto trades 24/7; FX and metals follow the London/New York sessions
+  (08:00-22:00 UTC, Mon-Fri); US equities the NYSE regular session in New York time
+
+Usage:
+    from session_calendar import get_calendar
+    get_calendar().is_open('EURUSD')                # -> bool
+    get_calendar().session_info('AAPL', at=utc_dt)  # -> get_symbol_trading_hours dict
+"""
+
+from datetime import date, datetime, timedelta, timezone
+import numpy as np
+from config import Config
+
+try:
+    from zoneinfo import ZoneInfo
+    NEW_YORK = ZoneInfo("America/New_York")
+except Exception:
+    # No tz database (e.g. Windows without tzdata): New York standard time
+    NEW_YORK = timezone(timedelta(hours=-5))
+
+MINUTES_PER_WEEK = 7 * 1440
+
+CRYPTO = ["BTC", "ETH"]
+METALS = ["XAU", "XAG"]
+EQUITIES = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"]
+
+# (weekdays, start 'HH:MM', end 'HH:MM', session name) in the class's timezone; Monday = 0
+SESSIONS = {
+    'crypto': [(range(7), '00:00', '24:00', 'Crypto Market (24/7)')],
+    'forex': [(range(5), '08:00', '13:00', 'London Session'),
+              (range(5), '13:00', '17:00', 'London + NY Overlap (Peak)'),
+              (range(5), '17:00', '22:00', 'New York Session')],
+    'equities': [(range(5), '09:30', '16:00', 'NYSE Regular Session')],
+}
+SESSIONS['metals'] = SESSIONS['forex']
+
+TIMEZONES = {'crypto': timezone.utc, 'forex': timezone.utc, 'metals': timezone.utc, 'equities': NEW_YORK}
+
+# Closed every year on (month, day)
+ANNUAL_HOLIDAYS = {
+    'forex': {(1, 1), (12, 25)},
+    'metals': {(1, 1), (12, 25)},
+}
+
+# NYSE full-day closures
+HOLIDAYS = {
+    'equities': {date.fromisoformat(d) for d in [
+        "2025-01-01", "2025-01-09", "2025-01-20", "2025-02-17", "2025-04-18", "2025-05-26",
+        "2025-06-19", "2025-07-04", "2025-09-01", "2025-11-27", "2025-12-25",
+        "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25", "2026-06-19",
+        "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+        "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31", "2027-06-18",
+        "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+    ]},
+}
+
+CLOSED = 'Market Closed'
+WEEKEND = 'Weekend - Market Closed'
+HOLIDAY = 'Holiday - Market Closed'
+
+
+def asset_class(symbol):
+    """'crypto' | 'metals' | 'equities' | 'forex' for a symbol"""
+    symbol = symbol.upper()
+    if any(c in symbol for c in CRYPTO):
+        return 'crypto'
+    if any(m in symbol for m in METALS):
+        return 'metals'
+    if symbol in EQUITIES or len(symbol) != 6:
+        return 'equities'
+    return 'forex'
+
+
+def _minute(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class _WeekTable:
+    """Minute-of-week session tables for one asset class"""
+
+    def __init__(self, sessions):
+        self.names = [CLOSED, WEEKEND]
+        self.session = np.zeros(MINUTES_PER_WEEK, dtype=np.uint8)
+        self.session[5 * 1440:] = 1  # Saturday/Sunday
+        for weekdays, start, end, name in sessions:
+            if name not in self.names:
+                self.names.append(name)
+            for day in weekdays:
+                self.session[day * 1440 + _minute(start):day * 1440 + _minute(end)] = self.names.index(name)
+        self.open = self.session >= 2
+
+        # Minutes from each minute to the next open one (0 when open), wrapping around the week
+        opens = np.flatnonzero(self.open)
+        minutes = np.arange(MINUTES_PER_WEEK)
+        if len(opens):
+            wrapped = np.concatenate([opens, opens + MINUTES_PER_WEEK])
+            self.until_open = wrapped[np.searchsorted(wrapped, minutes)] - minutes
+        else:
+            self.until_open = None
+
+
+class SessionCalendar:
+    def __init__(self, holidays=None):
+        """
+        Args:
+            holidays: Extra {asset_class: [date]} closures (default: Config.MARKET_HOLIDAYS)
+        """
+        self.tables = {cls: _WeekTable(sessions) for cls, sessions in SESSIONS.items()}
+        self.holidays = {cls: set(HOLIDAYS.get(cls, ())) for cls in SESSIONS}
+        for cls, days in (holidays if holidays is not None else _configured_holidays()).items():
+            self.holidays.setdefault(cls, set()).update(days)
+        self._classes = {}
+
+    def asset_class(self, symbol):
+        cls = self._classes.get(symbol)
+        if cls is None:
+            cls = self._classes[symbol] = asset_class(symbol)
+        return cls
+
+    def _local(self, cls, at):
+        at = at or datetime.utcnow()
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        return at.astimezone(TIMEZONES[cls])
+
+    def _is_holiday(self, cls, local):
+        return local.date() in self.holidays[cls] or (local.month, local.day) in ANNUAL_HOLIDAYS.get(cls, ())
+
+    def status(self, symbol, at=None):
+        """(is_open, session_name) at `at` (UTC; naive datetimes are taken as UTC, default now)"""
+        cls = self.asset_class(symbol)
+        local = self._local(cls, at)
+        if self._is_holiday(cls, local):
+            return False, HOLIDAY
+        table = self.tables[cls]
+        i = table.session[local.weekday() * 1440 + local.hour * 60 + local.minute]
+        return bool(i >= 2), table.names[i]
+
+    def is_open(self, symbol, at=None):
+        return self.status(symbol, at)[0]
+
+    def next_open(self, symbol, at=None):
+        """Next session open after `at` as a naive UTC datetime (None if open now or never opens)"""
+        cls = self.asset_class(symbol)
+        table = self.tables[cls]
+        tz = TIMEZONES[cls]
+        if table.until_open is None or self.status(symbol, at)[0]:
+            return None
+        local = self._local(cls, at).replace(second=0, microsecond=0)
+        for _ in range(14):
+            if not self._is_holiday(cls, local):
+                minute = local.weekday() * 1440 + local.hour * 60 + local.minute
+                candidate = (local.replace(tzinfo=None) + timedelta(minutes=int(table.until_open[minute]))).replace(tzinfo=tz)
+                if not self._is_holiday(cls, candidate):
+                    return candidate.astimezone(timezone.utc).replace(tzinfo=None)
+                local = candidate
+            # Holiday: continue from the next local midnight
+            local = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+        return None
+
+    def session_info(self, symbol, at=None):
+        """get_symbol_trading_hours dict: {'is_open', 'session_name', 'next_open_ist'}"""
+        is_open, name = self.status(symbol, at)
+        next_open_ist = None
+        if not is_open:
+            next_open = self.next_open(symbol, at)
+            if next_open is not None:
+                next_open_ist = (next_open + timedelta(hours=5, minutes=30)).strftime('%A, %B %d at %H:%M IST')
+        return {'is_open': is_open, 'session_name': name, 'next_open_ist': next_open_ist}
+
+
+def _configured_holidays():
+    """Config.MARKET_HOLIDAYS 'class:YYYY-MM-DD,...' -> {class: [date]}"""
+    holidays = {}
+    for item in Config.MARKET_HOLIDAYS.split(','):
+        if ':' in item:
+            cls, day = item.strip().split(':', 1)
+            holidays.setdefault(cls.strip().lower(), []).append(date.fromisoformat(day.strip()))
+    return holidays
+
+
+_calendar = None
+
+
+def get_calendar():
+    """Process-wide calendar (tables are built once)"""
+    global _calendar
+    if _calendar is None:
+        _calendar = SessionCalendar()
+    return _calendar
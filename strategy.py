@@ -1,9 +1,12 @@
 from config import Config
 from indicators import TechnicalAnalysis
+from indicator_kernels import SIGNAL_COLUMNS
 from sentiment import SentimentEngine
 from data_loader import DataLoader
+from resampler import Resampler
 from utils import logger, is_trading_hours, get_symbol_trading_hours, get_utc_to_ist
 import pandas as pd
+import numpy as np
 import os
 
 class DecisionEngine:
@@ -11,8 +14,11 @@ class DecisionEngine:
         self.loader = DataLoader()
         self.ta = TechnicalAnalysis()
         self.sentiment = SentimentEngine()
+        self.resampler = Resampler(self.loader.store)
         self.use_ml = use_ml
         self.ml_model = None
+        # Last scored result per pair, served while its market is closed
+        self._last_results = {}
         
         # Try to load ML model if requested
         if self.use_ml:
@@ -30,77 +36,238 @@ class DecisionEngine:
                 logger.warning(f"Could not load ML model: {e}. Using rule-based system.")
                 self.ml_model = None
 
-    def analyze_pair(self, pair):
+    def analyze_pair(self, pair, hedge=False):
         """
         Main logic for a single pair.
+        hedge: race data providers for lower latency (interactive lookups)
         Returns dict with Signal details.
         """
-        from datetime import datetime, timedelta
-        
         # Validate symbol first
         if pair.upper() not in Config.VALID_SYMBOLS:
-            dt_utc = datetime.utcnow()
-            dt_ist = dt_utc + timedelta(hours=5, minutes=30)
-            return {
-                "time": dt_utc.isoformat(),
-                "time_ist": dt_ist.strftime('%Y-%m-%d %H:%M:%S (IST)'),
-                "pair": pair,
-                "signal": "WAIT",
-                "confidence": 0.0,
-                "price": 0.0,
-                "stop_loss": 0.0,
-                "take_profit": 0.0,
-                "reason": f"Invalid Symbol: '{pair}' not recognized",
-                "scores": (0, 0)
-            }
-        
-        # Helper to get current UTC ISO time
-        def get_current_utc():
-            return datetime.utcnow().isoformat()
-
-        # Helper for empty return (Data Fetch Failed)
-        def return_empty(reason):
-             dt_utc = datetime.utcnow()
-             dt_ist = dt_utc + timedelta(hours=5, minutes=30)
-             return {
-                "time": dt_utc.isoformat(),
-                "pair": pair,
-                "signal": "WAIT",
-                "confidence": 0.0,
-                "price": 0.0,
-                "stop_loss": 0.0,
-                "take_profit": 0.0,
-                "reason": reason,
-                "scores": (0, 0)
-            }
+            return self._invalid_result(pair)
+        
+        # Session check before any I/O: a closed market has no new bars to fetch
+        session_info = get_symbol_trading_hours(pair)
+        if not session_info['is_open']:
+            cached = self._closed_result(pair, session_info)
+            if cached is not None:
+                return cached
         
         # 1. Fetch Data (Always, to support 24/7 logging/viewing)
-        df = self.loader.fetch_market_data(pair)
+        df = self.loader.fetch_market_data(pair, hedge=hedge)
+        return self.analyze_frame(pair, df)
+
+    def analyze_many(self, pairs):
+        """
+        analyze_pair for a whole watch list in shared passes:
+        - candles for every pair fetched together (TwelveData batches, concurrent fallbacks)
+        - indicators computed as one (symbols x bars) batch
+        - sentiment for every involved currency from one aggregation
+        - one batched predict_proba for all ML feature rows
+        Pairs whose market is closed are served from their last result without fetching.
+        Returns {pair: result dict}, each the same dict analyze_pair returns.
+        """
+        results = {pair: self._invalid_result(pair) for pair in pairs if pair.upper() not in Config.VALID_SYMBOLS}
+        valid = [pair for pair in pairs if pair not in results]
+        for pair in valid:
+            session_info = get_symbol_trading_hours(pair)
+            if not session_info['is_open']:
+                cached = self._closed_result(pair, session_info)
+                if cached is not None:
+                    results[pair] = cached
+        valid = [pair for pair in valid if pair not in results]
+
+        fetched = self.loader.fetch_market_data_many(valid) if valid else {}
+        results.update(self.analyze_frames({pair: fetched.get(pair.upper()) for pair in valid}))
+        return {pair: results[pair] for pair in pairs}
+
+    def analyze_frames(self, frames, sentiment=None):
+        """
+        Batched analyze_frame: {pair: candle frame or None} -> {pair: result dict}.
+        sentiment: {pair: score} already resolved by the caller (default: one query here)
+        """
+        results = {}
+        valid = {}
+        for pair, df in frames.items():
+            if df is None or len(df) < 50:
+                results[pair] = self._wait_result(pair, "Insufficient Data")
+            else:
+                valid[pair] = df
+
+        # One batch: frames without volume get their zero OBV columns per row
+        indicator_frames = {}
+        if valid:
+            batch = self.ta.add_indicators_batch(valid)
+            indicator_frames = {p: batch.frame(p) for p in valid}
+
+        if sentiment is None:
+            sentiment = self.sentiment.get_pair_sentiment_scores(list(valid))
+
+        ml = {}
+        if self.ml_model is not None and indicator_frames:
+            try:
+                latest = pd.DataFrame([df.iloc[-1] for df in indicator_frames.values()],
+                                      index=list(indicator_frames))
+                ml = dict(zip(latest.index, self.ml_model.predict_many(latest)))
+            except Exception as e:
+                logger.warning(f"ML prediction failed: {e}")
+
+        for pair, df in indicator_frames.items():
+            results[pair] = self._score_frame(pair, df, sentiment.get(pair, 0), ml.get(pair, ('HOLD', 0.0)))
+        return {pair: results[pair] for pair in frames}
+
+    def _closed_result(self, pair, session_info):
+        """
+        Last result for pair re-labelled for a closed session (as _score_frame would label it),
+        or None if the pair hasn't been scored yet
+        """
+        last = self._last_results.get(pair)
+        return None if last is None else self.closed_result(last, session_info)
+
+    @staticmethod
+    def closed_result(last, session_info):
+        """A scored result dict re-labelled WAIT for a closed session"""
+        reason = f"Market Closed - {session_info['session_name']}"
+        if last['scores'][2] != 0.0 and last.get('ml_prediction'):
+            reason += f" | ML: {last['ml_prediction']['signal']}"
+        if last.get('patterns'):
+            reason += f" | Patterns: {', '.join(last['patterns'][:2])}"
+        return {**last, "signal": "WAIT", "reason": reason, "session_info": session_info}
+
+    @staticmethod
+    def _invalid_result(pair):
+        """WAIT result for symbols outside Config.VALID_SYMBOLS"""
+        from datetime import datetime, timedelta
+        dt_utc = datetime.utcnow()
+        dt_ist = dt_utc + timedelta(hours=5, minutes=30)
+        return {
+            "time": dt_utc.isoformat(),
+            "time_ist": dt_ist.strftime('%Y-%m-%d %H:%M:%S (IST)'),
+            "pair": pair,
+            "signal": "WAIT",
+            "confidence": 0.0,
+            "price": 0.0,
+            "stop_loss": 0.0,
+            "take_profit": 0.0,
+            "reason": f"Invalid Symbol: '{pair}' not recognized",
+            "scores": (0, 0)
+        }
+
+    @staticmethod
+    def _wait_result(pair, reason):
+        """WAIT result for pairs that can't be analyzed (e.g. data fetch failed)"""
+        from datetime import datetime
+        return {
+            "time": datetime.utcnow().isoformat(),
+            "pair": pair,
+            "signal": "WAIT",
+            "confidence": 0.0,
+            "price": 0.0,
+            "stop_loss": 0.0,
+            "take_profit": 0.0,
+            "reason": reason,
+            "scores": (0, 0)
+        }
+
+    def timeframe_confluence(self, pair):
+        """
+        Technical bias of each Config.MTF_TIMEFRAMES frame, resampled from stored history.
+        Returns (score, {timeframe: tech_score}); score is Config.MTF_WEIGHT scaled by how
+        far the higher timeframes agree (+ bullish, - bearish). Timeframes without
+        enough history are skipped.
+        """
+        biases = {}
+        for timeframe in Config.MTF_TIMEFRAMES:
+            try:
+                htf = self.resampler.get(pair, timeframe)
+                if htf is None or len(htf) < 50:
+                    continue
+                htf = self.ta.add_indicators(htf.tail(Config.CANDLE_WINDOW * 2).reset_index(drop=True),
+                                             columns=SIGNAL_COLUMNS)
+                if not htf.empty:
+                    biases[timeframe] = self.ta.get_signal_score(htf.iloc[-1])
+            except Exception as e:
+                logger.warning(f"{timeframe} confluence failed for {pair}: {e}")
+        if not biases:
+            return 0.0, biases
+        agreement = sum(np.sign(score) for score in biases.values()) / len(Config.MTF_TIMEFRAMES)
+        return Config.MTF_WEIGHT * float(agreement), biases
+
+    def indicator_columns(self):
+        """Indicator columns analyze_frame reads: signal score, ATR stops, ML features"""
+        columns = SIGNAL_COLUMNS + ['atr']
+        if self.ml_model is not None:
+            columns += [c for c in self.ml_model.feature_columns if c not in columns]
+        return columns
+
+    def analyze_frame(self, pair, df):
+        """
+        Score a pair from an already-loaded candle frame (REST fetch or streamed bars).
+        Returns the same signal dict as analyze_pair.
+        """
         if df is None or len(df) < 50:
-             return return_empty("Insufficient Data")
-        
-        # 2. Compute Technicals
-        df = self.ta.add_indicators(df)
-        latest_candle = df.iloc[-1]
-        
-        tech_score = self.ta.get_signal_score(latest_candle)
+            return self._wait_result(pair, "Insufficient Data")
+
+        # 2. Compute Technicals (only the columns this engine reads)
+        df = self.ta.add_indicators(df, columns=self.indicator_columns())
         
         # 3. Compute Sentiment
         sent_score = self.sentiment.get_pair_sentiment_score(pair)
         
+        # 4. ML Prediction (if available)
+        ml_prediction = self._ml_predict(df.iloc[-1])
+
+        return self._score_frame(pair, df, sent_score, ml_prediction)
+
+    def analyze_bar(self, pair, df, values):
+        """
+        analyze_frame for a live bar close without an add_indicators pass.
+        df: closed candles, last row = the bar that just closed (patterns, prices)
+        values: that bar's indicator values from IncrementalIndicators (O(1) per bar)
+        Falls back to analyze_frame until the incremental state is ready.
+        """
+        if df is None or len(df) < 50:
+            return self._wait_result(pair, "Insufficient Data")
+        if not values or any(v != v for v in values.values()):
+            return self.analyze_frame(pair, df)
+
+        latest = pd.concat([df.iloc[-1], pd.Series(values)])
+        sent_score = self.sentiment.get_pair_sentiment_score(pair)
+        return self._score_frame(pair, df, sent_score, self._ml_predict(latest), latest=latest)
+
+    def _ml_predict(self, latest):
+        """(signal, confidence) for an indicator row; ('HOLD', 0.0) without a model, None if it failed"""
+        if self.ml_model is None:
+            return ('HOLD', 0.0)
+        try:
+            # Prepare features for ML prediction
+            features = latest[self.ml_model.feature_columns].to_dict()
+            return self.ml_model.predict_single(features)
+        except Exception as e:
+            logger.warning(f"ML prediction failed: {e}")
+            return None
+
+    def _score_frame(self, pair, df, sent_score, ml_prediction, latest=None):
+        """
+        Signal dict from an indicator frame plus the pair's sentiment score and ML
+        (signal, confidence) prediction (None: prediction failed, scored as 0).
+        latest: indicator row to score instead of df's last row (streaming path)
+        """
+        latest_candle = df.iloc[-1] if latest is None else latest
+        
+        tech_score = self.ta.get_signal_score(latest_candle)
+        
         # 3.b Detect Chart Patterns (adds/subtracts score)
         patterns, pattern_score, pattern_details = self.ta.detect_chart_patterns(df, lookback=100)
         
-        # 4. ML Prediction (if available)
+        # 4. ML score
         ml_signal = "HOLD"
         ml_confidence = 0.0
         ml_score = 0.0
         
-        if self.ml_model is not None:
+        if self.ml_model is not None and ml_prediction is not None:
             try:
-                # Prepare features for ML prediction
-                features = latest_candle[self.ml_model.feature_columns].to_dict()
-                ml_signal, ml_confidence = self.ml_model.predict_single(features)
+                ml_signal, ml_confidence = ml_prediction
                 
                 # Convert ML signal to score
                 if ml_signal == 'BUY':
@@ -115,8 +282,13 @@ class DecisionEngine:
                 logger.warning(f"ML prediction failed: {e}")
                 ml_score = 0.0
         
-        # 5. Total Score (include pattern score and ML score)
-        total_score = tech_score + sent_score + pattern_score + ml_score
+        # 4.b Higher-timeframe confluence (opt-in, resampled locally)
+        mtf_score, mtf_biases = 0.0, {}
+        if Config.MTF_CONFLUENCE:
+            mtf_score, mtf_biases = self.timeframe_confluence(pair)
+
+        # 5. Total Score (include pattern score, ML score and timeframe confluence)
+        total_score = tech_score + sent_score + pattern_score + ml_score + mtf_score
         
         signal = "WAIT"
         if total_score >= Config.BUY_THRESHOLD:
@@ -125,8 +297,9 @@ class DecisionEngine:
             signal = "SELL"
             
         # 6. Risk Management Calculations
-        atr = latest_candle['atr']
-        price = latest_candle['close']
+        # Plain floats: low-memory frames hold np.float32, which BSON can't encode
+        atr = float(latest_candle['atr'])
+        price = float(latest_candle['close'])
         
         sl = 0.0
         tp = 0.0
@@ -159,6 +332,8 @@ class DecisionEngine:
             final_reason += f", ML: {ml_signal} ({ml_confidence:.0%})"
         if patterns:
             final_reason += f", Patterns: {', '.join(patterns[:3])}"  # Limit to first 3 patterns
+        if mtf_biases:
+            final_reason += ", MTF: " + " ".join(f"{tf} {score:+.1f}" for tf, score in mtf_biases.items())
         
         # Override signal if market is closed (but still store data)
         if not session_info['is_open']:
@@ -169,7 +344,7 @@ class DecisionEngine:
             if patterns:
                 final_reason += f" | Patterns: {', '.join(patterns[:2])}"
             
-        return {
+        result = {
             "time": dt_utc.isoformat(),  # Store UTC ISO-8601
             "time_ist": dt_ist.strftime('%Y-%m-%d %H:%M:%S (IST)'),  # Display IST
             "pair": pair,
@@ -187,17 +362,20 @@ class DecisionEngine:
             "session_info": session_info,
             "raw_data": {
                 "time": dt_utc.isoformat(), # Store as UTC ISO string
-                "open": latest_candle['open'],
-                "high": latest_candle['high'],
-                "low": latest_candle['low'],
-                "close": latest_candle['close'],
-                "rsi": latest_candle.get('rsi', 0),
-                "macd": latest_candle.get('macd', 0),
-                "atr": latest_candle.get('atr', 0),
-                "ema_20": latest_candle.get('ema_20', 0),
-                "ema_50": latest_candle.get('ema_50', 0)
+                "open": float(latest_candle['open']),
+                "high": float(latest_candle['high']),
+                "low": float(latest_candle['low']),
+                "close": float(latest_candle['close']),
+                "rsi": float(latest_candle.get('rsi', 0)),
+                "macd": float(latest_candle.get('macd', 0)),
+                "atr": float(latest_candle.get('atr', 0)),
+                "ema_20": float(latest_candle.get('ema_20', 0)),
+                "ema_50": float(latest_candle.get('ema_50', 0))
             },
             "patterns": patterns,
             "pattern_score": pattern_score,
+            "mtf": {"score": mtf_score, "timeframes": mtf_biases} if Config.MTF_CONFLUENCE else None,
             "pattern_details": pattern_details
         }
+        self._last_results[pair] = result
+        return result
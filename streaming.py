@@ -0,0 +1,443 @@
+"""
+Streaming Tick Ingestion
+========================
+Aggregates a live tick stream into OHLC bars for several timeframes at once
+(Config.STREAM_TIMEFRAMES) and hands each closed bar of the signal timeframe
+to DecisionEngine.analyze_bar, so signals no longer wait for the next REST poll.
+
+- BarAggregator: O(1) work per tick and timeframe. The forming bar lives in flat
+  Python lists; closed bars go into preallocated numpy ring buffers, so no
+  DataFrame is built until a consumer asks for one on bar close.
+- SimulatedTickFeed: deterministic random-walk ticks (local stand-in / benchmarks)
+- WebSocketTickFeed: TwelveData price websocket (requires websocket-client)
+- StreamingEngine: wires a feed -> aggregator -> analysis worker thread, keeping
+  incremental indicators current for every closed signal-timeframe bar and
+  scoring each close from them (no add_indicators recompute per bar)
+
+Usage:
+    python streaming.py --simulate --tps 5000 --duration 10
+    python streaming.py --simulate --realtime --analyze
+    python streaming.py                       # live websocket feed
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from config import Config
+from candle_store import timeframe_to_timedelta
+from incremental_indicators import IncrementalIndicators
+from utils import logger
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+BAR_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class BarAggregator:
+    def __init__(self, symbols, timeframes=None, capacity=None, on_bar_close=None):
+        """
+        Args:
+            symbols: Symbols accepted from the feed (others are ignored)
+            timeframes: Bar timeframes to build (default: Config.STREAM_TIMEFRAMES)
+            capacity: Closed bars kept per symbol/timeframe (default: Config.STREAM_BAR_CAPACITY)
+            on_bar_close: Callback(symbol, timeframe, bar) with bar = (start_ts, open, high, low, close, volume)
+        """
+        self.symbols = list(symbols)
+        self.timeframes = list(timeframes or Config.STREAM_TIMEFRAMES)
+        self.capacity = capacity or Config.STREAM_BAR_CAPACITY
+        self.on_bar_close = on_bar_close
+        self._tf_seconds = [int(timeframe_to_timedelta(tf).total_seconds()) for tf in self.timeframes]
+        self._tf_index = {tf: k for k, tf in enumerate(self.timeframes)}
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._lock = threading.Lock()
+
+        # Forming bar per (symbol, timeframe) slot. start < 0 means no forming bar:
+        # -1 initially, -(end + 1) after flush() closed a bar ending at `end`
+        slots = len(self.symbols) * len(self.timeframes)
+        self._start = [-1] * slots
+        self._open = [0.0] * slots
+        self._high = [0.0] * slots
+        self._low = [0.0] * slots
+        self._close = [0.0] * slots
+        self._volume = [0.0] * slots
+        self._last = [-1] * slots  # timestamp of the tick that set close
+
+        # Closed bars: ring buffers written only on bar close
+        self._times = np.zeros((slots, self.capacity), dtype='int64')
+        self._bars = np.zeros((slots, self.capacity, len(BAR_FIELDS)), dtype='float64')
+        self._head = [0] * slots
+        self._count = [0] * slots
+
+        self.ticks = 0
+        self.late_ticks = 0
+
+    def _slot(self, symbol, timeframe):
+        return self._index[symbol] * len(self.timeframes) + self._tf_index[timeframe]
+
+    def _close_bar(self, slot):
+        """Move the forming bar of slot into its ring buffer; returns the bar tuple"""
+        bar = (self._start[slot], self._open[slot], self._high[slot],
+               self._low[slot], self._close[slot], self._volume[slot])
+        head = self._head[slot]
+        self._times[slot, head] = bar[0]
+        self._bars[slot, head] = bar[1:]
+        self._head[slot] = (head + 1) % self.capacity
+        if self._count[slot] < self.capacity:
+            self._count[slot] += 1
+        return bar
+
+    def _emit(self, closed):
+        if self.on_bar_close is None:
+            return
+        n_tf = len(self.timeframes)
+        for slot, bar in closed:
+            try:
+                self.on_bar_close(self.symbols[slot // n_tf], self.timeframes[slot % n_tf], bar)
+            except Exception as e:
+                logger.error(f"Bar close handler failed: {e}")
+
+    def on_tick(self, symbol, timestamp, price, volume=0.0):
+        """
+        Apply one tick (timestamp in epoch seconds). A tick older than a timeframe's
+        forming bar is dropped from that timeframe only (counted in late_ticks per
+        timeframe missed); higher timeframes whose bar is still forming add it to
+        high/low and volume, but close stays with the newest tick.
+        """
+        i = self._index.get(symbol)
+        if i is None:
+            return
+        ts = int(timestamp)
+        closed = None
+        with self._lock:
+            self.ticks += 1
+            base = i * len(self._tf_seconds)
+            for k, secs in enumerate(self._tf_seconds):
+                slot = base + k
+                bucket = ts - ts % secs
+                start = self._start[slot]
+                if bucket == start:
+                    if price > self._high[slot]:
+                        self._high[slot] = price
+                    elif price < self._low[slot]:
+                        self._low[slot] = price
+                    # A late tick (kept by a higher timeframe) only widens the range
+                    if ts >= self._last[slot]:
+                        self._close[slot] = price
+                        self._last[slot] = ts
+                    self._volume[slot] += volume
+                elif bucket > start:
+                    if start >= 0:
+                        if closed is None:
+                            closed = []
+                        closed.append((slot, self._close_bar(slot)))
+                    elif bucket < -start - 1:
+                        # Belongs to a bar already closed by flush()
+                        self.late_ticks += 1
+                        continue
+                    self._start[slot] = bucket
+                    self._last[slot] = ts
+                    self._open[slot] = self._high[slot] = self._low[slot] = self._close[slot] = price
+                    self._volume[slot] = volume
+                else:
+                    self.late_ticks += 1
+        if closed:
+            self._emit(closed)
+
+    def flush(self, now=None):
+        """Close forming bars whose period has ended (quiet symbols get no closing tick)"""
+        now = int(now if now is not None else time.time())
+        closed = []
+        n_tf = len(self._tf_seconds)
+        with self._lock:
+            for slot, start in enumerate(self._start):
+                if start >= 0 and start + self._tf_seconds[slot % n_tf] <= now:
+                    closed.append((slot, self._close_bar(slot)))
+                    self._start[slot] = -(start + self._tf_seconds[slot % n_tf]) - 1
+        self._emit(closed)
+        return len(closed)
+
+    def seed(self, symbol, timeframe, df):
+        """
+        Preload history (e.g. from the CandleStore) so analysis has enough bars on
+        the first close. The last row becomes the forming bar, since REST history
+        usually ends with the current, incomplete candle.
+        """
+        if df is None or df.empty:
+            return
+        slot = self._slot(symbol, timeframe)
+        df = df.tail(self.capacity + 1)
+        times = pd.to_datetime(df['datetime']).to_numpy(dtype='datetime64[s]').astype('int64')
+        values = np.column_stack([
+            df[f].to_numpy(dtype='float64') if f in df.columns else np.zeros(len(df))
+            for f in BAR_FIELDS
+        ])
+        with self._lock:
+            n = len(df) - 1
+            self._times[slot, :n] = times[:n]
+            self._bars[slot, :n] = values[:n]
+            self._head[slot] = n % self.capacity
+            self._count[slot] = n
+            self._start[slot] = self._last[slot] = int(times[-1])
+            (self._open[slot], self._high[slot], self._low[slot],
+             self._close[slot], self._volume[slot]) = values[-1]
+
+    def frame(self, symbol, timeframe, limit=None):
+        """Closed bars for symbol/timeframe as a candle DataFrame, oldest first"""
+        slot = self._slot(symbol, timeframe)
+        with self._lock:
+            count, head = self._count[slot], self._head[slot]
+            if limit:
+                count = min(count, limit)
+            order = np.arange(head - count, head) % self.capacity
+            times = self._times[slot, order]
+            bars = self._bars[slot, order]
+        df = pd.DataFrame(bars, columns=BAR_FIELDS)
+        df.insert(0, 'datetime', pd.to_datetime(times, unit='s'))
+        return df
+
+
+class SimulatedTickFeed:
+    def __init__(self, symbols, ticks_per_second=1000, seed=0, realtime=False, start_time=None):
+        """
+        Args:
+            symbols: Symbols to generate ticks for (round-robin)
+            ticks_per_second: Total tick rate across all symbols
+            realtime: Pace ticks on the wall clock; otherwise a simulated clock runs as fast as possible
+            start_time: Epoch seconds of the first tick (default: now)
+        """
+        self.symbols = list(symbols)
+        self.ticks_per_second = ticks_per_second
+        self.realtime = realtime
+        self.start_time = start_time
+        self.rng = np.random.default_rng(seed)
+        self.prices = [1.0 + (zlib.crc32(s.encode()) % 20000) / 100.0 for s in self.symbols]
+
+    def run(self, on_tick, stop_event=None, duration=None, max_ticks=None):
+        """Push ticks into on_tick(symbol, ts, price, volume) until stopped; returns ticks sent"""
+        clock = self.start_time if self.start_time is not None else time.time()
+        step = 1.0 / self.ticks_per_second
+        began = time.time()
+        sent = 0
+        n = len(self.symbols)
+        while True:
+            # Draw randomness in chunks so the per-tick loop is plain Python arithmetic
+            moves = (self.rng.standard_normal(4096) * 0.0002).tolist()
+            sizes = self.rng.integers(1, 100, 4096).tolist()
+            for move, size in zip(moves, sizes):
+                if (stop_event is not None and stop_event.is_set()) or (max_ticks and sent >= max_ticks):
+                    return sent
+                if duration is not None and (clock - (self.start_time or began) >= duration if not self.realtime
+                                             else time.time() - began >= duration):
+                    return sent
+                k = sent % n
+                price = self.prices[k] * (1.0 + move)
+                self.prices[k] = price
+                on_tick(self.symbols[k], clock, price, float(size))
+                sent += 1
+                clock += step
+                if self.realtime:
+                    delay = began + sent * step - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+
+
+class WebSocketTickFeed:
+    def __init__(self, symbols, url=None, api_key=None):
+        """
+        Args:
+            symbols: Engine symbols (EURUSD) to subscribe to
+            url: Websocket endpoint (default: Config.STREAM_URL)
+            api_key: Provider key (default: Config.API_KEY_TWELVEDATA)
+        """
+        from data_loader import DataLoader
+        self.symbols = list(symbols)
+        self.url = url or Config.STREAM_URL
+        self.api_key = api_key or Config.API_KEY_TWELVEDATA
+        self._feed_symbols = {DataLoader._twelvedata_symbol(s): s for s in self.symbols}
+
+    def run(self, on_tick, stop_event=None, duration=None):
+        """Stream price events into on_tick, reconnecting with backoff until stopped"""
+        if websocket is None:
+            logger.error("websocket-client is not installed; pip install websocket-client for live streaming.")
+            return 0
+        stop_event = stop_event or threading.Event()
+        if duration is not None:
+            threading.Timer(duration, stop_event.set).start()
+        received = [0]
+        day_volumes = {}  # symbol -> last cumulative day_volume
+
+        def on_open(ws):
+            ws.send(json.dumps({"action": "subscribe", "params": {"symbols": ",".join(self._feed_symbols)}}))
+            logger.info(f"Subscribed to {len(self._feed_symbols)} symbols on {self.url}")
+
+        def on_message(ws, message):
+            if stop_event.is_set():
+                ws.close()
+                return
+            event = json.loads(message)
+            if event.get('event') != 'price':
+                return
+            symbol = self._feed_symbols.get(event.get('symbol'))
+            if symbol is None:
+                return
+            received[0] += 1
+            # day_volume is cumulative for the session: a tick's volume is the increase since
+            # the previous event (0 for the first event and after the daily reset)
+            day_volume = float(event.get('day_volume') or 0.0)
+            previous = day_volumes.get(symbol)
+            day_volumes[symbol] = day_volume
+            volume = day_volume - previous if previous is not None and day_volume >= previous else 0.0
+            on_tick(symbol, event.get('timestamp', time.time()), float(event['price']), volume)
+
+        backoff = 1
+        while not stop_event.is_set():
+            app = websocket.WebSocketApp(f"{self.url}?apikey={self.api_key}",
+                                         on_open=on_open, on_message=on_message)
+            app.run_forever(ping_interval=10)
+            if stop_event.is_set():
+                break
+            logger.warning(f"Price stream disconnected; reconnecting in {backoff}s")
+            stop_event.wait(backoff)
+            backoff = min(backoff * 2, 60)
+        return received[0]
+
+
+class StreamingEngine:
+    def __init__(self, engine, feed, symbols=None, timeframes=None, signal_timeframe=None,
+                 on_result=None, persist=True):
+        """
+        Args:
+            engine: DecisionEngine whose analyze_bar runs on each signal-timeframe bar close
+            feed: SimulatedTickFeed / WebSocketTickFeed (anything with run(on_tick, stop_event, duration))
+            signal_timeframe: Timeframe that triggers analysis (default: Config.TIMEFRAME)
+            on_result: Callback(pair, result) for each analysis (default: log BUY/SELL signals)
+            persist: Append closed signal-timeframe bars to the engine's CandleStore
+        """
+        self.engine = engine
+        self.feed = feed
+        self.symbols = list(symbols or Config.VALID_SYMBOLS)
+        self.signal_timeframe = signal_timeframe or Config.TIMEFRAME
+        timeframes = list(timeframes or Config.STREAM_TIMEFRAMES)
+        if self.signal_timeframe not in timeframes:
+            timeframes.append(self.signal_timeframe)
+        self.aggregator = BarAggregator(self.symbols, timeframes, on_bar_close=self._on_bar_close)
+        self.on_result = on_result or self._log_result
+        self.persist = persist
+        self.indicators = IncrementalIndicators()  # live signal-timeframe indicators, O(1) per bar
+        self.bars_closed = 0
+        self.analyses = 0
+        self._events = queue.Queue()
+        self._latest_close = {}  # symbol -> start of its most recent closed signal bar
+        self._stop = threading.Event()
+
+    def seed_history(self):
+        """Load stored signal-timeframe history so the first bar close can be analyzed"""
+        store = self.engine.loader.store
+        for symbol in self.symbols:
+            df = store.load(symbol, self.signal_timeframe, limit=self.aggregator.capacity + 1)
+            self.aggregator.seed(symbol, self.signal_timeframe, df)
+            if df is not None and len(df) > 1:
+                self.indicators.warm_up(symbol, df.iloc[:-1])  # last row is still forming
+
+    def _on_bar_close(self, symbol, timeframe, bar):
+        self.bars_closed += 1
+        if timeframe == self.signal_timeframe:
+            self._latest_close[symbol] = bar[0]
+            values = self.indicators.update(symbol, bar[2], bar[3], bar[4], bar[5])
+            self._events.put((symbol, bar, values))
+
+    @staticmethod
+    def _log_result(pair, result):
+        if result['signal'] != "WAIT":
+            logger.info(f"STREAM SIGNAL: {pair} {result['signal']} @ {result['price']} ({result['reason']})")
+
+    def _analysis_worker(self):
+        while not self._stop.is_set() or not self._events.empty():
+            try:
+                symbol, bar, values = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if self.persist:
+                    row = pd.DataFrame([bar[1:]], columns=BAR_FIELDS)
+                    row.insert(0, 'datetime', pd.to_datetime([bar[0]], unit='s'))
+                    self.engine.loader.store.append(symbol, self.signal_timeframe, row)
+                if self._latest_close.get(symbol) != bar[0]:
+                    continue  # A newer bar already closed; analyze that one instead
+                df = self.aggregator.frame(symbol, self.signal_timeframe, limit=Config.CANDLE_WINDOW)
+                if df.empty or df['datetime'].iloc[-1] != pd.Timestamp(bar[0], unit='s'):
+                    continue  # Closed again since the check above
+                # Indicators come from the incremental state (O(1) per bar), not a full recompute
+                self.on_result(symbol, self.engine.analyze_bar(symbol, df, values))
+                self.analyses += 1
+            except Exception as e:
+                logger.error(f"Streaming analysis failed for {symbol}: {e}")
+
+    def _flush_loop(self):
+        while not self._stop.wait(1.0):
+            self.aggregator.flush()
+
+    def run(self, duration=None, flush=True):
+        """Consume the feed until it ends, duration elapses or stop() is called"""
+        self._stop.clear()
+        worker = threading.Thread(target=self._analysis_worker, name="stream-analysis", daemon=True)
+        worker.start()
+        if flush:
+            threading.Thread(target=self._flush_loop, name="stream-flush", daemon=True).start()
+        try:
+            self.feed.run(self.aggregator.on_tick, stop_event=self._stop, duration=duration)
+        finally:
+            self._stop.set()
+            worker.join()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream ticks into multi-timeframe bars and analyze on bar close')
+    parser.add_argument('--simulate', action='store_true', help='Use the simulated tick feed')
+    parser.add_argument('--realtime', action='store_true', help='Pace simulated ticks on the wall clock')
+    parser.add_argument('--tps', type=int, default=5000, help='Simulated ticks per second')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run (simulated seconds unless --realtime)')
+    parser.add_argument('--analyze', action='store_true', help='Run DecisionEngine on each bar close')
+    args = parser.parse_args()
+
+    symbols = Config.VALID_SYMBOLS
+    if not args.simulate:
+        from strategy import DecisionEngine
+        streamer = StreamingEngine(DecisionEngine(), WebSocketTickFeed(symbols))
+        streamer.seed_history()
+        streamer.run()
+        return
+
+    feed = SimulatedTickFeed(symbols, ticks_per_second=args.tps, realtime=args.realtime)
+    if not args.analyze:
+        # Raw aggregation throughput
+        aggregator = BarAggregator(symbols)
+        started = time.perf_counter()
+        sent = feed.run(aggregator.on_tick, duration=args.duration)
+        elapsed = time.perf_counter() - started
+        closed = sum(aggregator._count)
+        print(f"{sent} ticks across {len(symbols)} symbols in {elapsed:.2f}s "
+              f"({sent / elapsed:,.0f} ticks/s), {closed} bars closed")
+        return
+
+    from strategy import DecisionEngine
+    streamer = StreamingEngine(DecisionEngine(), feed, persist=False,
+                               on_result=lambda pair, r: print(f"{pair}: {r['signal']} @ {r['price']} | {r['reason']}"))
+    streamer.seed_history()
+    streamer.run(duration=args.duration, flush=args.realtime)
+    print(f"{streamer.aggregator.ticks} ticks, {streamer.bars_closed} bars closed, {streamer.analyses} analyses")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Training Script for ML Models
 Run this script to train ML models on historical data.
 
 Usage:
-    python train_ml_model.py [--optimize] [--pairs EURUSD,GBPUSD]
+    python train_ml_model.py [--optimize] [--pairs EURUSD,GBPUSD] [--source mongo|candles]
 """
 
 import argparse
@@ -20,6 +20,8 @@ def main():
                         help='Comma-separated list of pairs to train on (default: all)')
     parser.add_argument('--no-optimize', dest='optimize', action='store_false',
                         help='Skip hyperparameter optimization (faster training)')
+    parser.add_argument('--source', choices=['mongo', 'candles'], default='mongo',
+                        help='Training data source: MongoDB market_data or the local candle store')
     parser.set_defaults(optimize=True)
     
     args = parser.parse_args()
@@ -41,7 +43,8 @@ def main():
     try:
         best_model, best_accuracy = train_models_from_historical_data(
             pairs=pairs, 
-            optimize=args.optimize
+            optimize=args.optimize,
+            source=args.source
         )
         
         logger.info("\n" + "="*60)
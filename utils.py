@@ -62,11 +62,12 @@ def check_api_keys():
     else:
         logger.info("[OK] All API keys appear to be configured.")
 
-def is_trading_hours():
-    """Check if current time is within trading sessions (24h on Weekdays)"""
+def is_trading_hours(at=None):
+    """Check if current (or `at`, UTC) time is within trading sessions (24h on Weekdays)"""
     # 0 = Monday, 4 = Friday, 5=Saturday, 6=Sunday
-    weekday = datetime.utcnow().weekday()
-    current_hour = datetime.utcnow().hour
+    at = at or datetime.utcnow()
+    weekday = at.weekday()
+    current_hour = at.hour
     
     # Simple check: Open all day Mon-Fri
     # Fine-tuning: Open Mon 00:00 to Fri 22:00
@@ -77,6 +78,11 @@ def is_trading_hours():
     else:
         return False # Weekend
 
+def is_market_open(symbol, at=None):
+    """Whether symbol's session is open at `at` (UTC, default now); O(1) session_calendar lookup"""
+    from session_calendar import get_calendar
+    return get_calendar().is_open(symbol, at)
+
 def get_utc_to_ist(dt=None):
     """Convert UTC datetime to IST"""
     from datetime import timedelta
@@ -84,95 +90,12 @@ def get_utc_to_ist(dt=None):
         dt = datetime.utcnow()
     return dt + timedelta(hours=5, minutes=30)
 
-def get_symbol_trading_hours(symbol):
+def get_symbol_trading_hours(symbol, at=None):
     """
-    Returns trading hours info for a symbol.
+    Returns trading hours info for a symbol at `at` (UTC, default now), from the
+    precomputed session_calendar (crypto 24/7, FX/metals 08:00-22:00 UTC Mon-Fri,
+    NYSE hours for equities, holidays closed).
     Returns: dict with 'is_open', 'session_name', 'next_open_ist'
     """
-    from datetime import timedelta
-    
-    current_utc = datetime.utcnow()
-    current_hour_utc = current_utc.hour
-    current_ist = get_utc_to_ist(current_utc)
-    
-    # Forex major pairs - 24/5 (Mon-Fri)
-    forex_pairs = ["EURUSD", "GBPUSD", "USDJPY", "USDCAD", "AUDUSD", "NZDUSD", "EURGBP", "EURJPY", "GBPJPY"]
-    
-    # Gold/Silver - Near 24/5
-    commodities = ["XAUUSD", "XAGUSD"]
-    
-    # Crypto - 24/7
-    crypto = ["BTCUSD", "ETHUSD"]
-    
-    # Check if weekend (Saturday=5, Sunday=6)
-    weekday = current_utc.weekday()
-    is_weekend = weekday >= 5
-    
-    # CRYPTO: Always open
-    if any(c in symbol for c in crypto):
-        return {
-            'is_open': True,
-            'session_name': 'Crypto Market (24/7)',
-            'next_open_ist': None
-        }
-    
-    # FOREX & COMMODITIES: Closed on weekends
-    if is_weekend:
-        # Calculate next Monday 00:00 UTC (05:30 IST)
-        days_until_monday = (7 - weekday) if weekday == 6 else 1
-        next_open_utc = current_utc + timedelta(days=days_until_monday)
-        next_open_utc = next_open_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-        next_open_ist = get_utc_to_ist(next_open_utc)
-        
-        return {
-            'is_open': False,
-            'session_name': 'Weekend - Market Closed',
-            'next_open_ist': next_open_ist.strftime('%A, %B %d at %H:%M IST')
-        }
-    
-    # FOREX/COMMODITIES: Check active sessions
-    # Major forex sessions:
-    # Tokyo: 00:00-09:00 UTC (05:30-14:30 IST)
-    # London: 08:00-17:00 UTC (13:30-22:30 IST) 
-    # New York: 13:00-22:00 UTC (18:30-03:30 IST next day)
-    
-    # Peak trading hours: London + NY overlap (13:00-17:00 UTC = 18:30-22:30 IST)
-    # Extended: 08:00-22:00 UTC (13:30 IST - 03:30 IST next day)
-    
-    session_start_utc = 8  # 13:30 IST
-    session_end_utc = 22   # 03:30 IST next day
-    
-    is_open = session_start_utc <= current_hour_utc < session_end_utc
-    
-    if is_open:
-        # Determine which session
-        if 8 <= current_hour_utc < 13:
-            session_name = 'London Session'
-        elif 13 <= current_hour_utc < 17:
-            session_name = 'London + NY Overlap (Peak)'
-        elif 17 <= current_hour_utc < 22:
-            session_name = 'New York Session'
-        else:
-            session_name = 'Active Trading'
-            
-        return {
-            'is_open': True,
-            'session_name': session_name,
-            'next_open_ist': None
-        }
-    else:
-        # Market closed, calculate next opening
-        if current_hour_utc < 8:
-            # Opens today at 8:00 UTC (13:30 IST)
-            next_open_utc = current_utc.replace(hour=8, minute=0, second=0, microsecond=0)
-        else:
-            # Opens tomorrow at 8:00 UTC (13:30 IST)
-            next_open_utc = (current_utc + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
-        
-        next_open_ist = get_utc_to_ist(next_open_utc)
-        
-        return {
-            'is_open': False,
-            'session_name': 'Market Closed',
-            'next_open_ist': next_open_ist.strftime('%A, %B %d at %H:%M IST')
-        }
+    from session_calendar import get_calendar
+    return get_calendar().session_info(symbol, at)
@@ -0,0 +1,506 @@
+"""Indicator Parity Check - alternative indicator paths vs TechnicalAnalysis.add_indicators"""
+
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from incremental_indicators import INDICATOR_COLUMNS
+
+# Values must agree to this relative tolerance; columns centred on zero
+# (macd, momentum, ...) are compared with an absolute tolerance scaled to price
+RTOL = 1e-9
+
+
+def make_candles(n, start_price=1.1, seed=42, volume=True, volatility=0.0005):
+    """Random-walk OHLCV test frame"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.standard_normal(n) * volatility))
+    spread = np.abs(rng.standard_normal(n)) * start_price * 0.0003
+    df = pd.DataFrame({
+        'datetime': pd.date_range(end=datetime(2024, 1, 1), periods=n, freq='15min'),
+        'open': close + rng.standard_normal(n) * start_price * 0.0002,
+        'high': close + spread,
+        'low': close - spread,
+        'close': close
+    })
+    if volume:
+        df['volume'] = rng.integers(1000, 10000, n).astype(float)
+    return df
+
+
+def compare_columns(expected, actual, columns, price_scale):
+    """Names of columns whose values differ beyond tolerance"""
+    failed = []
+    for column in columns:
+        a = np.asarray(expected[column], dtype='float64')
+        b = np.asarray(actual[column], dtype='float64')
+        if a.shape != b.shape or not np.allclose(a, b, rtol=RTOL, atol=RTOL * price_scale, equal_nan=True):
+            failed.append(column)
+    return failed
+
+
+def reference_indicators(df):
+    """add_indicators through the ta library (the reference implementation)"""
+    from config import Config
+    from indicators import TechnicalAnalysis
+    backend = Config.INDICATOR_BACKEND
+    Config.INDICATOR_BACKEND = "ta"
+    try:
+        return TechnicalAnalysis.add_indicators(df.copy())
+    finally:
+        Config.INDICATOR_BACKEND = backend
+
+
+def numpy_indicators(df):
+    from indicators import TechnicalAnalysis
+    return TechnicalAnalysis._add_indicators_numpy(df.copy())
+
+
+def check_kernels(n=5000):
+    ok = True
+    cases = {'float volume': make_candles(n), 'no volume': make_candles(n, volume=False)}
+    int_volume = make_candles(n)
+    int_volume['volume'] = int_volume['volume'].astype('int64')
+    cases['int volume'] = int_volume
+    for label, df in cases.items():
+        expected = reference_indicators(df)
+        actual = numpy_indicators(df)
+        if list(actual.index) != list(expected.index) or list(actual.columns) != list(expected.columns):
+            print(f"[FAIL] Kernels ({label}): rows/columns differ from ta")
+            ok = False
+            continue
+        failed = compare_columns(expected, actual, INDICATOR_COLUMNS, df['close'].max())
+        if failed:
+            print(f"[FAIL] Kernels ({label}): {', '.join(failed)}")
+            ok = False
+        else:
+            print(f"[OK] Kernels ({label}): {len(INDICATOR_COLUMNS)} columns match ta on {len(expected)} rows")
+    return ok
+
+
+def bench_kernels(sizes, ta_max):
+    """Indicator kernels vs the ta-based add_indicators across series lengths"""
+    from indicator_kernels import compute_indicators
+
+    compute_indicators(*(make_candles(100)[c].to_numpy() for c in ('high', 'low', 'close', 'volume')))  # warm imports
+    for n in sizes:
+        df = make_candles(n)
+        arrays = [df[c].to_numpy() for c in ('high', 'low', 'close', 'volume')]
+        started = time.perf_counter()
+        compute_indicators(*arrays)
+        numpy_seconds = time.perf_counter() - started
+        line = f"[OK] {n:>10,} bars: numpy kernels {numpy_seconds:8.3f}s"
+        if n <= ta_max:
+            started = time.perf_counter()
+            reference_indicators(df)
+            ta_seconds = time.perf_counter() - started
+            line += f", ta {ta_seconds:8.3f}s ({ta_seconds / numpy_seconds:,.1f}x)"
+        print(line)
+        del df, arrays
+
+
+def check_columns():
+    """add_indicators(df, columns=...) equals the matching slice of the full computation"""
+    from config import Config
+    from indicators import TechnicalAnalysis
+    from indicator_kernels import IndicatorGraph, SIGNAL_COLUMNS
+
+    ok = True
+    df = make_candles(3000)
+    subsets = {'signal': SIGNAL_COLUMNS, 'rsi_ema': ['rsi_ema'], 'atr_pct': ['atr_pct', 'ema_50']}
+    for backend in ('numpy', 'ta'):
+        full = reference_indicators(df) if backend == 'ta' else numpy_indicators(df)
+        for label, columns in subsets.items():
+            saved = Config.INDICATOR_BACKEND
+            Config.INDICATOR_BACKEND = backend
+            try:
+                actual = TechnicalAnalysis.add_indicators(df.copy(), columns=columns)
+            finally:
+                Config.INDICATOR_BACKEND = saved
+            expected_columns = list(df.columns) + [c for c in full.columns if c in columns]
+            # dropna only sees the requested columns: same rows as the full frame once ema_50
+            # (longest warm-up) is requested, otherwise a superset
+            rows_ok = (list(actual.index) == list(full.index) if 'ema_50' in columns
+                       else set(full.index) <= set(actual.index))
+            if (list(actual.columns) != expected_columns or not rows_ok
+                    or compare_columns(full, actual.loc[full.index], columns, df['close'].max())):
+                print(f"[FAIL] Columns ({backend}, {label}): subset differs from full add_indicators")
+                ok = False
+    graph = IndicatorGraph(df['high'], df['low'], df['close'], df['volume'])
+    graph.compute(SIGNAL_COLUMNS)
+    skipped = [c for c in INDICATOR_COLUMNS if c not in graph.computed]
+    if ok:
+        print(f"[OK] Columns: subsets match full add_indicators; signal columns skip {len(skipped)} of "
+              f"{len(INDICATOR_COLUMNS)} ({', '.join(skipped)})")
+    return ok
+
+
+def check_score_frame():
+    from indicators import TechnicalAnalysis
+    from indicator_kernels import compute_indicators
+
+    ok = True
+    cases = {'volume': make_candles(5000, volatility=0.002),
+             'no volume': make_candles(5000, volume=False, volatility=0.002)}
+    for label, df in list(cases.items()):
+        # Warm-up rows kept (NaN indicators) to cover NaN comparisons
+        frame = df.copy()
+        volume = frame['volume'].to_numpy() if 'volume' in frame.columns else None
+        for column, values in compute_indicators(frame['high'], frame['low'], frame['close'], volume).items():
+            frame[column] = values
+        cases[f"{label}, warm-up rows"] = frame
+        cases[f"{label}, dropna"] = numpy_indicators(df)
+        cases[f"{label}, no stoch/bb"] = frame.drop(columns=['stoch_k', 'stoch_d', 'bb_pct', 'bb_width'])
+    for label, df in cases.items():
+        if 'ema_20' not in df.columns:
+            continue
+        expected = np.array([TechnicalAnalysis.get_signal_score(row) for _, row in df.iterrows()], dtype='float64')
+        actual = TechnicalAnalysis.score_frame(df).to_numpy()
+        if not np.array_equal(expected, actual):
+            print(f"[FAIL] score_frame ({label}): {int((expected != actual).sum())} rows differ")
+            ok = False
+        else:
+            print(f"[OK] score_frame ({label}): identical to get_signal_score on {len(df)} rows")
+    return ok
+
+
+def bench_score_frame(n=1_000_000):
+    from indicators import TechnicalAnalysis
+
+    df = numpy_indicators(make_candles(n, volatility=0.002))
+    sample = df.head(5000)
+    started = time.perf_counter()
+    for _, row in sample.iterrows():
+        TechnicalAnalysis.get_signal_score(row)
+    per_row = (time.perf_counter() - started) / len(sample)
+    started = time.perf_counter()
+    TechnicalAnalysis.score_frame(df)
+    seconds = time.perf_counter() - started
+    print(f"[OK] Scoring {len(df):,} rows: score_frame {seconds:.3f}s, "
+          f"get_signal_score via iterrows ~{per_row * len(df):,.0f}s ({per_row * len(df) / seconds:,.0f}x)")
+
+
+def bench_columns(n=1_000_000):
+    from indicator_kernels import compute_indicators, SIGNAL_COLUMNS
+
+    df = make_candles(n)
+    arrays = [df[c].to_numpy() for c in ('high', 'low', 'close', 'volume')]
+    timings = {}
+    for label, columns in (('all columns', None), ('signal columns', SIGNAL_COLUMNS), ('rsi only', ['rsi'])):
+        started = time.perf_counter()
+        compute_indicators(*arrays, columns=columns)
+        timings[label] = time.perf_counter() - started
+    print(f"[OK] {n:,} bars: " + ", ".join(f"{label} {seconds:.3f}s" for label, seconds in timings.items()))
+
+
+# (symbol, price level, quoted decimals) spanning forex price scales
+PRICE_SCALES = [('EURUSD', 1.1, 5), ('USDJPY', 150.0, 3), ('XAUUSD', 2400.0, 2)]
+FLOAT32_RTOL = 1.2e-7  # two float32 ulps: one rounding on store, with margin
+
+
+def _near_ties(df):
+    """Rows where any comparison get_signal_score makes is within FLOAT32_RTOL of equality"""
+    def near(a, b):
+        a = df[a].to_numpy(dtype='float64')
+        b = df[b].to_numpy(dtype='float64') if isinstance(b, str) else float(b)
+        return np.abs(a - b) <= FLOAT32_RTOL * np.maximum(np.abs(a), np.abs(b))
+
+    comparisons = [('close', 'ema_20'), ('ema_20', 'ema_50'), ('macd', 'macd_signal'), ('obv', 'obv_ema'),
+                   ('stoch_k', 'stoch_d'), ('macd_diff', 0)]
+    comparisons += [('rsi', t) for t in (30, 40, 60, 70)] + [('stoch_k', t) for t in (20, 80)]
+    comparisons += [('bb_pct', 0.05), ('bb_pct', 0.95), ('bb_width', 0.02)]
+    return np.logical_or.reduce([near(a, b) for a, b in comparisons])
+
+
+def check_low_memory(n=20000):
+    """
+    Low-memory (float32) frames vs float64, per price scale:
+    - stored OHLC round-trips to the quoted decimals
+    - every indicator within FLOAT32_RTOL of float64 (computed in float64, rounded once)
+    - signal scores only differ on near-ties: rows where a get_signal_score comparison
+      (close vs ema_20, stoch_k vs stoch_d or 80, ...) is within float32 resolution.
+      Quoted prices make such ties common for %K (exact fractions like 80.0)
+    """
+    from indicators import TechnicalAnalysis
+
+    ok = True
+    for symbol, price, decimals in PRICE_SCALES:
+        df = make_candles(n, start_price=price, volatility=0.001)
+        prices = ['open', 'high', 'low', 'close']
+        df[prices] = df[prices].round(decimals)
+        full = numpy_indicators(df)
+        compact = TechnicalAnalysis.add_indicators(df.copy(), low_memory=True)
+        problems = []
+        if list(compact.index) != list(full.index):
+            problems.append("rows differ")
+        elif not all((np.round(compact[c].to_numpy(dtype='float64'), decimals) == full[c].to_numpy()).all()
+                     for c in prices):
+            problems.append(f"prices do not round-trip to {decimals} decimals")
+        else:
+            worst = 0.0
+            for column in INDICATOR_COLUMNS:
+                a = full[column].to_numpy(dtype='float64')
+                b = compact[column].to_numpy(dtype='float64')
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    worst = max(worst, np.nanmax(np.where(a != 0, np.abs(a - b) / np.abs(a), np.abs(b))))
+            if worst > FLOAT32_RTOL:
+                problems.append(f"max relative error {worst:.2e}")
+            differs = (TechnicalAnalysis.score_frame(full) != TechnicalAnalysis.score_frame(compact)).to_numpy()
+            ties = _near_ties(full)
+            if (differs & ~ties).any():
+                problems.append(f"{int((differs & ~ties).sum())} signal scores differ beyond near-ties")
+        if problems:
+            print(f"[FAIL] Low memory ({symbol}): {'; '.join(problems)}")
+            ok = False
+            continue
+        pip = 10.0 ** -(decimals - 1)
+        print(f"[OK] Low memory ({symbol} ~{price:g}): max relative error {worst:.1e} "
+              f"(~{price * worst / pip:.5f} pip), {differs.mean():.3%} scores flip on near-ties, "
+              f"{TechnicalAnalysis.frame_bytes(full) / n:,.0f} -> {TechnicalAnalysis.frame_bytes(compact) / n:,.0f} bytes/bar")
+    return ok
+
+
+def check_incremental(n=2000, volume=True):
+    from indicators import TechnicalAnalysis
+    from incremental_indicators import IndicatorState, INDICATOR_COLUMNS
+
+    df = make_candles(n, volume=volume)
+    expected = reference_indicators(df)
+
+    state = IndicatorState(has_volume=volume)
+    rows, ready = [], []
+    volumes = df['volume'].tolist() if volume else [0.0] * n
+    for high, low, close, vol in zip(df['high'], df['low'], df['close'], volumes):
+        rows.append(dict(state.update(high, low, close, vol)))
+        ready.append(state.ready)
+    actual = pd.DataFrame(rows, columns=INDICATOR_COLUMNS)
+
+    label = "with volume" if volume else "without volume"
+    if list(np.flatnonzero(ready)) != list(expected.index):
+        print(f"[FAIL] Incremental ({label}): ready rows differ from add_indicators' dropna rows")
+        return False
+    failed = compare_columns(expected, actual.loc[expected.index], INDICATOR_COLUMNS, df['close'].abs().max())
+    if failed:
+        print(f"[FAIL] Incremental ({label}): {', '.join(failed)}")
+        return False
+    print(f"[OK] Incremental ({label}): {len(INDICATOR_COLUMNS)} columns match on {len(expected)} rows")
+    return True
+
+
+def check_analyze_bar(n_frames=20, bars=300):
+    from strategy import DecisionEngine
+    from incremental_indicators import IncrementalIndicators
+
+    engine = DecisionEngine(use_ml=False)
+    failed = 0
+    for seed in range(n_frames):
+        df = make_candles(bars, seed=seed, volume=seed % 2 == 0)
+        values = IncrementalIndicators().warm_up('BTCUSD', df)
+        live = engine.analyze_bar('BTCUSD', df, values)
+        expected = engine.analyze_frame('BTCUSD', df)
+        same = all(live[k] == expected[k] for k in expected if k not in ('time', 'time_ist', 'raw_data'))
+        raw = compare_columns(pd.DataFrame([expected['raw_data']]), pd.DataFrame([live['raw_data']]),
+                              [k for k in expected['raw_data'] if k != 'time'], df['close'].max())
+        failed += not same or bool(raw)
+    if failed:
+        print(f"[FAIL] Streaming analyze_bar: {failed}/{n_frames} frames differ from analyze_frame")
+        return False
+    print(f"[OK] Streaming analyze_bar (incremental indicators): {n_frames} frames match analyze_frame")
+    return True
+
+
+def check_batch(n_symbols=40, bars=300):
+    from indicators import TechnicalAnalysis
+    from incremental_indicators import INDICATOR_COLUMNS
+
+    # Mixed lengths exercise the right-aligned NaN padding; every third frame has no volume
+    frames = {f"SYM{i:02d}": make_candles(bars - (i % 5) * 30, start_price=1.0 + i, seed=i, volume=i % 3 != 0)
+              for i in range(n_symbols)}
+    batch = TechnicalAnalysis.add_indicators_batch(frames)
+    failed = []
+    for symbol, df in frames.items():
+        expected = reference_indicators(df).reset_index(drop=True)
+        actual = batch.frame(symbol)
+        if len(actual) != len(expected) or compare_columns(expected, actual, INDICATOR_COLUMNS, df['close'].max()):
+            failed.append(symbol)
+    if failed:
+        print(f"[FAIL] Batch: {len(failed)} symbols differ ({', '.join(failed[:5])})")
+        return False
+    score_ok = all(TechnicalAnalysis.get_signal_score(batch.latest(s)) ==
+                   TechnicalAnalysis.get_signal_score(reference_indicators(df).iloc[-1])
+                   for s, df in frames.items())
+    if not score_ok:
+        print("[FAIL] Batch: get_signal_score differs on latest rows")
+        return False
+    print(f"[OK] Batch: {n_symbols} symbols x {bars} bars (mixed volume) match add_indicators (incl. signal scores)")
+    return True
+
+
+class FrameLoader:
+    """DataLoader stand-in serving fixed frames, so DecisionEngine runs without provider calls"""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def fetch_market_data(self, symbol, hedge=False):
+        return self.frames.get(symbol.upper())
+
+    def fetch_market_data_many(self, symbols):
+        return {s.upper(): self.frames.get(s.upper()) for s in symbols}
+
+
+def check_analyze_many(bars=600):
+    from strategy import DecisionEngine
+    from config import Config
+
+    pairs = list(Config.VALID_SYMBOLS)
+    frames = {pair: make_candles(bars - (i % 4) * 50, start_price=1.0 + i, seed=i, volume=i % 3 != 0)
+              for i, pair in enumerate(pairs)}
+    frames[pairs[0]] = frames[pairs[0]].head(30)  # Insufficient Data path
+    engine = DecisionEngine()
+    engine.loader = FrameLoader(frames)
+
+    started = time.perf_counter()
+    many = engine.analyze_many(pairs + ['NOTAPAIR'])
+    batched = time.perf_counter() - started
+    # Fresh engine: no closed-market results cached by analyze_many
+    engine = DecisionEngine()
+    engine.loader = FrameLoader(frames)
+    started = time.perf_counter()
+    single = {pair: engine.analyze_pair(pair) for pair in pairs + ['NOTAPAIR']}
+    sequential = time.perf_counter() - started
+
+    volatile = {'time', 'time_ist'}
+    failed = [pair for pair in single
+              if {k: v for k, v in many[pair].items() if k not in volatile} !=
+              {k: v for k, v in single[pair].items() if k not in volatile}]
+    if failed or list(many) != list(single):
+        print(f"[FAIL] analyze_many: {len(failed)} pairs differ from analyze_pair ({', '.join(failed[:5])})")
+        return False
+    print(f"[OK] analyze_many: {len(pairs)} pairs match analyze_pair "
+          f"({batched:.2f}s vs {sequential:.2f}s sequential)")
+    return True
+
+
+def check_process_scanner(bars=600):
+    from strategy import DecisionEngine
+    from process_scanner import ProcessScanner
+    from config import Config
+
+    pairs = list(Config.VALID_SYMBOLS)
+    frames = {pair: make_candles(bars - (i % 4) * 50, start_price=1.0 + i, seed=i, volume=i % 3 != 0)
+              for i, pair in enumerate(pairs)}
+    frames[pairs[0]] = frames[pairs[0]].head(30)
+    engine = DecisionEngine()
+    engine.loader = FrameLoader(frames)
+
+    with ProcessScanner(processes=2, loader=engine.loader) as scanner:
+        scanned = {pair: result for pair, result, _ in scanner.scan(pairs + ['NOTAPAIR'])}
+    volatile = {'time', 'time_ist'}
+    failed = [pair for pair, result in scanned.items()
+              if result is None or {k: v for k, v in result.items() if k not in volatile} !=
+              {k: v for k, v in engine.analyze_pair(pair).items() if k not in volatile}]
+    if failed or len(scanned) != len(pairs) + 1:
+        print(f"[FAIL] Process scanner: {len(failed)} pairs differ from analyze_pair ({', '.join(failed[:5])})")
+        return False
+    print(f"[OK] Process scanner: {len(pairs)} pairs match analyze_pair (2 workers, shared-memory candles)")
+    return True
+
+
+def bench_process_scanner(n_symbols=400, bars=600):
+    from process_scanner import ProcessScanner
+    from config import Config
+
+    frames = {f"SYM{i:03d}": make_candles(bars, start_price=1.0 + i, seed=i) for i in range(n_symbols)}
+    valid = Config.VALID_SYMBOLS
+    Config.VALID_SYMBOLS = valid + list(frames)
+    try:
+        timings = {}
+        for processes in sorted({1, 2, os.cpu_count() or 1}):
+            with ProcessScanner(processes=processes, use_ml=False, loader=FrameLoader(frames)) as scanner:
+                list(scanner.scan(list(frames)))  # warm the workers
+                scanner._last_results.clear()  # time real scans, not closed-market cache hits
+                started = time.perf_counter()
+                list(scanner.scan(list(frames)))
+                timings[processes] = time.perf_counter() - started
+    finally:
+        Config.VALID_SYMBOLS = valid
+    print(f"[OK] {n_symbols} symbols x {bars} bars: " +
+          ", ".join(f"{p} proc {s:.2f}s ({timings[1] / s:.1f}x)" for p, s in timings.items()) +
+          f" on {os.cpu_count()} cores")
+
+
+def bench_batch(n_symbols=500, bars=200):
+    from indicators import TechnicalAnalysis
+
+    frames = {f"SYM{i:03d}": make_candles(bars, start_price=1.0 + i, seed=i) for i in range(n_symbols)}
+    started = time.perf_counter()
+    for df in frames.values():
+        reference_indicators(df)
+    per_symbol = time.perf_counter() - started
+    started = time.perf_counter()
+    TechnicalAnalysis.add_indicators_batch(frames)
+    batch = time.perf_counter() - started
+    print(f"[OK] {n_symbols} symbols x {bars} bars: ta add_indicators loop {per_symbol:.2f}s, "
+          f"batch {batch:.2f}s ({per_symbol / batch:,.1f}x)")
+
+
+def bench_incremental(window=100, bars=2000):
+    from indicators import TechnicalAnalysis
+    from incremental_indicators import IndicatorState
+
+    df = make_candles(window + bars)
+    started = time.perf_counter()
+    for end in range(window, window + 200):
+        reference_indicators(df.iloc[end - window:end])
+    batch_per_bar = (time.perf_counter() - started) / 200
+
+    state = IndicatorState()
+    highs, lows, closes, volumes = (df[c].tolist() for c in ('high', 'low', 'close', 'volume'))
+    started = time.perf_counter()
+    for i in range(len(df)):
+        state.update(highs[i], lows[i], closes[i], volumes[i])
+    incremental_per_bar = (time.perf_counter() - started) / len(df)
+
+    print(f"[OK] Per new bar: add_indicators({window} rows) {batch_per_bar * 1e6:,.0f} us, "
+          f"incremental {incremental_per_bar * 1e6:,.1f} us ({batch_per_bar / incremental_per_bar:,.0f}x)")
+
+
+def validate(sizes=(1_000, 10_000, 100_000, 1_000_000, 10_000_000), ta_max=100_000):
+    print("=" * 60)
+    print("INDICATOR PARITY CHECK")
+    print("=" * 60)
+
+    results = [check_kernels(), check_columns(), check_score_frame(), check_low_memory(),
+               check_incremental(volume=True),
+               check_incremental(volume=False), check_analyze_bar(), check_batch(), check_analyze_many(),
+               check_process_scanner()]
+
+    print("\n" + "=" * 60)
+    print("BENCHMARKS")
+    print("=" * 60)
+    bench_kernels(sizes, ta_max)
+    bench_columns()
+    bench_score_frame()
+    bench_incremental()
+    bench_batch()
+    bench_process_scanner()
+
+    print("\n" + "=" * 60)
+    print("RESULT")
+    print("=" * 60)
+    print("ALL PARITY CHECKS PASSED!" if all(results) else "PARITY CHECKS FAILED!")
+    print("=" * 60)
+    return all(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check indicator paths against ta and benchmark them')
+    parser.add_argument('--sizes', type=str, default='1000,10000,100000,1000000,10000000',
+                        help='Series lengths for the backend benchmark')
+    parser.add_argument('--ta-max', type=int, default=100_000,
+                        help='Largest series also timed with ta (its ATR is a Python loop)')
+    args = parser.parse_args()
+    validate([int(n) for n in args.sizes.split(',')], args.ta_max)
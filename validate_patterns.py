@@ -0,0 +1,148 @@
+"""Pattern Detection Check - vectorized swing/pattern paths vs the original per-bar logic"""
+
+import argparse
+import time
+import numpy as np
+from validate_indicator_parity import make_candles
+
+
+def reference_swing_points(highs, lows, order=5):
+    """The original per-bar pivot loop of TechnicalAnalysis._find_swing_points"""
+    swing_highs = []
+    swing_lows = []
+    for i in range(order, len(highs) - order):
+        if highs[i] == max(highs[i-order:i+order+1]):
+            swing_highs.append(i)
+        if lows[i] == min(lows[i-order:i+order+1]):
+            swing_lows.append(i)
+    return swing_highs, swing_lows
+
+
+def check_swing_points():
+    from indicators import TechnicalAnalysis
+
+    ok = True
+    cases = [(n, order) for n in (0, 5, 11, 12, 100, 1000) for order in (1, 2, 5, 10, 25)]
+    for n, order in cases:
+        df = make_candles(max(n, 1), seed=n + order).head(n)
+        # Rounded prices create equal neighbours, which count as pivots (== max)
+        for decimals in (None, 3):
+            frame = df.round({c: decimals for c in ('high', 'low')}) if decimals else df
+            expected = reference_swing_points(frame['high'].values, frame['low'].values, order)
+            highs, lows, *_ = TechnicalAnalysis._find_swing_points(frame, lookback=max(n, 1), order=order)
+            if (highs, lows) != expected:
+                print(f"[FAIL] Swing points: n={n} order={order} decimals={decimals}")
+                ok = False
+    if ok:
+        print(f"[OK] Swing points: identical indices in {len(cases) * 2} cases (orders 1-25, with ties)")
+    return ok
+
+
+def check_scan(bars=1500):
+    from indicators import TechnicalAnalysis
+    from pattern_scan import PATTERN_COLUMNS, pattern_labels
+
+    ok = True
+    fired = dict.fromkeys(PATTERN_COLUMNS, 0)
+    checked = 0
+    # Calm and volatile walks, plus rounded prices (ties), so most patterns occur
+    for seed, volatility, decimals in ((1, 0.0005, None), (2, 0.003, None), (3, 0.006, None), (4, 0.003, 3)):
+        df = make_candles(bars, seed=seed, volatility=volatility)
+        if decimals:
+            df = df.round({c: decimals for c in ('high', 'low', 'close')})
+        scan = TechnicalAnalysis.scan_chart_patterns(df)
+        mismatches = 0
+        for t in range(bars):
+            patterns, score, _ = TechnicalAnalysis.detect_chart_patterns(df.iloc[:t + 1])
+            row = scan.iloc[t]
+            if sorted(pattern_labels(row)) != sorted(patterns) or not np.isclose(row['pattern_score'], score):
+                mismatches += 1
+            checked += 1
+        for column in PATTERN_COLUMNS:
+            fired[column] += int(scan[column].sum())
+        if mismatches:
+            print(f"[FAIL] Pattern scan (seed {seed}, volatility {volatility}): {mismatches} of {bars} bars differ")
+            ok = False
+    if ok:
+        seen = sum(1 for count in fired.values() if count)
+        print(f"[OK] Pattern scan: identical to detect_chart_patterns on {checked:,} bars "
+              f"({seen}/{len(PATTERN_COLUMNS)} patterns occurred)")
+    return ok
+
+
+def bench_scan(sizes):
+    from indicators import TechnicalAnalysis
+
+    df = make_candles(2000, volatility=0.003)
+    started = time.perf_counter()
+    for t in range(1000, 2000):
+        TechnicalAnalysis.detect_chart_patterns(df.iloc[:t + 1])
+    per_bar = (time.perf_counter() - started) / 1000
+    for n in sizes:
+        df = make_candles(n, volatility=0.003)
+        started = time.perf_counter()
+        TechnicalAnalysis.scan_chart_patterns(df)
+        seconds = time.perf_counter() - started
+        print(f"[OK] {n:>9,} bars: pattern scan {seconds:7.3f}s, detector per bar ~{per_bar * n:,.1f}s "
+              f"({per_bar * n / seconds:,.0f}x)")
+
+
+def bench_detectors(bars=3000, calls=2000):
+    """Per-detector time breakdown of detect_chart_patterns (pattern_engine timings)"""
+    from indicators import TechnicalAnalysis, _PATTERN_ENGINE
+
+    df = make_candles(bars, volatility=0.003)
+    _PATTERN_ENGINE.reset_timings()
+    started = time.perf_counter()
+    for t in range(bars - calls, bars):
+        TechnicalAnalysis.detect_chart_patterns(df.iloc[:t + 1])
+    per_call = (time.perf_counter() - started) / calls
+    print(f"[OK] detect_chart_patterns: {per_call * 1e6:,.0f} us/call over {calls} calls")
+    for name, stats in TechnicalAnalysis.pattern_timings().items():
+        print(f"     {name:<20} {stats['avg_us']:8.2f} us/call")
+
+
+def bench_swing_points(sizes, orders=(5, 50)):
+    from indicator_kernels import swing_flags
+
+    for n in sizes:
+        df = make_candles(n)
+        highs, lows = df['high'].values, df['low'].values
+        for order in orders:
+            started = time.perf_counter()
+            reference_swing_points(highs, lows, order)
+            loop = time.perf_counter() - started
+            started = time.perf_counter()
+            swing_flags(highs, lows, order)
+            vectorized = time.perf_counter() - started
+            print(f"[OK] {n:>9,} bars, order {order:>3}: per-bar loop {loop:7.3f}s, "
+                  f"swing_flags {vectorized:7.4f}s ({loop / vectorized:,.0f}x)")
+
+
+def validate(sizes=(1_000, 100_000, 1_000_000)):
+    print("=" * 60)
+    print("PATTERN DETECTION CHECK")
+    print("=" * 60)
+
+    results = [check_swing_points(), check_scan()]
+
+    print("\n" + "=" * 60)
+    print("BENCHMARKS")
+    print("=" * 60)
+    bench_swing_points(sizes)
+    bench_scan(sizes)
+    bench_detectors()
+
+    print("\n" + "=" * 60)
+    print("RESULT")
+    print("=" * 60)
+    print("ALL PATTERN CHECKS PASSED!" if all(results) else "PATTERN CHECKS FAILED!")
+    print("=" * 60)
+    return all(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check vectorized pattern detection against the per-bar logic')
+    parser.add_argument('--sizes', type=str, default='1000,100000,1000000', help='Series lengths to benchmark')
+    args = parser.parse_args()
+    validate([int(n) for n in args.sizes.split(',')])
@@ -198,6 +198,415 @@ def test_config():
         return False
 
 
+def test_scheduler():
+    """Test bar-close scheduler alignment, closed-symbol filtering and overlap skipping"""
+    print("\n" + "=" * 60)
+    print("Testing Bar-Close Scheduler")
+    print("=" * 60)
+    
+    try:
+        import threading
+        from bar_scheduler import BarCloseScheduler
+        
+        # Wednesday 2024-01-03 10:07:12 UTC
+        wednesday = datetime(2024, 1, 3, 10, 7, 12).timestamp() - datetime(1970, 1, 1).timestamp()
+        now = [wednesday]
+        release = threading.Event()
+        calls = []
+        
+        def job(symbols, bar_close):
+            calls.append((symbols, bar_close))
+            release.wait(5)
+        
+        scheduler = BarCloseScheduler(job, {'15min': ['EURUSD', 'BTCUSD'], '1h': ['XAUUSD']},
+                                      settle=2, clock=lambda: now[0])
+        
+        close = scheduler.next_close()
+        assert datetime.utcfromtimestamp(close) == datetime(2024, 1, 3, 10, 15), "15min close misaligned"
+        assert scheduler.closed_symbols(close) == ['EURUSD', 'BTCUSD'], "1h symbol fired on a 15min close"
+        hour = close + 45 * 60
+        assert scheduler.closed_symbols(hour) == ['EURUSD', 'BTCUSD', 'XAUUSD'], "1h close missed"
+        print("✅ Closes aligned to bar boundaries per timeframe")
+        
+        # Saturday: only crypto bars close
+        saturday = close + 3 * 86400
+        assert scheduler.closed_symbols(saturday) == ['BTCUSD'], "Weekend close fired for FX"
+        print("✅ Only symbols whose market was open are scheduled")
+        
+        now[0] = close + 2.5
+        first = scheduler.fire(close)
+        now[0] = close + 900 + 2
+        assert scheduler.fire(close + 900) is None, "Overlapping cycle was started"
+        release.set()
+        first.join(5)
+        metrics = scheduler.metrics()
+        assert metrics['runs'] == 1 and metrics['skipped_overlap'] == 1, f"Unexpected metrics {metrics}"
+        assert metrics['last_start_lag'] == 2.5, f"Start lag {metrics['last_start_lag']} != 2.5"
+        print("✅ Overlapping run skipped; lag metrics recorded")
+        print(f"   Metrics: {metrics}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Scheduler test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_provider_health():
+    """Test circuit breakers, provider ranking and body-level throttling detection"""
+    print("\n" + "=" * 60)
+    print("Testing Provider Health")
+    print("=" * 60)
+    
+    try:
+        from config import Config
+        from data_loader import DataLoader
+        from provider_health import ProviderHealth, OPEN, CLOSED
+        
+        health = ProviderHealth()
+        for _ in range(Config.BREAKER_FAILURE_THRESHOLD):
+            assert health.allow('polygon'), "Breaker opened before the failure threshold"
+            health.record_failure('polygon', 0.1)
+        assert not health.allow('polygon'), "Breaker still closed after the failure threshold"
+        state = health._get('polygon')
+        state.open_until = 0.0  # cooldown over
+        assert health.allow('polygon') and not health.allow('polygon'), "Half-open must allow exactly one probe"
+        health.record_failure('polygon', 0.1)
+        assert state.state == OPEN and state.cooldown == 2 * Config.BREAKER_COOLDOWN, "Failed probe did not double the cooldown"
+        state.open_until = 0.0
+        assert health.allow('polygon')
+        health.record_success('polygon', 0.2)
+        assert state.state == CLOSED and state.cooldown == Config.BREAKER_COOLDOWN, "Successful probe did not close"
+        health.record_failure('twelvedata', 0.1, rate_limited=True, retry_after=30)
+        assert not health.allow('twelvedata'), "Rate limit did not open the breaker at once"
+        print("✅ Breaker: threshold, single half-open probe, doubling cooldown, rate-limit open")
+        
+        health = ProviderHealth()
+        chain = ['twelvedata', 'polygon', 'alphavantage']
+        health.record_success('twelvedata', 0.4)
+        assert health.ranked(chain) == chain, f"Untried providers jumped ahead: {health.ranked(chain)}"
+        health.record_success('polygon', 0.1)
+        health.record_success('alphavantage', 0.2)
+        assert health.ranked(chain) == ['polygon', 'alphavantage', 'twelvedata'], "Not fastest-first"
+        health.record_failure('polygon', 0.1, rate_limited=True, retry_after=60)
+        assert health.ranked(chain)[-1] == 'polygon', "Open breaker not ranked last"
+        print("✅ Ranking: configured order until measured, then fastest-healthy-first")
+        
+        class Response:
+            status_code = 200
+            headers = {}
+            
+            def __init__(self, body):
+                self.body = body
+            
+            def json(self):
+                return self.body
+        
+        loader = DataLoader()
+        loader.health = ProviderHealth()
+        loader.session = type('Session', (), {'get': lambda self, url, **kw: Response({'code': 429, 'message': 'credits'})})()
+        loader._get('twelvedata', 'http://stand-in', throttled=loader._twelvedata_throttled)
+        assert loader.health._get('twelvedata').state == OPEN, "HTTP 200 credit error recorded as a success"
+        assert loader.health.stats('twelvedata')[0] == 0.0, "Throttled body counted as a successful call"
+        assert loader._alphavantage_throttled({'Note': 'Thank you for using Alpha Vantage'})
+        assert loader._polygon_throttled({'status': 'ERROR', 'error': 'You have exceeded the maximum requests'})
+        print("✅ Throttled 2xx bodies open the breaker instead of counting as successes")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Provider health test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_candle_store():
+    """Test candle store views vs copies, journal replay, legacy CSV import and compaction"""
+    print("\n" + "=" * 60)
+    print("Testing Candle Store")
+    print("=" * 60)
+    
+    try:
+        import os
+        import tempfile
+        from candle_store import CandleStore, CANDLE_COLUMNS
+        
+        store = CandleStore(root=tempfile.mkdtemp())
+        candles = pd.DataFrame({'datetime': pd.date_range('2024-01-01', periods=10, freq='15min'),
+                                'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': np.arange(10.0), 'volume': 1.0})
+        store.append('EURUSD', '15min', candles)
+        view = store.load('EURUSD', '15min')
+        snapshot = store.load('EURUSD', '15min', copy=True)
+        refetched = candles.tail(1).assign(close=999.0)
+        store.append('EURUSD', '15min', refetched)
+        assert snapshot['close'].iloc[-1] == 9.0, "copy=True frame changed on the next append"
+        assert view['close'].iloc[-1] == 999.0 and len(store.load('EURUSD', '15min')) == 10, "Tail not rewritten"
+        print("✅ Refetched bar rewrites the stored tail; copy=True snapshots are unaffected")
+        
+        # Crash after the journal was saved but before it was applied: the next read replays it
+        directory = store._dir('EURUSD', '15min')
+        later = pd.DataFrame({'datetime': pd.date_range('2024-01-01 02:30', periods=3, freq='15min'),
+                              'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 5.0, 'volume': 1.0})
+        store._save_journal(directory, 10, store._to_arrays(later))
+        replayed = store.load('EURUSD', '15min')
+        assert len(replayed) == 13 and not os.path.exists(os.path.join(directory, 'journal.npz')), "Journal not replayed"
+        print("✅ Interrupted write replayed from the journal on the next read")
+        
+        candles.to_csv(os.path.join(store.root, 'GBPUSD_15min.csv'), index=False)
+        imported = store.load('GBPUSD', '15min')
+        assert imported is not None and len(imported) == 10, "Legacy CSV not imported"
+        assert not os.path.exists(os.path.join(store.root, 'GBPUSD_15min.csv')), "Legacy CSV left behind"
+        print("✅ Legacy CSV imported into column files")
+        
+        # Uncommitted bytes past the row count and a NaN bar: compact drops both
+        store._write_columns(directory, 13, store._to_arrays(later.assign(datetime=later['datetime'] + pd.Timedelta('1h'))))
+        store._write_columns(directory, 5, {c: np.array([np.nan if c != 'datetime' else
+                                                         replayed['datetime'].iloc[5].value]) for c in CANDLE_COLUMNS})
+        live = store.load('EURUSD', '15min')
+        assert store.compact('EURUSD', '15min') == 12, "compact() did not drop the NaN bar"
+        assert os.path.getsize(os.path.join(directory, 'close.f8')) == 12 * 8, "Uncommitted bytes not trimmed"
+        assert len(live) == 13 and live['close'].iloc[-1] == 5.0, "compact() changed a frame already loaded"
+        print("✅ compact() trims and cleans into new files; loaded frames keep the old ones")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Candle store test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def _rate_limiter_worker(path, attempts, results):
+    """Child process for test_rate_limiter: try to take `attempts` tokens from the shared file"""
+    from rate_limiter import RateLimiter, FileBackend
+    limiter = RateLimiter(limits={'polygon': {'per_minute': 0.001, 'burst': 10, 'daily': None}},
+                          backend=FileBackend(path))
+    results.put(sum(limiter.try_acquire('polygon') for _ in range(attempts)))
+
+
+def test_rate_limiter():
+    """Test token refill, burst, daily reset, refund on timeout and the cross-process file backend"""
+    print("\n" + "=" * 60)
+    print("Testing Rate Limiter")
+    print("=" * 60)
+    
+    try:
+        import multiprocessing
+        import os
+        import tempfile
+        from rate_limiter import RateLimiter, FileBackend, fcntl
+        
+        limiter = RateLimiter(limits={'polygon': {'per_minute': 6, 'burst': 3, 'daily': 5}})
+        midnight = datetime(2024, 1, 3).timestamp() - datetime(1970, 1, 1).timestamp()
+        now = midnight - 60
+        waits = [limiter._reserve('polygon', 1, now) for _ in range(4)]
+        assert waits == [0.0, 0.0, 0.0, 10.0], f"Burst of 3 then a 10s wait expected, got {waits}"
+        assert limiter._reserve('polygon', 1, now + 30) == 0.0, "Bucket did not refill at 6/min"
+        assert limiter._reserve('polygon', 1, now + 40) is None, "Daily quota of 5 not enforced"
+        assert limiter._reserve('polygon', 1, midnight + 600) == 0.0, "Daily quota did not reset at 00:00 UTC"
+        print("✅ Burst, refill and daily quota (reset at 00:00 UTC)")
+        
+        limiter = RateLimiter(limits={'polygon': {'per_minute': 0.001, 'burst': 1, 'daily': None}})
+        assert limiter.acquire('polygon', timeout=0)
+        assert not limiter.acquire('polygon', timeout=0.5), "Acquire waited past its timeout"
+        assert limiter.status()['polygon']['used_today'] == 1, "Timed-out reservation was not refunded"
+        assert limiter.acquire('unlisted', timeout=0), "Providers without limits must not be throttled"
+        print("✅ Timed-out acquire refunds its reservation; unlisted providers pass")
+        
+        if fcntl is None:
+            print("⚠️  No fcntl on this platform; file backend not exercised")
+            return True
+        path = os.path.join(tempfile.mkdtemp(), 'rate_limits.json')
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_rate_limiter_worker, args=(path, 10, results)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        granted = sum(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join(10)
+        assert granted == 10, f"{granted} tokens granted across 4 processes from a burst of 10"
+        shared = RateLimiter(limits={'polygon': {'per_minute': 0.001, 'burst': 10, 'daily': None}},
+                             backend=FileBackend(path))
+        assert shared.status()['polygon']['used_today'] == 10, "File state not shared"
+        print("✅ File backend: 4 processes share one bucket (10 of 40 attempts granted)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Rate limiter test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_hedged_fetch():
+    """Test that a hedge which never reaches its rate limiter gives the prepaid token back"""
+    print("\n" + "=" * 60)
+    print("Testing Hedged Fetch")
+    print("=" * 60)
+    
+    from config import Config
+    from mock_providers import start_server, point_config_at, UPSTREAM_URLS
+    saved = {attr: getattr(Config, attr) for attr in
+             [f"URL_{name.upper()}" for name in UPSTREAM_URLS] +
+             ['API_KEY_POLYGON', 'API_KEY_TWELVEDATA', 'HEDGE_DELAY']}
+    server = start_server(latency=0.5)
+    try:
+        from data_loader import DataLoader
+        from provider_health import ProviderHealth
+        from rate_limiter import RateLimiter
+        
+        point_config_at(server.url())
+        Config.API_KEY_POLYGON = Config.API_KEY_TWELVEDATA = 'MOCK_KEY'
+        Config.HEDGE_DELAY = 0.1
+        loader = DataLoader()
+        loader.health = ProviderHealth()
+        loader.limiter = RateLimiter(limits={p: {'per_minute': 0.001, 'burst': 2, 'daily': None}
+                                             for p in ('polygon', 'twelvedata')})
+        # TwelveData returns before _rate_limit for symbols it has marked unavailable
+        loader.td_unavailable.add('EURUSD')
+        fetchers = {'polygon': lambda: loader.fetch_price_polygon('EURUSD'),
+                    'twelvedata': lambda: loader.fetch_price_twelvedata('EURUSD')}
+        df = loader._fetch_hedged('EURUSD', fetchers, ['polygon', 'twelvedata'])
+        assert df is not None and not df.empty, "Slow provider did not serve the race"
+        status = loader.limiter.status()
+        assert status['twelvedata']['used_today'] == 0, f"Unspent hedge token kept: {status['twelvedata']}"
+        assert status['polygon']['used_today'] == 1, f"Polygon usage {status['polygon']}"
+        print(f"✅ Hedge that skipped its request released the prepaid token ({status['twelvedata']['tokens']} left)")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Hedged fetch test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        server.shutdown()
+        for attr, value in saved.items():
+            setattr(Config, attr, value)
+
+
+def test_bar_aggregator():
+    """Test streaming bar building: late ticks, flush() of quiet symbols and seed()"""
+    print("\n" + "=" * 60)
+    print("Testing Streaming Bar Aggregator")
+    print("=" * 60)
+    
+    try:
+        from streaming import BarAggregator
+        
+        closed = []
+        agg = BarAggregator(['EURUSD'], timeframes=['1min', '5min'], capacity=16,
+                            on_bar_close=lambda symbol, tf, bar: closed.append((tf, bar)))
+        base = 1704276000  # 2024-01-03 10:00 UTC, on a 5min boundary
+        for offset, price in [(0, 1.0), (30, 1.2), (61, 0.9), (59, 5.0)]:
+            agg.on_tick('EURUSD', base + offset, price, 1.0)
+        assert closed == [('1min', (base, 1.0, 1.2, 1.0, 1.2, 2.0))], f"1min close {closed}"
+        assert agg.late_ticks == 1, f"{agg.late_ticks} late ticks != 1 (1min only)"
+        print("✅ Late tick dropped from its closed 1min bar, kept by the forming 5min bar")
+        
+        closed.clear()
+        assert agg.flush(now=base + 300) == 2, "flush() did not close both forming bars"
+        five = dict(closed)['5min']
+        assert five == (base, 1.0, 5.0, 0.9, 0.9, 4.0), f"5min bar {five} (close must be the newest tick)"
+        agg.on_tick('EURUSD', base + 100, 1.1)
+        assert agg.late_ticks == 3, "Tick for a flushed bar was not counted late"
+        assert len(agg.frame('EURUSD', '5min')) == 1, "Tick reopened a flushed bar"
+        print("✅ flush() closes quiet bars; ticks for flushed bars are dropped")
+        
+        agg = BarAggregator(['EURUSD'], timeframes=['5min'], capacity=4)
+        history = pd.DataFrame({'datetime': pd.to_datetime([base + 300 * k for k in range(6)], unit='s'),
+                                'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': np.arange(6.0), 'volume': 1.0})
+        agg.seed('EURUSD', '5min', history)
+        frame = agg.frame('EURUSD', '5min')
+        assert frame['close'].tolist() == [1.0, 2.0, 3.0, 4.0], f"Seeded ring {frame['close'].tolist()}"
+        agg.on_tick('EURUSD', base + 1500 + 10, 3.0, 2.0)
+        agg.on_tick('EURUSD', base + 1800, 7.0)
+        bar = agg.frame('EURUSD', '5min').iloc[-1]
+        assert (bar['high'], bar['close'], bar['volume']) == (3.0, 3.0, 3.0), f"Seeded forming bar {bar.to_dict()}"
+        print("✅ seed() fills the ring buffer and continues the forming bar")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Bar aggregator test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_session_calendar():
+    """Test session calendar lookups and closed-market fetch skipping"""
+    print("\n" + "=" * 60)
+    print("Testing Session Calendar")
+    print("=" * 60)
+    
+    try:
+        import time
+        from session_calendar import get_calendar
+        from strategy import DecisionEngine
+        from validate_indicator_parity import make_candles
+        
+        calendar = get_calendar()
+        cases = [
+            ('EURUSD', datetime(2026, 10, 14, 14, 0), True, 'London + NY Overlap (Peak)'),
+            ('EURUSD', datetime(2026, 10, 14, 23, 0), False, 'Market Closed'),
+            ('XAUUSD', datetime(2026, 10, 17, 12, 0), False, 'Weekend - Market Closed'),
+            ('BTCUSD', datetime(2026, 10, 17, 12, 0), True, 'Crypto Market (24/7)'),
+            ('EURUSD', datetime(2026, 12, 25, 12, 0), False, 'Holiday - Market Closed'),
+            ('AAPL', datetime(2026, 7, 1, 14, 0), True, 'NYSE Regular Session'),   # 10:00 New York (EDT)
+            ('AAPL', datetime(2026, 1, 15, 14, 0), False, 'Market Closed'),         # 09:00 New York (EST)
+            ('AAPL', datetime(2026, 11, 26, 16, 0), False, 'Holiday - Market Closed'),
+        ]
+        for symbol, at, is_open, name in cases:
+            assert calendar.status(symbol, at) == (is_open, name), f"{symbol} at {at}: {calendar.status(symbol, at)}"
+        print(f"✅ {len(cases)} session lookups correct (weekends, sessions, DST, holidays, crypto 24/7)")
+        
+        info = calendar.session_info('AAPL', datetime(2026, 11, 25, 22, 0))
+        assert info['next_open_ist'] == 'Friday, November 27 at 20:00 IST', f"Next open {info['next_open_ist']}"
+        print(f"✅ Next open skips holidays: {info['next_open_ist']}")
+        
+        started = time.perf_counter()
+        for _ in range(10000):
+            calendar.is_open('EURUSD')
+        print(f"✅ Lookup: {(time.perf_counter() - started) / 10000 * 1e6:.1f} us")
+        
+        # Closed market: the first analysis fetches, later ones are served without I/O
+        class CountingLoader:
+            calls = 0
+            
+            def fetch_market_data(self, symbol, hedge=False):
+                CountingLoader.calls += 1
+                return make_candles(300)
+        
+        engine = DecisionEngine(use_ml=False)
+        engine.loader = CountingLoader()
+        symbol = 'EURUSD'
+        if calendar.is_open(symbol):
+            symbol = 'AAPL' if not calendar.is_open('AAPL') else None
+        if symbol is None:
+            print("⚠️  Every test market is open right now; fetch skipping not exercised")
+        else:
+            first = engine.analyze_pair(symbol)
+            second = engine.analyze_pair(symbol)
+            assert CountingLoader.calls == 1, f"{CountingLoader.calls} fetches for a closed market"
+            assert second['signal'] == 'WAIT' and second['reason'] == first['reason'], "Cached result differs"
+            print(f"✅ Closed {symbol}: 1 fetch for 2 analyses ({second['reason']})")
+        
+        return True
+        
+    except Exception as e:
+        print(f"❌ Session calendar test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def main():
     """Run all validation tests"""
     print("\n" + "=" * 60)
@@ -209,7 +618,14 @@ def main():
         "Indicators": test_indicators(),
         "ML Model": test_ml_model(),
         "Strategy Integration": test_strategy_integration(),
-        "Configuration": test_config()
+        "Configuration": test_config(),
+        "Bar-Close Scheduler": test_scheduler(),
+        "Bar Aggregator": test_bar_aggregator(),
+        "Candle Store": test_candle_store(),
+        "Rate Limiter": test_rate_limiter(),
+        "Hedged Fetch": test_hedged_fetch(),
+        "Provider Health": test_provider_health(),
+        "Session Calendar": test_session_calendar()
     }
     
     print("\n" + "=" * 60)
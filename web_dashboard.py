@@ -86,11 +86,15 @@ def status():
         except Exception as e:
             mongo_status = f"error: {str(e)[:100]}"
     
+    from provider_health import get_provider_health
+    import main  # the module global, set once background_job has built the scheduler
     return jsonify({
         "status": "running", 
         "version": "1.2",
         "database": "mongodb" if mongo_uri_set else "sqlite",
         "mongodb": mongo_status,
+        "providers": get_provider_health().snapshot(),
+        "scheduler": main.scheduler.metrics() if main.scheduler is not None else None,
         "timestamp": time.time()
     })
 